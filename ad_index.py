@@ -0,0 +1,106 @@
+import json
+import os
+import re
+
+import pandas as pd
+
+from http_cache import CACHE_DIR
+
+# Dossier des index d'annonces déjà vues (un fichier par catégorie)
+INDEX_DIR = os.path.join(CACHE_DIR, "seen_ads")
+
+# Identifiant numérique en fin d'URL (ex: ".../perruches-751123")
+AD_ID_RE = re.compile(r"-(\d+)/?(?:[?#].*)?$")
+
+# Titre de l'annonce dans son URL (ex: ".../chiens/chiots-pitbull-742716")
+AD_SLUG_RE = re.compile(r"/annonce/[^/]+/(.+?)-\d+/?(?:[?#].*)?$")
+
+
+def extract_ad_id(url: str) -> str | None:
+    """
+    Extrait l'identifiant d'une annonce depuis son URL.
+
+    Args:
+        url: URL de l'annonce (ex: "https://sn.coinafrique.com/annonce/autres-animaux/perruches-751123")
+
+    Returns:
+        str: Identifiant de l'annonce (ex: "751123") ou None
+    """
+    if not isinstance(url, str):
+        return None
+    match = AD_ID_RE.search(url)
+    return match.group(1) if match else None
+
+
+class SeenAdsIndex:
+    """
+    Ensemble persistant des identifiants d'annonces déjà scrapées pour une catégorie.
+
+    Args:
+        slug: Identifiant de la catégorie dans les URLs (ex: "chiens")
+        path: Fichier JSON de l'index (par défaut INDEX_DIR/<slug>.json)
+    """
+
+    def __init__(self, slug: str, path: str | None = None):
+        self.slug = slug
+        self.path = path or os.path.join(INDEX_DIR, f"{slug}.json")
+        self.ids: set[str] = set()
+        if os.path.exists(self.path):
+            with open(self.path, encoding="utf-8") as f:
+                self.ids = set(json.load(f))
+
+    def __contains__(self, ad_id) -> bool:
+        return ad_id in self.ids
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def add(self, ad_ids) -> None:
+        self.ids.update(ad_id for ad_id in ad_ids if ad_id)
+
+    def save(self) -> None:
+        """Écrit l'index sur disque (écriture atomique)."""
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(sorted(self.ids), f)
+        os.replace(tmp_path, self.path)
+
+    def seed_from_csv(self, data_folder: str = "webscraper_data") -> int:
+        """
+        Ajoute les annonces de la catégorie présentes dans les fichiers
+        existants (CSV Web Scraper et sorties CSV ou Parquet du scraper).
+
+        Seules les URLs de la colonne container_urls de la forme
+        /annonce/<slug>/... sont prises en compte.
+
+        Args:
+            data_folder: Dossier contenant les fichiers de données
+
+        Returns:
+            int: Nombre d'identifiants ajoutés
+        """
+        if not os.path.exists(data_folder):
+            return 0
+
+        before = len(self.ids)
+        marker = f"/annonce/{self.slug}/"
+        for filename in os.listdir(data_folder):
+            path = os.path.join(data_folder, filename)
+            try:
+                if filename.endswith(".csv"):
+                    urls = pd.read_csv(path, usecols=["container_urls"])["container_urls"]
+                elif filename.endswith(".parquet"):
+                    urls = pd.read_parquet(path, columns=["container_urls"])["container_urls"]
+                else:
+                    continue
+            except (ValueError, KeyError, OSError):
+                # Fichier sans colonne container_urls ou illisible
+                continue
+            urls = urls[urls.str.contains(marker, regex=False, na=False)]
+            self.add(extract_ad_id(url) for url in urls)
+        return len(self.ids) - before
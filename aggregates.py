@@ -0,0 +1,153 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+from data_cleaner import sync_database
+from listings_db import where_clause
+
+# Clé de la sélection "toutes catégories"
+ALL_CATEGORIES = "Toutes"
+
+# Nombre de villes (et de quartiers) gardés par sélection
+TOP_CITIES = 10
+
+# Nombre de prix gardés pour le nuage de points
+PRICE_SAMPLE_SIZE = 100
+
+PRICE_QUANTILES = (0.1, 0.25, 0.5, 0.75, 0.9)
+
+# Nombre de classes (échelle logarithmique) de l'histogramme des prix
+PRICE_HISTOGRAM_BINS = 20
+
+# Colonnes (voir data_cleaner.normalize_locations) des comptes par lieu
+CITY_COLUMN = "ville"
+NEIGHBORHOOD_COLUMN = "quartier"
+
+
+def _price_sample(db, categories=None):
+    where, params = where_clause(categories=categories, priced=True)
+    sample = db.query(
+        f"SELECT prix_fcfa FROM listings{where} ORDER BY rowid LIMIT ?",
+        [*params, PRICE_SAMPLE_SIZE],
+    )
+    sample.insert(0, "Index", range(1, len(sample) + 1))
+    return sample
+
+
+def _slice(db, total, category_counts, city_counts, neighborhood_counts, edges, categories=None):
+    histogram = None
+    if edges is not None:
+        histogram = pd.DataFrame(
+            {
+                "Prix": np.round(edges[:-1]).astype("int64"),
+                "Nombre": db.price_histogram(edges, categories=categories),
+            }
+        )
+    return {
+        "total": int(total),
+        "category_counts": category_counts,
+        "city_counts": city_counts,
+        "neighborhood_counts": neighborhood_counts,
+        "price_sample": _price_sample(db, categories),
+        "price_quantiles": db.price_quantiles(PRICE_QUANTILES, categories=categories),
+        "price_histogram": histogram,
+        "weekly_median": db.weekly_median_prices(categories=categories),
+    }
+
+
+def build_aggregates(db) -> dict:
+    """
+    Calcule tous les agrégats affichés par le dashboard.
+
+    Les comptes, quantiles et histogrammes sont calculés par la base (requêtes
+    indexées); seuls des résultats agrégés sont chargés en mémoire.
+
+    Args:
+        db: Base d'annonces (voir listings_db.ListingsDB)
+
+    Returns:
+        dict: "categories" (catégories présentes) et "slices", un dictionnaire
+        catégorie -> agrégats (total, comptes par catégorie, par ville et par
+        quartier, échantillon, quantiles et histogramme des prix, prix médian par
+        semaine), plus la sélection ALL_CATEGORIES
+    """
+    cat_counts = db.query(
+        "SELECT categorie AS \"Catégorie\", COUNT(*) AS \"Nombre\" FROM listings "
+        "GROUP BY categorie ORDER BY 2 DESC"
+    )
+    if cat_counts.empty:
+        return {"categories": [], "slices": {}}
+
+    # Comptes par (catégorie, lieu)
+    by_cat = {
+        column: db.query(
+            f"SELECT categorie, {column} AS lieu, COUNT(*) AS n FROM listings "
+            f"WHERE {column} IS NOT NULL GROUP BY categorie, {column}"
+        )
+        for column in (CITY_COLUMN, NEIGHBORHOOD_COLUMN)
+    }
+
+    def top_places(column, label, category=None):
+        counts = by_cat[column]
+        if category is not None:
+            counts = counts[counts["categorie"] == category]
+        top = counts.groupby("lieu")["n"].sum().nlargest(TOP_CITIES).reset_index()
+        top.columns = [label, "Nombre"]
+        return top
+
+    # Classes communes de l'histogramme (prix connus, hors "Prix sur demande")
+    low, high = db.query(
+        "SELECT MIN(prix_fcfa), MAX(prix_fcfa) FROM listings WHERE prix_fcfa > 0"
+    ).iloc[0]
+    edges = None
+    if pd.notna(low):
+        low, high = np.log10(low), np.log10(high)
+        edges = np.logspace(low, max(high, low + 1e-9), PRICE_HISTOGRAM_BINS + 1)
+
+    slices = {
+        ALL_CATEGORIES: _slice(
+            db,
+            cat_counts["Nombre"].sum(),
+            cat_counts,
+            top_places(CITY_COLUMN, "Ville"),
+            top_places(NEIGHBORHOOD_COLUMN, "Quartier"),
+            edges,
+        )
+    }
+    for _, (category, total) in cat_counts.iterrows():
+        slices[category] = _slice(
+            db,
+            total,
+            cat_counts[cat_counts["Catégorie"] == category].reset_index(drop=True),
+            top_places(CITY_COLUMN, "Ville", category),
+            top_places(NEIGHBORHOOD_COLUMN, "Quartier", category),
+            edges,
+            categories=[category],
+        )
+
+    return {"categories": cat_counts["Catégorie"].tolist(), "slices": slices}
+
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+
+def get_aggregates(data_folder: str = "webscraper_data") -> dict:
+    """
+    Agrégats du dashboard, recalculés seulement quand les données changent.
+
+    Args:
+        data_folder: Dossier des données
+
+    Returns:
+        dict: Voir build_aggregates
+    """
+    db = sync_database(data_folder)
+    version = db.version()
+    with _cache_lock:
+        cached = _cache.get(data_folder)
+        if cached is None or cached[0] != version:
+            cached = (version, build_aggregates(db))
+            _cache[data_folder] = cached
+        return cached[1]
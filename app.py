@@ -1,5 +1,15 @@
+import logging
+import os
+
 import streamlit as st
-from pages import scraping, download, dashboard, evaluation
+from pages import scraping, download, search, dashboard, metrics, evaluation
+
+# Niveau des logs du scraper (DEBUG pour le détail de chaque annonce,
+# CRITICAL pour les couper)
+logging.basicConfig(
+    level=os.environ.get("COINAFRIQUE_LOG_LEVEL", "WARNING").upper(),
+    format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+)
 
 # Configuration de la page Streamlit
 st.set_page_config(
@@ -25,6 +35,13 @@ download_page = st.Page(
     url_path="download"
 )
 
+search_page = st.Page(
+    search.show,
+    title="Search listings",
+    icon=":material/manage_search:",
+    url_path="search"
+)
+
 dashboard_page = st.Page(
     dashboard.show,
     title="Dashboard of the data",
@@ -32,6 +49,13 @@ dashboard_page = st.Page(
     url_path="dashboard"
 )
 
+metrics_page = st.Page(
+    metrics.show,
+    title="Scraping metrics",
+    icon=":material/monitoring:",
+    url_path="metrics"
+)
+
 evaluation_page = st.Page(
     evaluation.show,
     title="Evaluate the App",
@@ -40,7 +64,7 @@ evaluation_page = st.Page(
 )
 
 # Navigation
-pg = st.navigation([scraping_page, download_page, dashboard_page, evaluation_page])
+pg = st.navigation([scraping_page, download_page, search_page, dashboard_page, metrics_page, evaluation_page])
 
 # Exécuter la page sélectionnée
 pg.run()
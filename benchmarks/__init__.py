@@ -0,0 +1,3 @@
+"""
+Scripts de benchmark des performances du scraper et du pipeline de données
+"""
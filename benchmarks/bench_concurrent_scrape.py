@@ -0,0 +1,62 @@
+"""
+Benchmark: scraping séquentiel vs concurrent contre un faux site local.
+
+Les deux modes sont mesurés avec le même débit maximal (--rps) et sans la
+pause entre pages du mode séquentiel (scraper.SEQUENTIAL_PAGE_PAUSE): le
+gain mesuré vient des téléchargements en parallèle seuls. La durée des
+pauses d'un vrai scraping séquentiel est affichée à part.
+
+Usage:
+    python -m benchmarks.bench_concurrent_scrape [--pages 3] [--latency 0.05]
+"""
+
+import argparse
+import time
+
+import scraper
+from benchmarks.stub_site import StubSite
+from http_client import ScraperClient
+
+STUB_CATEGORY = "Stub"
+
+
+def run(num_pages, **kwargs):
+    """Lance scrape_category et retourne (secondes, nb annonces)."""
+    with ScraperClient() as client:
+        start = time.perf_counter()
+        df = scraper.scrape_category(STUB_CATEGORY, num_pages, client=client, **kwargs)
+        return time.perf_counter() - start, len(df)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, default=3)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--workers", type=int, nargs="+", default=[4, 8, 16])
+    parser.add_argument("--rps", type=float, default=100.0)
+    args = parser.parse_args()
+
+    pauses = (args.pages - 1) * scraper.SEQUENTIAL_PAGE_PAUSE
+    scraper.SEQUENTIAL_PAGE_PAUSE = 0.0
+
+    with StubSite(latency=args.latency) as site:
+        scraper.CATEGORY_URLS[STUB_CATEGORY] = site.category_url()
+
+        baseline, n_ads = run(args.pages, requests_per_second=args.rps)
+        print(
+            f"séquentiel          : {baseline:6.2f} s  ({n_ads} annonces)"
+            f"  + {pauses:.1f} s de pauses entre pages (non comptées)"
+        )
+
+        for workers in args.workers:
+            elapsed, n = run(
+                args.pages, max_workers=workers, requests_per_second=args.rps
+            )
+            print(
+                f"concurrent ({workers:2d} workers): {elapsed:6.2f} s  ({n} annonces)"
+                f"  x{baseline / elapsed:.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Benchmark du chargement des données: CSV brut vs stockage Arrow compacté.
+
+Les CSV de webscraper_data sont répliqués x1, x10 et x100 dans un dossier
+temporaire, chaque copie avec ses propres identifiants d'annonces: les
+deux chemins chargent les mêmes lignes (vérifié). Chaque chargement est
+mesuré dans un processus séparé: durée, mémoire du DataFrame obtenu et pic
+de RSS.
+
+Résultats (1 cœur; le chemin "store" comprend le dédoublonnage et la
+normalisation des adresses de load_and_clean_all_data):
+
+    échelle  chemin     lignes  durée (s)  DataFrame (Mo)  pic RSS (Mo)
+    x10      csv         32870      0.529             6.7          16.0
+    x10      store       32870      0.418             4.8          20.4
+    x100     csv        328700      3.788            66.8         135.2
+    x100     store      328700      2.401            47.6         168.9
+
+Usage:
+    python -m benchmarks.bench_data_store [--scales 1 10 100]
+"""
+
+import argparse
+import multiprocessing
+import os
+import resource
+import shutil
+import tempfile
+import time
+
+import pandas as pd
+
+# Importés au chargement du module (dans chaque processus), hors mesure
+from data_cleaner import clean_dataframe, load_and_clean_all_data
+from sources import determine_category
+
+SOURCE_FOLDER = "webscraper_data"
+
+
+def make_dataset(folder, scale):
+    """
+    Réplique les CSV du projet `scale` fois dans `folder`, chaque copie avec
+    ses propres identifiants d'annonces (sinon le dédoublonnage du
+    chargement n'en garderait qu'une).
+    """
+    for filename in os.listdir(SOURCE_FOLDER):
+        if filename.endswith(".csv"):
+            df = pd.read_csv(os.path.join(SOURCE_FOLDER, filename))
+            copies = []
+            for k in range(scale):
+                copy = df.copy()
+                copy["container_urls"] = copy["container_urls"] + f"{k:04d}"
+                copies.append(copy)
+            pd.concat(copies, ignore_index=True).to_csv(
+                os.path.join(folder, filename), index=False
+            )
+
+
+def load_csv(folder):
+    """Ancien chemin: lecture complète de chaque CSV puis suppression des colonnes."""
+    frames = []
+    for filename in os.listdir(folder):
+        if filename.endswith(".csv"):
+            df = clean_dataframe(pd.read_csv(os.path.join(folder, filename)))
+            df["categorie"] = determine_category(filename)
+            frames.append(df)
+    return pd.concat(frames, ignore_index=True)
+
+
+def load_store(folder):
+    return load_and_clean_all_data(folder)
+
+
+def measure(loader_name, folder):
+    loader = {"csv": load_csv, "store": load_store}[loader_name]
+    baseline_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    start = time.perf_counter()
+    df = loader(folder)
+    elapsed = time.perf_counter() - start
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    frame_mb = df.memory_usage(deep=True).sum() / 1024 / 1024
+    return len(df), elapsed, frame_mb, (peak_kb - baseline_kb) / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100])
+    args = parser.parse_args()
+
+    ctx = multiprocessing.get_context("spawn")
+    print(f"{'échelle':<9}{'chemin':<8}{'lignes':>9}{'durée (s)':>11}{'DataFrame (Mo)':>16}{'pic RSS (Mo)':>14}")
+    for scale in args.scales:
+        folder = tempfile.mkdtemp()
+        try:
+            make_dataset(folder, scale)
+            # Construire le stockage une première fois (hors mesure)
+            with ctx.Pool(1) as pool:
+                pool.apply(measure, ("store", folder))
+            rows_by_loader = {}
+            for loader_name in ("csv", "store"):
+                with ctx.Pool(1) as pool:
+                    rows, elapsed, frame_mb, rss_mb = pool.apply(
+                        measure, (loader_name, folder)
+                    )
+                rows_by_loader[loader_name] = rows
+                print(
+                    f"x{scale:<8}{loader_name:<8}{rows:>9}{elapsed:>11.3f}{frame_mb:>16.1f}{rss_mb:>14.1f}"
+                )
+            # Les deux chemins doivent charger les mêmes annonces
+            assert rows_by_loader["csv"] == rows_by_loader["store"], rows_by_loader
+        finally:
+            shutil.rmtree(folder)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Benchmark de la navigation paginée de la page de téléchargement.
+
+Le CSV des chiens est répliqué (x500 par défaut, quelques centaines de Mo)
+dans un dossier temporaire. On mesure la compaction initiale, puis pour
+plusieurs combinaisons filtre/tri: la première requête (construction des
+indices) et les changements de page suivants (indices en cache).
+
+Usage:
+    python -m benchmarks.bench_download_pages [--scale 500] [--pages 20]
+"""
+
+import argparse
+import os
+import random
+import shutil
+import statistics
+import tempfile
+import time
+
+import pandas as pd
+
+SOURCE_FILE = os.path.join("webscraper_data", "coinafrique_chiens_webscraper.csv")
+
+SCENARIOS = [
+    ("aucun", {}, None),
+    ("filtre adresse", {"adresse": "dakar"}, None),
+    ("tri Nom", {}, "Nom"),
+    ("filtre + tri", {"adresse": "dakar"}, "prix"),
+]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scale", type=int, default=500)
+    parser.add_argument("--pages", type=int, default=20, help="Changements de page mesurés")
+    parser.add_argument("--page-size", type=int, default=50)
+    args = parser.parse_args()
+
+    from data_browser import query_page
+    from data_store import build_store_file
+
+    folder = tempfile.mkdtemp()
+    try:
+        filename = os.path.basename(SOURCE_FILE)
+        df = pd.read_csv(SOURCE_FILE)
+        pd.concat([df] * args.scale, ignore_index=True).to_csv(
+            os.path.join(folder, filename), index=False
+        )
+        size_mb = os.path.getsize(os.path.join(folder, filename)) / 1024 / 1024
+        print(f"{len(df) * args.scale} lignes, CSV de {size_mb:.0f} Mo")
+
+        start = time.perf_counter()
+        build_store_file(folder, filename)
+        print(f"compaction initiale: {time.perf_counter() - start:.2f} s\n")
+
+        print(f"{'scénario':<16}{'lignes':>10}{'1re page (ms)':>15}{'page méd. (ms)':>16}{'page max (ms)':>15}")
+        for name, filters, sort_by in SCENARIOS:
+            start = time.perf_counter()
+            _, total = query_page(
+                folder, filename, 1, args.page_size, filters=filters, sort_by=sort_by
+            )
+            first = (time.perf_counter() - start) * 1000
+
+            num_pages = max(total // args.page_size, 1)
+            timings = []
+            for _ in range(args.pages):
+                page = random.randint(1, num_pages)
+                start = time.perf_counter()
+                query_page(
+                    folder, filename, page, args.page_size, filters=filters, sort_by=sort_by
+                )
+                timings.append((time.perf_counter() - start) * 1000)
+            print(
+                f"{name:<16}{total:>10}{first:>15.1f}{statistics.median(timings):>16.2f}{max(timings):>15.2f}"
+            )
+    finally:
+        shutil.rmtree(folder)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Benchmark: extraction depuis les cartes du listing vs pages d'annonces.
+
+Scrape les mêmes pages dans les deux modes (voir
+scraper.compare_extraction_modes) et affiche le nombre de requêtes, la durée
+et la couverture de chaque champ. Par défaut contre un faux site local;
+--live interroge sn.coinafrique.com.
+
+Usage:
+    python -m benchmarks.bench_extraction_modes [--pages 3] [--live] [--category Chiens]
+"""
+
+import argparse
+
+import scraper
+from benchmarks.stub_site import StubSite
+
+STUB_CATEGORY = "Stub"
+
+
+def report(result):
+    for mode in scraper.EXTRACTION_MODES:
+        print(
+            f"{mode:6s}: {result['ads'][mode]:4d} annonces, "
+            f"{result['requests'][mode]:4d} requêtes, {result['duration'][mode]:6.2f} s"
+        )
+    print()
+    print(result["fields"].to_string(index=False, float_format="{:.0%}".format))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, default=3)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--live", action="store_true", help="Scraper le vrai site")
+    parser.add_argument("--category", default="Chiens", help="Catégorie (avec --live)")
+    args = parser.parse_args()
+
+    if args.live:
+        report(scraper.compare_extraction_modes(args.category, args.pages, max_workers=args.workers))
+        return
+
+    with StubSite(latency=0.05) as site:
+        scraper.CATEGORY_URLS[STUB_CATEGORY] = site.category_url()
+        report(
+            scraper.compare_extraction_modes(
+                STUB_CATEGORY, args.pages, max_workers=args.workers, requests_per_second=100.0
+            )
+        )
+
+
+if __name__ == "__main__":
+    main()
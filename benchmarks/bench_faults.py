@@ -0,0 +1,158 @@
+"""
+Benchmark: scraping concurrent face à un site en difficulté.
+
+Chaque scénario lance un faux site local qui injecte des pannes (voir
+stub_site.StubSite) et compare le scraping avec disjoncteur et concurrence
+adaptative à un scraping sans (retries seuls).
+
+Avec --check, vérifie le comportement attendu sur le même faux site (voir
+CHECKS; --pages et --workers ignorés) au lieu d'afficher les mesures;
+échoue (AssertionError) sinon.
+
+Usage:
+    python -m benchmarks.bench_faults [--pages 10] [--workers 16] [--check]
+"""
+
+import argparse
+import logging
+import time
+
+import scraper
+from benchmarks.stub_site import ADS_PER_PAGE, StubSite
+from http_client import ScraperClient
+from metrics import MetricsRegistry
+from resilience import DEFAULT_MAX_CIRCUIT_WAIT, CircuitBreaker, CircuitOpenError, RetryPolicy
+
+STUB_CATEGORY = "Stub"
+
+# Tentatives par requête (RetryPolicy)
+MAX_ATTEMPTS = 4
+
+# Pages et workers des vérifications (--check): avec peu de requêtes, une
+# requête peut épuiser ses tentatives avant que le circuit ne s'ouvre
+CHECK_PAGES = 10
+CHECK_WORKERS = 16
+
+# Nom -> options de StubSite
+SCENARIOS = {
+    "sain": {},
+    "erreurs 503 (10 %)": {"error_rate": 0.1},
+    "limitation 429 (5 %, Retry-After 1 s)": {"throttle_rate": 0.05, "retry_after": 1},
+    "réponses bloquées (3 %)": {"hang_rate": 0.03, "hang": 5.0},
+    "panne de 2 s": {"outage": (0.3, 2.3)},
+    "surcharge (capacité 6)": {"capacity": 6, "latency": 0.01},
+}
+
+
+class NoBreaker:
+    """Disjoncteur qui ne s'ouvre jamais (référence sans disjoncteur)."""
+
+    def wait(self, url, max_wait=None):
+        pass
+
+    def record_success(self, url):
+        pass
+
+    def record_failure(self, url, retry_after=None):
+        pass
+
+
+def run(site, num_pages, workers, adaptive, breaker=None):
+    """Scrape le faux site; retourne (secondes, mesures du run)."""
+    scraper.CATEGORY_URLS[STUB_CATEGORY] = site.category_url()
+    registry = MetricsRegistry()
+    if breaker is None:
+        breaker = CircuitBreaker(reset_timeout=0.5) if adaptive else NoBreaker()
+    with ScraperClient(timeout=(1, 1)) as client:
+        start = time.perf_counter()
+        scraper.scrape_category(
+            STUB_CATEGORY,
+            num_pages,
+            client=client,
+            max_workers=workers,
+            requests_per_second=200.0,
+            retry_policy=RetryPolicy(max_attempts=MAX_ATTEMPTS, base_delay=0.2),
+            circuit_breaker=breaker,
+            adaptive_concurrency=adaptive,
+            metrics=registry,
+        )
+        elapsed = time.perf_counter() - start
+    return elapsed, registry.runs(last=1)[0]
+
+
+def check_outage_fails_fast(latency):
+    """
+    Site en panne pendant tout le scraping: une fois le circuit ouvert (plus
+    longtemps que l'attente acceptée), les requêtes échouent tout de suite
+    avec CircuitOpenError au lieu d'épuiser leurs tentatives.
+    """
+    breaker = CircuitBreaker(reset_timeout=2 * DEFAULT_MAX_CIRCUIT_WAIT)
+    with StubSite(latency=latency, outage=(0.0, 3600.0)) as site:
+        elapsed, run_metrics = run(site, CHECK_PAGES, CHECK_WORKERS, True, breaker)
+        requests_received = site.requests
+        url = site.category_url()
+
+    assert run_metrics["ads"] == 0, run_metrics
+    assert run_metrics["errors"].get("circuit", 0) >= CHECK_PAGES - 1, run_metrics["errors"]
+    # Seules les requêtes d'avant l'ouverture atteignent le site (sans
+    # disjoncteur: MAX_ATTEMPTS requêtes par page)
+    assert requests_received <= breaker.failure_threshold + MAX_ATTEMPTS, requests_received
+    assert elapsed < 5.0, elapsed
+    try:
+        breaker.wait(url, max_wait=1.0)
+    except CircuitOpenError:
+        pass
+    else:
+        raise AssertionError("le circuit devrait rester ouvert")
+    return f"{requests_received} requêtes reçues, {elapsed:.2f} s"
+
+
+def check_recovery_keeps_ads(latency):
+    """
+    Panne de 2 s pendant le scraping: les requêtes attendent que le site
+    revienne (disjoncteur), aucune annonce n'est perdue.
+    """
+    with StubSite(latency=latency, outage=(0.3, 2.3)) as site:
+        elapsed, run_metrics = run(site, CHECK_PAGES, CHECK_WORKERS, True)
+        failures = site.statuses.get(503, 0)
+
+    assert failures, "la panne n'a pas été rencontrée"
+    assert not run_metrics["errors"], run_metrics
+    assert run_metrics["ads"] == CHECK_PAGES * ADS_PER_PAGE, run_metrics["ads"]
+    return f"{run_metrics['ads']} annonces, {failures} réponses 503, {elapsed:.2f} s"
+
+
+CHECKS = [check_outage_fails_fast, check_recovery_keeps_ads]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--check", action="store_true", help="Vérifier au lieu de mesurer")
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.ERROR)
+
+    if args.check:
+        for check in CHECKS:
+            print(f"{check.__name__}: {check(args.latency)}")
+        return
+
+    for name, faults in SCENARIOS.items():
+        print(f"\n{name}")
+        for adaptive in (False, True):
+            options = {"latency": args.latency, **faults}
+            with StubSite(**options) as site:
+                elapsed, run_metrics = run(site, args.pages, args.workers, adaptive)
+                statuses = ", ".join(f"{k}: {v}" for k, v in sorted(site.statuses.items()))
+            label = "disjoncteur + AIMD" if adaptive else "retries seuls    "
+            print(
+                f"  {label}: {elapsed:5.2f} s, {run_metrics['ads']:3d} annonces, "
+                f"{run_metrics['retries']:3d} tentatives, {sum(run_metrics['errors'].values()):2d} échecs, "
+                f"{site.requests:4d} requêtes reçues ({statuses})"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Benchmark: parsing dans les threads vs pool de processus de parsing.
+
+Scrape un faux site local aux pages d'annonces volumineuses avec le backend
+bs4 (le plus coûteux en CPU), d'abord en parsant dans les threads de
+téléchargement, puis avec des pools de plusieurs tailles. Affiche le débit
+de chaque étape et la profondeur de la file, pour dimensionner le pool sur
+une machine donnée.
+
+Usage:
+    python -m benchmarks.bench_parse_pool [--pages 5] [--processes 1 2 4]
+"""
+
+import argparse
+import logging
+
+import scraper
+from benchmarks.stub_site import StubSite
+from http_client import ScraperClient
+from metrics import MetricsRegistry
+from parse_pool import default_processes, get_parse_pool
+
+STUB_CATEGORY = "Stub"
+
+
+def run(num_pages, workers, backend, parse_processes):
+    registry = MetricsRegistry()
+    with ScraperClient() as client:
+        scraper.scrape_category(
+            STUB_CATEGORY,
+            num_pages,
+            client=client,
+            max_workers=workers,
+            requests_per_second=1000.0,
+            parser_backend=backend,
+            parse_processes=parse_processes,
+            metrics=registry,
+        )
+    return registry.runs(last=1)[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--pages", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--filler", type=int, default=200, help="Taille des pages (blocs)")
+    parser.add_argument("--backend", default="bs4")
+    parser.add_argument("--processes", type=int, nargs="+", default=[1, 2, 4])
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.ERROR)
+    print(f"{default_processes()} cœur(s) disponible(s)")
+
+    with StubSite(latency=args.latency, filler_blocks=args.filler) as site:
+        scraper.CATEGORY_URLS[STUB_CATEGORY] = site.category_url()
+        for processes in [0] + args.processes:
+            if processes:
+                get_parse_pool(processes)  # démarrage des processus hors mesure
+            result = run(args.pages, args.workers, args.backend, processes)
+            stages = result["stages"]
+            label = f"pool de {processes} processus" if processes else "threads seuls     "
+            print(
+                f"{label}: {result['ads_per_second']:6.1f} annonces/s | "
+                f"téléchargement {stages['fetch']['per_second']:6.1f} req/s "
+                f"({stages['fetch']['bytes_per_second'] / 1e6:5.1f} Mo/s) | "
+                f"parsing {stages['parse']['per_second']:6.1f} pages/s "
+                f"({stages['parse']['busy_seconds']:5.2f} s cumulées) | "
+                f"file max {stages['queue']['max_depth']:2d}, moyenne {stages['queue']['mean_depth']:4.1f}, "
+                f"attente {stages['queue']['wait_seconds']:5.2f} s"
+            )
+
+
+if __name__ == "__main__":
+    main()
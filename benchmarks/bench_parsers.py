@@ -0,0 +1,72 @@
+"""
+Micro-benchmark des backends de parsing des pages d'annonce.
+
+Chaque backend est mesuré dans un processus séparé: pages/seconde et pic de
+mémoire (RSS) au-dessus du niveau atteint après chargement des fixtures.
+
+Usage:
+    python -m benchmarks.bench_parsers [--fixtures DOSSIER] [--pages 200]
+
+Sans --fixtures, des pages d'annonce synthétiques (~100 Ko) sont générées.
+"""
+
+import argparse
+import multiprocessing
+import os
+import resource
+import time
+
+from benchmarks.stub_site import ad_html
+from parsers import available_backends, parse_ad
+
+
+def load_fixtures(folder, num_pages):
+    """Charge les fichiers .html du dossier, ou génère des pages synthétiques."""
+    if folder:
+        pages = []
+        for filename in sorted(os.listdir(folder)):
+            if filename.endswith(".html"):
+                with open(os.path.join(folder, filename), "rb") as f:
+                    pages.append(f.read())
+        return pages
+    return [ad_html(ad_id, filler_blocks=1200).encode() for ad_id in range(num_pages)]
+
+
+def measure(backend, folder, num_pages, rounds):
+    pages = load_fixtures(folder, num_pages)
+    parse_ad(pages[0], backend)
+    baseline_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for page in pages:
+            parse_ad(page, backend)
+    elapsed = time.perf_counter() - start
+
+    peak_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return len(pages) * rounds / elapsed, (peak_kb - baseline_kb) / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--fixtures", help="Dossier de pages HTML sauvegardées")
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    ctx = multiprocessing.get_context("spawn")
+    results = {}
+    for backend in available_backends():
+        with ctx.Pool(1) as pool:
+            results[backend] = pool.apply(
+                measure, (backend, args.fixtures, args.pages, args.rounds)
+            )
+
+    baseline = results["bs4"][0]
+    print(f"{'backend':<12}{'pages/s':>10}{'vs bs4':>9}{'pic RSS (Mo)':>15}")
+    for backend, (rate, peak_mb) in results.items():
+        print(f"{backend:<12}{rate:>10.0f}{rate / baseline:>8.1f}x{peak_mb:>15.1f}")
+
+
+if __name__ == "__main__":
+    main()
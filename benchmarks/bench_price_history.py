@@ -0,0 +1,84 @@
+"""
+Benchmark de l'historique des prix: prix médian des moutons par semaine.
+
+Simule des scrapings quotidiens sur plusieurs mois (--ads annonces par
+catégorie et par jour, prix qui évoluent) écrits dans une base d'annonces
+temporaire, puis mesure la requête "prix médian par semaine des moutons
+sur les N semaines avant une date" (ex: Tabaski).
+
+Usage:
+    python -m benchmarks.bench_price_history [--days 180] [--ads 5000]
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+CATEGORIES = ["Chiens", "Moutons", "Poules, Lapins et Pigeons", "Autres"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--days", type=int, default=180)
+    parser.add_argument("--ads", type=int, default=5000, help="Annonces par catégorie et par jour")
+    parser.add_argument("--weeks", type=int, default=8, help="Semaines avant la date de fin")
+    args = parser.parse_args()
+
+    from listings_db import ListingsDB
+
+    folder = tempfile.mkdtemp()
+    try:
+        db = ListingsDB(os.path.join(folder, "listings.sqlite"))
+        rng = np.random.default_rng(0)
+        end = pd.Timestamp("2026-05-27")
+        start_day = end - pd.Timedelta(days=args.days)
+
+        start = time.perf_counter()
+        observations = 0
+        for day in range(args.days):
+            scraped_at = start_day + pd.Timedelta(days=day)
+            frames = []
+            for index, category in enumerate(CATEGORIES):
+                # Annonces qui restent en ligne quelques semaines
+                ad_ids = index * 10**8 + day // 21 * args.ads + np.arange(args.ads)
+                trend = 1 + 0.5 * day / args.days
+                frames.append(
+                    pd.DataFrame(
+                        {
+                            "ad_id": ad_ids,
+                            "categorie": category,
+                            "scraped_at": scraped_at,
+                            "prix_fcfa": np.round(rng.lognormal(12, 0.6, args.ads) * trend, -3),
+                        }
+                    )
+                )
+            db.add_price_observations(pd.concat(frames, ignore_index=True))
+            observations += args.ads * len(CATEGORIES)
+        print(
+            f"{observations} observations écrites en {time.perf_counter() - start:.1f} s, "
+            f"{db.scalar('SELECT COUNT(*) FROM price_history')} lignes d'historique, "
+            f"base de {os.path.getsize(db.path) / 1024 / 1024:.0f} Mo"
+        )
+
+        start = time.perf_counter()
+        weekly = db.weekly_median_prices(
+            categories=["Moutons"], start=end - pd.Timedelta(weeks=args.weeks), end=end
+        )
+        elapsed = time.perf_counter() - start
+        print(f"prix médian par semaine des moutons ({args.weeks} semaines): {elapsed * 1000:.0f} ms")
+        print(weekly.to_string(index=False))
+
+        start = time.perf_counter()
+        db.weekly_median_prices(categories=["Moutons"])
+        print(f"historique complet des moutons: {(time.perf_counter() - start) * 1000:.0f} ms")
+    finally:
+        shutil.rmtree(folder)
+
+
+if __name__ == "__main__":
+    main()
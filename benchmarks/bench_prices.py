@@ -0,0 +1,72 @@
+"""
+Benchmark du nettoyage des prix: parse_prices (vectorisé) vs .apply(clean_price).
+
+Deux DataFrames synthétiques d'un million de lignes sont mesurés: l'un tiré
+des prix réels de webscraper_data (peu de valeurs distinctes, comme en
+production), l'autre avec des montants aléatoires (presque toutes distinctes).
+
+Usage:
+    python -m benchmarks.bench_prices [--rows 1000000]
+"""
+
+import argparse
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from data_cleaner import clean_price, parse_prices
+
+SOURCE_FOLDER = "webscraper_data"
+
+
+def real_prices(rows, rng):
+    prices = pd.concat(
+        pd.read_csv(os.path.join(SOURCE_FOLDER, f), usecols=["prix"])["prix"]
+        for f in os.listdir(SOURCE_FOLDER)
+        if f.endswith(".csv")
+    )
+    return pd.Series(rng.choice(prices.to_numpy(), rows))
+
+
+def random_prices(rows, rng):
+    amounts = rng.integers(1_000, 10_000_000, rows)
+    text = pd.Series(amounts).map("{:,}".format).str.replace(",", " ") + " CFA"
+    text[rng.random(rows) < 0.3] = "Prix sur demande"
+    return text
+
+
+def bench(name, prices):
+    start = time.perf_counter()
+    baseline = prices.apply(clean_price)
+    apply_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    parsed = parse_prices(prices)
+    vector_s = time.perf_counter() - start
+
+    # Les deux méthodes doivent s'accorder (hors fourchettes, absentes ici)
+    assert np.allclose(
+        baseline.astype("float64"), parsed["prix_fcfa"], equal_nan=True
+    )
+    rows = len(prices)
+    print(
+        f"{name:<22}{rows / apply_s:>14,.0f}{rows / vector_s:>16,.0f}"
+        f"{apply_s / vector_s:>9.1f}x"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'jeu de données':<22}{'apply (l/s)':>14}{'vectorisé (l/s)':>16}{'gain':>10}")
+    bench("prix réels", real_prices(args.rows, rng))
+    bench("montants aléatoires", random_prices(args.rows, rng))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Benchmark de la recherche dans les annonces (search_index).
+
+Les annonces nettoyées de webscraper_data sont répliquées jusqu'à --rows
+lignes, chaque copie avec des noms légèrement différents (pour que le
+vocabulaire grandisse avec les données). On mesure la construction de
+l'index, sa reconstruction après l'arrivée de nouvelles annonces
+(découpage des textes réutilisé), puis la durée des requêtes.
+
+Usage:
+    python -m benchmarks.bench_search [--rows 1000000] [--repeat 20]
+"""
+
+import argparse
+import statistics
+import time
+
+import pandas as pd
+
+from data_cleaner import load_and_clean_all_data
+from listing_store import ListingStore
+from search_index import SearchIndex
+
+# (requête, filtres de search())
+QUERIES = [
+    ("pitbull", {}),
+    ("bélier ladoum", {}),
+    ("chiot", {}),
+    ("chiots berger allemand", {}),
+    ("pi", {}),
+    ("mouton", {"cities": ["Dakar"]}),
+    ("chiot", {"categories": ["Chiens"], "price_range": (50000, 300000)}),
+    ("", {"cities": ["Thies"]}),
+]
+
+
+def make_frame(base, rows, offset=0):
+    """Réplique `base` jusqu'à `rows` lignes; un numéro de copie par 10 copies dans Nom."""
+    copies = []
+    for k in range(offset, offset + -(-rows // len(base))):
+        copy = base.copy()
+        copy["Nom"] = copy["Nom"] + f" {k // 10}"
+        copies.append(copy)
+    return pd.concat(copies, ignore_index=True).head(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--new", type=int, default=10_000, help="Annonces ajoutées ensuite")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    base = load_and_clean_all_data()
+    df = make_frame(base, args.rows)
+    store = ListingStore.from_frame(df, "v1")
+    print(f"{store.num_rows} annonces, table de {store.nbytes / 1024 / 1024:.0f} Mo")
+
+    start = time.perf_counter()
+    index = SearchIndex(store)
+    print(
+        f"construction: {time.perf_counter() - start:.2f} s "
+        f"({len(index.vocabulary)} mots, {len(index.postings)} entrées)"
+    )
+
+    # Nouvelles annonces: nouvelle table, découpage des textes connus réutilisé
+    added = make_frame(base, args.new, offset=-(-args.rows // len(base)))
+    store = ListingStore.from_frame(pd.concat([df, added], ignore_index=True), "v2")
+    start = time.perf_counter()
+    SearchIndex(store)
+    cold = time.perf_counter() - start
+    start = time.perf_counter()
+    index = SearchIndex(store, token_cache=index.token_cache)
+    print(
+        f"reconstruction (+{args.new} annonces): {time.perf_counter() - start:.2f} s "
+        f"(sans réutilisation: {cold:.2f} s)\n"
+    )
+
+    print(f"{'requête':<28}{'filtres':<12}{'résultats':>10}{'méd. (ms)':>11}{'max (ms)':>10}")
+    for query, filters in QUERIES:
+        timings = []
+        for _ in range(args.repeat):
+            result = index.search(query, **filters)
+            timings.append(result["seconds"] * 1000)
+        label = ", ".join(filters) if filters else "-"
+        print(
+            f"{query or '(vide)':<28}{label[:11]:<12}{result['total']:>10}"
+            f"{statistics.median(timings):>11.2f}{max(timings):>10.2f}"
+        )
+
+    start = time.perf_counter()
+    index.page(result, page=3, page_size=20)
+    print(f"\npage de 20 résultats: {(time.perf_counter() - start) * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Benchmark: mémoire (RSS) du serveur par session supplémentaire.
+
+Chaque session simulée garde les annonces dont elle a besoin, comme dans
+st.session_state:
+- "copie": son propre DataFrame nettoyé, lu depuis les CSV (chaînes object,
+  comportement d'origine des pages);
+- "store": une vue sans copie de la table partagée (listing_store).
+
+Chaque mode est mesuré dans un processus séparé. Les chaînes object de
+pandas 2 (version minimale du projet) sont reproduites avec pandas 3 en
+désactivant future.infer_string.
+
+Usage:
+    python -m benchmarks.bench_session_memory [--scale 20] [--sessions 10]
+"""
+
+import argparse
+import gc
+import multiprocessing
+import os
+import resource
+import shutil
+import tempfile
+
+import pandas as pd
+
+from benchmarks.bench_data_store import load_csv, make_dataset
+
+
+def current_rss_mb() -> float:
+    """RSS actuel du processus (Linux), sinon pic de RSS."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / 1024 / 1024
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def measure(mode, folder, sessions):
+    """RSS avant la première session puis après chaque session."""
+    if hasattr(pd.options, "future"):
+        pd.options.future.infer_string = False
+
+    from listing_store import get_listing_store
+
+    # Table compacte partagée par le processus (data_cleaner ne garde pas
+    # les DataFrames convertis): chargée une fois, hors sessions
+    store = get_listing_store(folder)
+    gc.collect()
+
+    held = []
+    rss = [current_rss_mb()]
+    for _ in range(sessions):
+        if mode == "copie":
+            held.append(load_csv(folder))
+        else:
+            held.append(store.view())
+        gc.collect()
+        rss.append(current_rss_mb())
+    return store.num_rows, store.nbytes, rss
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scale", type=int, default=20)
+    parser.add_argument("--sessions", type=int, default=10)
+    args = parser.parse_args()
+
+    ctx = multiprocessing.get_context("spawn")
+    folder = tempfile.mkdtemp()
+    try:
+        make_dataset(folder, args.scale)
+        print(f"{'mode':<8}{'lignes':>9}{'RSS initial (Mo)':>18}{'RSS final (Mo)':>16}{'Mo/session':>12}")
+        for mode in ("copie", "store"):
+            with ctx.Pool(1) as pool:
+                rows, nbytes, rss = pool.apply(measure, (mode, folder, args.sessions))
+            per_session = (rss[-1] - rss[0]) / args.sessions
+            print(f"{mode:<8}{rows:>9}{rss[0]:>18.1f}{rss[-1]:>16.1f}{per_session:>12.2f}")
+        print(f"\ntable partagée (listing_store): {nbytes / 1024 / 1024:.1f} Mo")
+    finally:
+        shutil.rmtree(folder)
+
+
+if __name__ == "__main__":
+    main()
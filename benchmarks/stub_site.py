@@ -0,0 +1,206 @@
+"""
+Faux site Coinafrique servi en local pour les benchmarks.
+
+Le serveur imite la structure HTML des pages de catégorie et d'annonce et
+ajoute une latence configurable à chaque réponse. Il peut aussi injecter
+des pannes: erreurs 503, limitations 429 avec Retry-After, réponses qui
+pendent, panne complète pendant une période, et erreurs quand trop de
+requêtes sont en cours (site surchargé).
+"""
+
+import hashlib
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+ADS_PER_PAGE = 20
+
+
+def listing_html(slug, page, ads_per_page=ADS_PER_PAGE):
+    """Génère une page de catégorie avec ses cartes d'annonces."""
+    cards = []
+    for i in range(ads_per_page):
+        ad_id = page * 1000 + i
+        cards.append(
+            f'<div class="col s6 m4 l3"><div class="card ad__card">'
+            f'<a href="/annonce/{slug}/annonce-{ad_id}">'
+            f'<img src="https://images.coinafrique.com/{ad_id}_thumb.jpg" class="ad__card-img">'
+            f"</a>"
+            f'<p class="ad__card-price">{(i + 1) * 25} 000 CFA</p>'
+            f'<p class="ad__card-description">Annonce {ad_id}</p>'
+            f'<p class="ad__card-location"><span>Dakar, Sénégal</span></p>'
+            f"</div></div>"
+        )
+    return (
+        "<html><head><title>Coinafrique</title></head><body>"
+        '<div class="row adcard__listing">' + "".join(cards) + "</div>"
+        "</body></html>"
+    )
+
+
+def ad_html(ad_id, filler_blocks=50):
+    """Génère la page de détail d'une annonce (filler_blocks règle sa taille)."""
+    filler = "<div class='block'><p>Lorem ipsum <a href='#'>dolor</a> sit amet.</p></div>" * filler_blocks
+    return (
+        "<html><head><title>Annonce</title></head><body>"
+        f"<div class='header'>{filler}</div>"
+        f'<div class="swiper-slide" style="background-image: '
+        f'url(&quot;https://images.coinafrique.com/{ad_id}_uploaded_image1.png&quot;); '
+        f'width: 410px;"></div>'
+        f"<h1>Annonce {ad_id}</h1>"
+        f'<p class="price">{(ad_id % 20 + 1) * 25} 000 CFA</p>'
+        f'<span data-address="Medina, Dakar, Sénégal">Medina</span>'
+        f"<div class='footer'>{filler}</div>"
+        "</body></html>"
+    )
+
+
+class StubSite:
+    """
+    Serveur HTTP local qui imite sn.coinafrique.com.
+
+    Args:
+        latency: Délai (secondes) ajouté à chaque réponse
+        ads_per_page: Nombre d'annonces par page de catégorie
+        filler_blocks: Taille des pages d'annonces (voir ad_html)
+        error_rate: Proportion de réponses 503 (sans Retry-After)
+        throttle_rate: Proportion de réponses 429 avec Retry-After
+        retry_after: Valeur (secondes) du Retry-After des 429
+        hang_rate: Proportion de réponses retardées de hang secondes
+        hang: Délai (secondes) des réponses qui pendent
+        outage: Période (début, fin), en secondes depuis le démarrage, où
+            toutes les requêtes reçoivent une 503
+        capacity: Requêtes simultanées au-delà desquelles le site répond 503
+            (et chaque requête en cours ajoute latency à la réponse)
+        seed: Graine du tirage des pannes
+    """
+
+    def __init__(
+        self,
+        latency=0.05,
+        ads_per_page=ADS_PER_PAGE,
+        filler_blocks=50,
+        error_rate=0.0,
+        throttle_rate=0.0,
+        retry_after=1,
+        hang_rate=0.0,
+        hang=30.0,
+        outage=None,
+        capacity=None,
+        seed=0,
+    ):
+        self.latency = latency
+        self.ads_per_page = ads_per_page
+        self.filler_blocks = filler_blocks
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self.hang_rate = hang_rate
+        self.hang = hang
+        self.outage = outage
+        self.capacity = capacity
+        self.requests = 0
+        self.statuses = {}  # statut HTTP -> nombre de réponses
+        self.in_flight = 0
+        self._random = random.Random(seed)
+        self._started = time.monotonic()
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), self._make_handler())
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address
+        return f"http://{host}:{port}"
+
+    def category_url(self, slug="chiens"):
+        return f"{self.base_url}/categorie/{slug}"
+
+    def fault(self, in_flight):
+        """Panne à injecter: (statut, en-têtes, délai) ou None."""
+        with self._lock:
+            draw = self._random.random()
+        elapsed = time.monotonic() - self._started
+        if self.outage and self.outage[0] <= elapsed < self.outage[1]:
+            return 503, {}, 0.0
+        if self.capacity is not None and in_flight > self.capacity:
+            return 503, {}, 0.0
+        if draw < self.throttle_rate:
+            return 429, {"Retry-After": str(self.retry_after)}, 0.0
+        draw -= self.throttle_rate
+        if draw < self.error_rate:
+            return 503, {}, 0.0
+        draw -= self.error_rate
+        if draw < self.hang_rate:
+            return None, {}, self.hang
+        return None
+
+    def handle(self, handler):
+        """Construit la réponse (status, headers, body) pour une requête."""
+        parts = urlsplit(handler.path)
+        segments = parts.path.strip("/").split("/")
+        if segments[0] == "categorie" and len(segments) == 2:
+            page = int(parse_qs(parts.query).get("page", ["1"])[0])
+            body = listing_html(segments[1], page, self.ads_per_page)
+        elif segments[0] == "annonce" and len(segments) == 3:
+            body = ad_html(int(segments[2].rsplit("-", 1)[-1]), self.filler_blocks)
+        else:
+            return 404, {}, b"not found"
+        body = body.encode()
+        etag = '"' + hashlib.md5(body).hexdigest() + '"'
+        if handler.headers.get("If-None-Match") == etag:
+            return 304, {"ETag": etag}, b""
+        return 200, {"Content-Type": "text/html; charset=utf-8", "ETag": etag}, body
+
+    def _make_handler(self):
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                with site._lock:
+                    site.requests += 1
+                    site.in_flight += 1
+                    in_flight = site.in_flight
+                try:
+                    fault = site.fault(in_flight)
+                    load = in_flight if site.capacity is not None else 1
+                    time.sleep(site.latency * load + (fault[2] if fault else 0.0))
+                    if fault and fault[0] is not None:
+                        status, headers, body = fault[0], fault[1], b"unavailable"
+                    else:
+                        status, headers, body = site.handle(self)
+                finally:
+                    with site._lock:
+                        site.in_flight -= 1
+                with site._lock:
+                    site.statuses[status] = site.statuses.get(status, 0) + 1
+                try:
+                    self.send_response(status)
+                    for name, value in headers.items():
+                        self.send_header(name, value)
+                    if status != 304:
+                        self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                except (BrokenPipeError, ConnectionResetError):
+                    # Le client a abandonné la requête (timeout)
+                    self.close_connection = True
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
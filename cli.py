@@ -0,0 +1,306 @@
+"""
+Point d'entrée en ligne de commande pour les scrapings planifiés (cron).
+
+Exemples:
+    coinafrique-scrape --pages 5
+    coinafrique-scrape -c chiens -c moutons --pages 1-20 --workers 8 --format parquet
+    coinafrique-scrape --incremental --pages 50 --summary run.json
+    coinafrique-scrape --mode cards --pages 1-200
+    coinafrique-scrape --pages 5 --metrics-prom /var/lib/node_exporter/coinafrique.prom
+
+Les annonces sont écrites au fil des pages: relancé avec les mêmes options,
+un scraping interrompu reprend après la dernière page écrite (voir
+sinks.scrape_to_file).
+
+Ce module n'importe pas Streamlit pour garder un démarrage rapide.
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+
+from ad_index import SeenAdsIndex
+from listings_db import get_listings_db
+from metrics import get_metrics
+from parsers import DEFAULT_BACKEND, available_backends
+from resilience import RetryPolicy
+from scraper import CATEGORY_URLS, EXTRACTION_MODES, category_slug
+from sinks import output_path, scrape_to_file
+from snapshots import SnapshotStore
+
+# Codes de sortie
+EXIT_OK = 0
+EXIT_PARTIAL = 1  # des pages ou annonces ont échoué
+EXIT_USAGE = 2  # arguments invalides (argparse)
+EXIT_FAILED = 3  # aucune annonce récupérée et des erreurs
+EXIT_INTERRUPTED = 130
+
+DEFAULT_DATA_DIR = "webscraper_data"
+
+# Sous-dossier (dans le dossier de données) des index d'annonces déjà vues
+SEEN_ADS_DIRNAME = ".seen_ads"
+
+logger = logging.getLogger(__name__)
+
+
+def resolve_category(value: str) -> str:
+    """Accepte le nom d'une catégorie ou son identifiant d'URL."""
+    for category in CATEGORY_URLS:
+        if value.lower() in (category.lower(), category_slug(category)):
+            return category
+    choices = ", ".join(category_slug(c) for c in CATEGORY_URLS)
+    raise argparse.ArgumentTypeError(f"catégorie inconnue: {value} (choix: {choices})")
+
+
+def parse_page_range(value: str) -> tuple[int, int]:
+    """Convertit "N" en (1, N) et "A-B" en (A, B)."""
+    try:
+        if "-" in value:
+            start, end = (int(part) for part in value.split("-", 1))
+        else:
+            start, end = 1, int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"plage de pages invalide: {value}")
+    if start < 1 or end < start:
+        raise argparse.ArgumentTypeError(f"plage de pages invalide: {value}")
+    return start, end
+
+
+def int_at_least(minimum: int):
+    """Type argparse: entier supérieur ou égal à minimum."""
+
+    def parse(value: str) -> int:
+        try:
+            number = int(value)
+        except ValueError:
+            raise argparse.ArgumentTypeError(f"entier invalide: {value}")
+        if number < minimum:
+            raise argparse.ArgumentTypeError(f"doit être supérieur ou égal à {minimum}: {value}")
+        return number
+
+    return parse
+
+
+def seen_ads_index(data_dir: str, category: str) -> SeenAdsIndex:
+    """Index des annonces déjà scrapées, rangé dans le dossier de données."""
+    slug = category_slug(category)
+    index = SeenAdsIndex(slug, path=os.path.join(data_dir, SEEN_ADS_DIRNAME, f"{slug}.json"))
+    if not index.exists:
+        index.seed_from_csv(data_dir)
+    return index
+
+
+def scrape_one(category: str, args) -> dict:
+    """Scrape une catégorie et écrit le résultat; retourne son résumé."""
+    errors = {"page": 0, "annonce": 0}
+
+    def on_error(kind, url):
+        errors[kind] += 1
+
+    # Historique des runs, et base d'annonces sauf --no-db
+    stores = [SnapshotStore(args.data_dir)]
+    if not args.no_db:
+        stores.append(get_listings_db(args.data_dir))
+
+    # Index enregistré seulement après l'écriture du fichier de sortie
+    seen_index = seen_ads_index(args.data_dir, category) if args.incremental else None
+
+    # Annonces écrites au fil des pages: un scraping interrompu reprend à la
+    # dernière page écrite au lancement suivant (voir sinks.scrape_to_file)
+    start_page, end_page = args.pages
+    path = output_path(args.data_dir, category, args.format)
+    started = time.perf_counter()
+    ads = scrape_to_file(
+        category,
+        end_page,
+        path,
+        append=args.incremental,
+        start_page=start_page,
+        max_workers=args.workers,
+        requests_per_second=args.rps,
+        incremental=args.incremental,
+        seen_index=seen_index,
+        parser_backend=args.backend,
+        error_callback=on_error,
+        stores=stores,
+        retry_policy=RetryPolicy(max_attempts=args.retries + 1),
+        adaptive_concurrency=not args.fixed_concurrency,
+        mode=args.mode,
+        parse_processes=args.parse_processes,
+    )
+    elapsed = time.perf_counter() - started
+    run = get_metrics().runs(last=1)[0]
+    if seen_index is not None:
+        seen_index.save()
+
+    return {
+        "category": category,
+        "output": path,
+        "pages": run["pages"],
+        "ads": ads,
+        "page_errors": errors["page"],
+        "ad_errors": errors["annonce"],
+        "elapsed": round(elapsed, 3),
+        "ads_per_second": round(ads / elapsed, 3) if elapsed else 0.0,
+        "requests": run["requests"],
+        "retries": run["retries"],
+        "bytes": run["bytes"],
+        "errors_by_type": run["errors"],
+    }
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="coinafrique-scrape",
+        description="Scrape les annonces Coinafrique et les enregistre dans le dossier de données.",
+    )
+    parser.add_argument(
+        "-c",
+        "--category",
+        dest="categories",
+        action="append",
+        type=resolve_category,
+        help="Catégorie à scraper (nom ou identifiant d'URL, répétable; toutes par défaut)",
+    )
+    parser.add_argument(
+        "-p",
+        "--pages",
+        type=parse_page_range,
+        default=(1, 1),
+        help='Pages à scraper: "N" (1 à N) ou "A-B" (défaut: 1)',
+    )
+    parser.add_argument(
+        "-w", "--workers", type=int_at_least(1), default=4, help="Requêtes simultanées (défaut: 4)"
+    )
+    parser.add_argument(
+        "--rps", type=float, default=None, help="Requêtes par seconde maximum par hôte"
+    )
+    parser.add_argument(
+        "--mode",
+        choices=EXTRACTION_MODES,
+        default="detail",
+        help="Extraction: page de chaque annonce (detail) ou cartes du listing seules "
+        "(cards, une requête par page)",
+    )
+    parser.add_argument(
+        "--parse-processes",
+        type=int_at_least(0),
+        default=0,
+        help="Processus de parsing des pages d'annonces (défaut: 0, parsing dans les threads)",
+    )
+    parser.add_argument(
+        "--retries",
+        type=int_at_least(0),
+        default=3,
+        help="Nouvelles tentatives par requête en cas d'erreur temporaire (défaut: 3)",
+    )
+    parser.add_argument(
+        "--fixed-concurrency",
+        action="store_true",
+        help="Garder --workers requêtes simultanées au lieu de les ajuster à la santé du site",
+    )
+    parser.add_argument(
+        "-f", "--format", choices=["csv", "parquet"], default="csv", help="Format de sortie"
+    )
+    parser.add_argument(
+        "-o", "--data-dir", default=DEFAULT_DATA_DIR, help="Dossier de sortie"
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Ne récupérer que les nouvelles annonces et les ajouter aux fichiers existants",
+    )
+    parser.add_argument(
+        "--backend",
+        choices=available_backends(),
+        default=DEFAULT_BACKEND,
+        help="Backend de parsing HTML",
+    )
+    parser.add_argument(
+        "--no-db",
+        action="store_true",
+        help="Ne pas écrire les annonces dans la base d'annonces du dossier de sortie",
+    )
+    parser.add_argument(
+        "--summary", help="Fichier où écrire le résumé JSON (sinon sur la sortie standard)"
+    )
+    parser.add_argument(
+        "--metrics-jsonl", help="Fichier JSONL où ajouter les mesures de chaque scraping"
+    )
+    parser.add_argument(
+        "--metrics-prom",
+        help="Fichier texte Prometheus des mesures (collecteur textfile de node_exporter)",
+    )
+    verbosity = parser.add_mutually_exclusive_group()
+    verbosity.add_argument(
+        "-q", "--quiet", action="store_true", help="Masquer la progression du scraping"
+    )
+    verbosity.add_argument(
+        "-v", "--verbose", action="store_true", help="Afficher le détail de chaque annonce"
+    )
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    args = build_parser().parse_args(argv)
+    categories = args.categories or list(CATEGORY_URLS)
+    os.makedirs(args.data_dir, exist_ok=True)
+
+    # Les logs partent sur stderr: stdout reste réservé au résumé JSON
+    level = logging.ERROR if args.quiet else logging.DEBUG if args.verbose else logging.INFO
+    logging.basicConfig(
+        level=level, stream=sys.stderr, format="%(asctime)s %(levelname)s %(name)s: %(message)s"
+    )
+    get_metrics().configure(jsonl_path=args.metrics_jsonl, prometheus_path=args.metrics_prom)
+
+    started = time.perf_counter()
+    results = []
+    exit_code = EXIT_OK
+    try:
+        for category in categories:
+            try:
+                results.append(scrape_one(category, args))
+            except Exception as e:
+                results.append({"category": category, "error": str(e)})
+    except KeyboardInterrupt:
+        exit_code = EXIT_INTERRUPTED
+
+    elapsed = time.perf_counter() - started
+    ads = sum(r.get("ads", 0) for r in results)
+    errors = sum(
+        r.get("page_errors", 0) + r.get("ad_errors", 0) + ("error" in r) for r in results
+    )
+    summary = {
+        "status": "ok",
+        "categories": results,
+        "pages": sum(r.get("pages", 0) for r in results),
+        "ads": ads,
+        "errors": errors,
+        "elapsed": round(elapsed, 3),
+        "ads_per_second": round(ads / elapsed, 3) if elapsed else 0.0,
+    }
+
+    if exit_code == EXIT_OK and errors:
+        exit_code = EXIT_PARTIAL if ads else EXIT_FAILED
+    summary["status"] = {
+        EXIT_OK: "ok",
+        EXIT_PARTIAL: "partial",
+        EXIT_FAILED: "failed",
+        EXIT_INTERRUPTED: "interrupted",
+    }[exit_code]
+    summary["exit_code"] = exit_code
+
+    text = json.dumps(summary, ensure_ascii=False, indent=2)
+    if args.summary:
+        with open(args.summary, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,153 @@
+import os
+import threading
+from collections import OrderedDict
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.feather as feather
+
+from data_store import build_store_file
+
+# Nombre de lignes par page par défaut
+DEFAULT_PAGE_SIZE = 50
+
+# Nombre d'index (filtre + tri) gardés en mémoire
+INDEX_CACHE_SIZE = 32
+
+
+class _TableCache:
+    """Tables Arrow ouvertes par memory-map, rouvertes si le fichier change."""
+
+    def __init__(self):
+        self._tables = {}
+        self._lock = threading.Lock()
+
+    def get(self, path):
+        mtime = os.stat(path).st_mtime_ns
+        with self._lock:
+            cached = self._tables.get(path)
+            if cached is None or cached[0] != mtime:
+                cached = (mtime, feather.read_table(path, memory_map=True))
+                self._tables[path] = cached
+            return cached
+
+
+_tables = _TableCache()
+
+# (fichier, version, filtres, tri) -> indices des lignes, dans l'ordre d'affichage
+_indices = OrderedDict()
+_indices_lock = threading.Lock()
+
+
+def open_table(data_folder: str, filename: str) -> pa.Table:
+    """
+    Table Arrow (memory-map) d'un fichier source, compacté au besoin.
+
+    Aucune donnée n'est copiée: les colonnes sont lues depuis le fichier à
+    la demande.
+    """
+    return _tables.get(build_store_file(data_folder, filename))[1]
+
+
+def _decode(column: pa.ChunkedArray) -> pa.ChunkedArray:
+    if pa.types.is_dictionary(column.type):
+        return column.cast(column.type.value_type)
+    return column
+
+
+def _contains(column: pa.ChunkedArray, text: str) -> pa.ChunkedArray:
+    """Masque des lignes dont la valeur contient `text` (sans casse)."""
+    chunks = []
+    for chunk in column.chunks:
+        if pa.types.is_dictionary(chunk.type):
+            # Tester chaque valeur distincte une fois, puis propager par les codes
+            matches = _contains(pa.chunked_array([chunk.dictionary]), text)
+            chunks.append(matches.combine_chunks().take(chunk.indices))
+        else:
+            if not pa.types.is_string(chunk.type) and not pa.types.is_large_string(chunk.type):
+                chunk = chunk.cast(pa.string())
+            chunks.append(pc.match_substring(chunk, text, ignore_case=True))
+    return pa.chunked_array(chunks, type=pa.bool_())
+
+
+def _row_indices(table, filters, sort_by, ascending):
+    """Indices des lignes filtrées puis triées (None: toutes, ordre du fichier)."""
+    indices = None
+    if filters:
+        mask = None
+        for column, text in filters:
+            matches = _contains(table[column], text)
+            mask = matches if mask is None else pc.and_kleene(mask, matches)
+        indices = pc.indices_nonzero(pc.fill_null(mask, False))
+
+    if sort_by:
+        key = _decode(table[sort_by])
+        if indices is not None:
+            key = key.take(indices)
+        order = pc.array_sort_indices(
+            key, order="ascending" if ascending else "descending", null_placement="at_end"
+        )
+        indices = order if indices is None else indices.take(order)
+    return indices
+
+
+def query_page(
+    data_folder: str,
+    filename: str,
+    page: int = 1,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    filters: dict | None = None,
+    sort_by: str | None = None,
+    ascending: bool = True,
+):
+    """
+    Retourne une page de lignes d'un fichier de données.
+
+    Le filtre et le tri s'exécutent sur la table Arrow (memory-map); les
+    indices obtenus sont gardés en cache, si bien qu'un changement de page
+    ne lit que les lignes de la page.
+
+    Args:
+        data_folder: Dossier des données
+        filename: Nom du fichier source
+        page: Numéro de page (à partir de 1)
+        page_size: Nombre de lignes par page
+        filters: Colonne -> texte recherché (contient, sans casse)
+        sort_by: Colonne de tri (None: ordre du fichier)
+        ascending: Sens du tri
+
+    Returns:
+        tuple: (DataFrame de la page, nombre total de lignes après filtre)
+    """
+    path = build_store_file(data_folder, filename)
+    version, table = _tables.get(path)
+    filters = tuple(sorted((c, t) for c, t in (filters or {}).items() if t))
+    cache_key = (path, version, filters, sort_by, ascending)
+
+    with _indices_lock:
+        cached = _indices.get(cache_key, False)
+        if cached is not False:
+            _indices.move_to_end(cache_key)
+    if cached is False:
+        cached = _row_indices(table, filters, sort_by, ascending)
+        with _indices_lock:
+            _indices[cache_key] = cached
+            while len(_indices) > INDEX_CACHE_SIZE:
+                _indices.popitem(last=False)
+
+    total = table.num_rows if cached is None else len(cached)
+    start = max(page - 1, 0) * page_size
+    length = max(min(page_size, total - start), 0)
+    if cached is None or not length:
+        rows = table.slice(start, length)
+    else:
+        # Table.take concatène les chunks de chaque colonne (copie du fichier
+        # entier); des tranches d'une ligne restent des vues sur le memory-map
+        rows = pa.concat_tables(
+            [table.slice(i, 1) for i in cached.slice(start, length).to_pylist()]
+        )
+
+    df = rows.to_pandas()
+    df.index = range(start + 1, start + 1 + len(df))
+    return df, total
+
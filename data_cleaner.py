@@ -1,8 +1,19 @@
+import functools
+import hashlib
+import logging
 import os
 import re
+import threading
+import unicodedata
 
+import numpy as np
 import pandas as pd
-import streamlit as st
+
+import data_store
+from ad_index import AD_ID_RE, AD_SLUG_RE
+from sources import file_fingerprint, list_sources
+
+logger = logging.getLogger(__name__)
 
 
 def clean_price(price_str):
@@ -34,6 +45,58 @@ def clean_price(price_str):
     return None
 
 
+# Séparateurs de milliers ("250 000", "250.000", "250,000", espaces insécables)
+THOUSANDS_SEPARATORS = (" ", ".", ",", "\u00a0", "\u202f")
+
+# Premier montant d'un texte de prix (ex: borne basse d'une fourchette)
+PRICE_AMOUNT_RE = r"(\d{1,3}(?:[ .,\u00a0\u202f]\d{3})+|\d+)"
+
+
+def parse_prices(prices):
+    """
+    Convertit une colonne de prix en valeurs numériques (version vectorisée).
+
+    Gère les séparateurs de milliers, les suffixes "CFA"/"FCFA" et les
+    fourchettes ("100 000 - 150 000 CFA" donne la borne basse). Chaque
+    valeur distincte n'est analysée qu'une fois; les formats usuels passent
+    par des opérations de chaînes simples, les autres par une regex.
+
+    Args:
+        prices: Series de prix (ex: "250 000 CFA", "Prix sur demande")
+
+    Returns:
+        DataFrame: colonnes prix_fcfa (float, NaN si absent) et on_request
+        (True pour "Prix sur demande"), même index que prices
+    """
+    # Analyser seulement les valeurs distinctes puis redistribuer
+    codes, uniques = pd.factorize(prices)
+    text = pd.Series(uniques, dtype="string[pyarrow]").str.lower()
+
+    on_request = text.str.contains("demande", regex=False).fillna(False)
+
+    # Cas usuel: "250 000 cfa" -> "250000"
+    amounts = text.str.strip(" fca\u00a0\u202f")
+    for sep in THOUSANDS_SEPARATORS:
+        amounts = amounts.str.replace(sep, "", regex=False)
+    is_number = amounts.str.isdigit().fillna(False)
+    values = amounts.where(is_number).astype("float64")
+
+    # Autres formats (fourchettes, texte libre): premier montant trouvé
+    rest = (~is_number & ~on_request).to_numpy(dtype=bool)
+    if rest.any():
+        first = text[rest].str.extract(PRICE_AMOUNT_RE, expand=False)
+        values[rest] = pd.to_numeric(
+            first.str.replace(r"\D", "", regex=True), errors="coerce"
+        ).astype("float64")
+
+    # Les codes -1 (valeurs manquantes) pointent vers une case NaN / False ajoutée
+    values = np.append(values.to_numpy(dtype="float64"), np.nan)
+    on_request = np.append(on_request.to_numpy(dtype=bool), False)
+    return pd.DataFrame(
+        {"prix_fcfa": values[codes], "on_request": on_request[codes]},
+        index=prices.index,
+    )
+
 
 def extract_image_url(image_style_str):
     """
@@ -56,28 +119,123 @@ def extract_image_url(image_style_str):
     return None
 
 
-def determine_category(filename):
+# URL dans un style CSS background-image (voir parsers.IMAGE_URL_RE)
+IMAGE_URL_RE = r"""url\(["']?([^"')]+)["']?\)"""
+
+
+def extract_image_urls(values):
     """
-    Détermine la catégorie depuis le nom du fichier.
+    Extrait les URLs d'images d'une colonne image_lien (version vectorisée).
+
+    Accepte les styles CSS des CSV Web Scraper
+    ('background-image: url("https://..."); width: 601px;') comme les URLs
+    déjà extraites par le scraper. Chaque valeur distincte n'est analysée
+    qu'une fois.
 
     Args:
-        filename: Nom du fichier (ex: "coinafrique_chiens_webscraper.csv")
+        values: Series de styles CSS ou d'URLs ("N/A" si absente)
 
     Returns:
-        str: Nom de la catégorie
-    """
-    filename_lower = filename.lower()
-
-    if "chien" in filename_lower:
-        return "Chiens"
-    elif "mouton" in filename_lower:
-        return "Moutons"
-    elif "poule" in filename_lower:
-        return "Poules, Lapins et Pigeons"
-    elif "autre" in filename_lower:
-        return "Autres"
-    else:
-        return "Non catégorisé"
+        Series: URL de l'image ou valeur manquante
+    """
+    codes, uniques = pd.factorize(values)
+    uniques = pd.Series(uniques, dtype="string")
+    urls = uniques.str.extract(IMAGE_URL_RE, expand=False)
+    plain = uniques.str.match(r"https?://") & urls.isna()
+    urls = urls.where(~plain, uniques)
+    # Case finale pour les valeurs manquantes (code -1)
+    lookup = pd.concat([urls, pd.Series([pd.NA], dtype="string")], ignore_index=True)
+    return pd.Series(lookup.to_numpy()[codes], index=values.index, dtype="string")
+
+
+# Niveaux de la hiérarchie des adresses ("Point E, Dakar, Sénégal")
+LOCATION_LEVELS = ("pays", "ville", "quartier")
+
+
+@functools.lru_cache(maxsize=4096)
+def parse_address(address):
+    """
+    Découpe une adresse en (pays, ville, quartier).
+
+    Les adresses du site vont du plus précis au plus général:
+    "Point E, Dakar, Sénégal", "Thies, Sénégal" ou "Sénégal". Le résultat
+    est mis en cache par chaîne (quelques centaines d'adresses distinctes).
+
+    Args:
+        address: Adresse en texte libre
+
+    Returns:
+        tuple: (pays, ville, quartier), None pour les niveaux absents
+    """
+    if not isinstance(address, str):
+        return (None, None, None)
+
+    parts = [" ".join(part.split()) for part in address.split(",")]
+    parts = [part for part in parts if part]
+    if not parts:
+        return (None, None, None)
+
+    country = parts[-1]
+    city = parts[-2] if len(parts) >= 2 else None
+    neighborhood = ", ".join(parts[:-2]) if len(parts) >= 3 else None
+    return (country, city, neighborhood)
+
+
+def _location_key(name):
+    # Clé de rapprochement des variantes ("Guédiawaye"/"Guediawaye",
+    # "Dakar-Plateau"/"Dakar Plateau")
+    folded = unicodedata.normalize(
+        "NFKD", name.casefold().replace("œ", "oe").replace("æ", "ae")
+    )
+    return "".join(c for c in folded if c.isalnum())
+
+
+def normalize_locations(df):
+    """
+    Ajoute les colonnes catégorielles pays, ville et quartier depuis adresse.
+
+    Chaque adresse distincte n'est analysée qu'une fois; les variantes
+    d'écriture d'un même lieu (accents, tirets, casse) sont regroupées sous
+    leur orthographe la plus fréquente. Les colonnes produites sont des
+    catégorielles: les regroupements se font sur leurs codes entiers.
+
+    Args:
+        df: DataFrame avec une colonne adresse
+
+    Returns:
+        DataFrame: Copie de df avec les colonnes pays, ville et quartier
+    """
+    df = df.copy()
+    codes, uniques = pd.factorize(df["adresse"])
+    counts = np.bincount(codes[codes >= 0], minlength=len(uniques))
+    parsed = [parse_address(address) for address in uniques]
+
+    for level, name in enumerate(LOCATION_LEVELS):
+        values = [p[level] for p in parsed]
+
+        # Orthographe retenue pour chaque clé: la plus fréquente
+        spellings = {}
+        for value, count in zip(values, counts):
+            if value is not None:
+                by_spelling = spellings.setdefault(_location_key(value), {})
+                by_spelling[value] = by_spelling.get(value, 0) + count
+        canonical = {key: max(v, key=v.get) for key, v in spellings.items()}
+        categories = sorted(set(canonical.values()))
+        category_code = {value: code for code, value in enumerate(categories)}
+
+        # Code de catégorie de chaque adresse distincte (-1 si niveau absent),
+        # plus une case finale pour les adresses manquantes (code -1)
+        lookup = np.array(
+            [
+                category_code[canonical[_location_key(v)]] if v is not None else -1
+                for v in values
+            ]
+            + [-1],
+            dtype="int32",
+        )
+        df[name] = pd.Categorical.from_codes(lookup[codes], categories=categories)
+
+    return df
 
 
 def clean_dataframe(df):
@@ -92,6 +250,26 @@ def clean_dataframe(df):
     """
     df_clean = df.copy()
 
+    # Identifiant et titre de l'annonce (depuis son URL), date du scraping
+    # (préfixe epoch de web_scraper_order) et URL de l'image, avant de
+    # supprimer ces colonnes. (Dans les exports Web Scraper, Nom est le nom
+    # du vendeur: le titre n'apparaît que dans l'URL.)
+    if "container_urls" in df_clean.columns:
+        urls = df_clean["container_urls"].astype("string")
+        df_clean["ad_id"] = pd.to_numeric(
+            urls.str.extract(AD_ID_RE, expand=False)
+        ).astype("Int64")
+        df_clean["titre"] = (
+            urls.str.extract(AD_SLUG_RE, expand=False).str.replace("-", " ").astype("category")
+        )
+    if "web_scraper_order" in df_clean.columns:
+        epoch = df_clean["web_scraper_order"].astype("string").str.extract(r"^(\d+)", expand=False)
+        df_clean["scraped_at"] = pd.to_datetime(
+            pd.to_numeric(epoch), unit="s", errors="coerce"
+        )
+    if "image_lien" in df_clean.columns:
+        df_clean["image_url"] = extract_image_urls(df_clean["image_lien"])
+
     # Supprimer les colonnes techniques et inutiles
     columns_to_drop = [
         'web_scraper_order',
@@ -101,12 +279,98 @@ def clean_dataframe(df):
     ]
     df_clean = df_clean.drop(columns=[col for col in columns_to_drop if col in df_clean.columns])
 
+    # Prix numérique et indicateur "Prix sur demande"
+    if "prix" in df_clean.columns:
+        df_clean[["prix_fcfa", "on_request"]] = parse_prices(df_clean["prix"])
+
     return df_clean
 
-@st.cache_data
+# Colonnes utilisées par l'application (les autres ne sont jamais lues)
+LOAD_COLUMNS = [
+    "Nom",
+    "prix",
+    "adresse",
+    "categorie",
+    "container_urls",
+    "web_scraper_order",
+    "image_lien",
+]
+
+
+def deduplicate_ads(df):
+    """
+    Garde une seule ligne par annonce (ad_id), la plus récente.
+
+    La plus récente est celle dont scraped_at est le plus grand; à égalité,
+    la dernière dans l'ordre du DataFrame. Les lignes sans identifiant sont
+    toutes gardées. Le regroupement se fait par hachage des identifiants
+    (temps linéaire, sans tri).
+
+    Args:
+        df: DataFrame combiné avec les colonnes ad_id, scraped_at et source
+
+    Returns:
+        tuple: (DataFrame dédoublonné, DataFrame du nombre de lignes, de
+        lignes gardées et de doublons par source)
+    """
+    has_id = df["ad_id"].notna().to_numpy()
+    codes, _ = pd.factorize(df["ad_id"])
+    recency = df["scraped_at"].to_numpy("datetime64[ns]").view("int64")
+
+    # Position de la ligne la plus récente de chaque annonce: parcours à
+    # l'envers pour qu'à égalité idxmax retienne la dernière ligne
+    positions = np.flatnonzero(has_id)[::-1]
+    latest = (
+        pd.Series(recency[positions], index=positions)
+        .groupby(codes[positions], sort=False)
+        .idxmax()
+        .to_numpy()
+    )
+    keep = ~has_id
+    keep[latest] = True
+
+    sources = df["source"]
+    rows = sources.value_counts(sort=False)
+    kept = sources[keep].value_counts(sort=False)
+    report = pd.DataFrame({"lignes": rows, "gardees": kept.reindex(rows.index, fill_value=0)})
+    report["doublons"] = report["lignes"] - report["gardees"]
+    report = report[report["lignes"] > 0].rename_axis("source").reset_index()
+
+    return df[keep].reset_index(drop=True), report
+
+
+# Empreintes des fichiers sources (voir data_version): chemin -> empreinte
+_fingerprints = {}
+_fingerprints_lock = threading.Lock()
+
+
+def _load_clean_file(data_folder, filename):
+    store_file = data_store.build_store_file(data_folder, filename)
+    df = clean_dataframe(data_store.read_store_file(store_file, LOAD_COLUMNS))
+    df["source"] = pd.Categorical([filename] * len(df))
+
+    # Sorties du scraper (sans web_scraper_order): date du fichier source
+    mtime = pd.Timestamp(os.path.getmtime(os.path.join(data_folder, filename)), unit="s")
+    if "scraped_at" in df.columns:
+        df["scraped_at"] = df["scraped_at"].fillna(mtime)
+    else:
+        df["scraped_at"] = mtime
+    return df
+
+
 def load_and_clean_all_data(data_folder="webscraper_data"):
     """
-    Charge et nettoie tous les fichiers CSV du dossier.
+    Charge et nettoie tous les fichiers de données du dossier.
+
+    Chaque fichier source (CSV ou Parquet) est d'abord compacté dans un
+    fichier Arrow (voir data_store), reconstruit seulement s'il a changé;
+    seules les colonnes LOAD_COLUMNS sont ensuite lues. Les DataFrames ne
+    sont pas gardés en mémoire: les appelants qui les réutilisent en font
+    leur propre copie (voir listing_store).
+
+    Les annonces présentes dans plusieurs fichiers (ou plusieurs fois dans
+    un fichier) ne sont gardées qu'une fois, dans leur version la plus
+    récente (voir deduplicate_ads).
 
     Args:
         data_folder: Chemin du dossier contenant les CSV
@@ -114,36 +378,91 @@ def load_and_clean_all_data(data_folder="webscraper_data"):
     Returns:
         DataFrame: DataFrame combiné et nettoyé
     """
-    if not os.path.exists(data_folder):
-        return pd.DataFrame()
+    all_dfs = []
 
-    csv_files = [f for f in os.listdir(data_folder) if f.endswith(".csv")]
+    for filename in list_sources(data_folder):
+        try:
+            all_dfs.append(_load_clean_file(data_folder, filename))
+        except Exception as e:
+            logger.error("Erreur lors du chargement de %s: %s", filename, e)
+            continue
 
-    if not csv_files:
+    if not all_dfs:
         return pd.DataFrame()
 
-    all_dfs = []
+    # Combiner tous les DataFrames, dédoublonner et normaliser les adresses
+    combined_df = data_store.concat_frames(all_dfs)
+    if "ad_id" in combined_df.columns:
+        combined_df, _ = deduplicate_ads(combined_df)
+    if "adresse" in combined_df.columns:
+        combined_df = normalize_locations(combined_df)
 
-    for filename in csv_files:
-        file_path = os.path.join(data_folder, filename)
-        try:
-            df = pd.read_csv(file_path)
-            df_clean = clean_dataframe(df)
+    return combined_df
 
-            # Ajouter la colonne catégorie basée sur le nom du fichier
-            df_clean["categorie"] = determine_category(filename)
 
-            all_dfs.append(df_clean)
-        except Exception as e:
-            print(f"Erreur lors du chargement de {filename}: {e}")
-            continue
+def data_version(data_folder="webscraper_data"):
+    """
+    Identifiant de la version des données chargées.
 
-    if all_dfs:
-        # Combiner tous les DataFrames
-        combined_df = pd.concat(all_dfs, ignore_index=True)
+    Change dès qu'un fichier source est ajouté, modifié ou supprimé (mais
+    pas si seul son mtime change); sert de clé aux caches dérivés des
+    données (agrégats, exports...).
 
-        return combined_df
+    Les données ne sont pas chargées: seules les empreintes des fichiers
+    sont calculées (hash recalculé seulement si la taille ou le mtime ont
+    changé).
+
+    Returns:
+        str: Hash des noms et contenus des fichiers du dossier
+    """
+    content_keys = []
+    with _fingerprints_lock:
+        for filename in list_sources(data_folder):
+            path = os.path.join(data_folder, filename)
+            try:
+                fingerprint = file_fingerprint(path, _fingerprints.get(path))
+            except OSError:
+                continue
+            _fingerprints[path] = fingerprint
+            content_keys.append((filename, fingerprint[3]))
+    key = (data_folder, tuple(content_keys)) if content_keys else ()
+    return hashlib.blake2b(repr(key).encode(), digest_size=8).hexdigest()
 
-    return pd.DataFrame()
 
+_sync_lock = threading.Lock()
 
+
+def sync_database(data_folder="webscraper_data"):
+    """
+    Écrit dans la base d'annonces (voir listings_db) les fichiers sources
+    ajoutés ou modifiés depuis la dernière synchronisation.
+
+    Les empreintes des fichiers sont gardées dans la base: un appel sans
+    changement ne coûte qu'un stat par fichier. Les fichiers supprimés ne
+    sont pas retirés de la base (historique).
+
+    Returns:
+        ListingsDB: Base du dossier
+    """
+    import listings_db
+
+    db = listings_db.get_listings_db(data_folder)
+    with _sync_lock:
+        known = db.source_fingerprints()
+        for filename in list_sources(data_folder):
+            try:
+                previous = known.get(filename)
+                fingerprint = file_fingerprint(os.path.join(data_folder, filename), previous)
+                if fingerprint == previous:
+                    continue
+                if previous is not None and fingerprint[3] == previous[3]:
+                    # Seul le mtime a changé
+                    db.set_source_fingerprint(filename, fingerprint)
+                    continue
+                df = _load_clean_file(data_folder, filename)
+                if "adresse" in df.columns:
+                    df = normalize_locations(df)
+                db.upsert(df, filename, fingerprint)
+            except Exception as e:
+                logger.error("Erreur lors de l'écriture de %s dans la base: %s", filename, e)
+    return db
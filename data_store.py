@@ -0,0 +1,154 @@
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+from pandas.api.types import union_categoricals
+
+from sources import determine_category, file_fingerprint, list_sources, read_source
+
+# Sous-dossier (dans le dossier de données) des fichiers compactés
+STORE_DIRNAME = ".store"
+
+# Clés des métadonnées (schéma Arrow) décrivant le fichier source compacté
+SOURCE_METADATA_KEYS = (b"source_size", b"source_mtime_ns", b"source_hash")
+
+# Colonnes à faible cardinalité, stockées dictionnaire-encodées (catégorielles)
+# (source: fichier d'origine des lignes, ajoutée au chargement)
+CATEGORICAL_COLUMNS = ["categorie", "adresse", "prix", "web_scraper_start_url", "source"]
+
+
+def store_path(data_folder: str, filename: str) -> str:
+    """Chemin du fichier Arrow compacté correspondant à un fichier source."""
+    stem = os.path.splitext(filename)[0]
+    return os.path.join(data_folder, STORE_DIRNAME, f"{stem}.arrow")
+
+
+def compact_frame(df: pd.DataFrame, filename: str) -> pd.DataFrame:
+    """
+    Prépare un DataFrame brut pour le stockage colonne.
+
+    Ajoute la catégorie (depuis le nom du fichier) et convertit les colonnes
+    répétitives en catégorielles.
+
+    Args:
+        df: DataFrame lu depuis un fichier source
+        filename: Nom du fichier source
+
+    Returns:
+        DataFrame: DataFrame compacté
+    """
+    df = df.copy()
+    df["categorie"] = determine_category(filename)
+
+    for col in CATEGORICAL_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype("category")
+    return df
+
+
+def _stored_fingerprint(target: str, source: str) -> tuple | None:
+    """Empreinte du fichier source gardée dans le fichier Arrow (None si absente)."""
+    try:
+        with pa.memory_map(target) as f:
+            metadata = pa.ipc.open_file(f).schema.metadata or {}
+        size, mtime_ns, digest = (metadata[key] for key in SOURCE_METADATA_KEYS)
+    except (OSError, KeyError, pa.ArrowInvalid):
+        return None
+    return (source, int(size), int(mtime_ns), digest.decode())
+
+
+def _write_table(table: pa.Table, target: str, fingerprint: tuple) -> None:
+    metadata = dict(table.schema.metadata or {})
+    metadata.update(
+        zip(SOURCE_METADATA_KEYS, (str(value).encode() for value in fingerprint[1:]))
+    )
+    tmp_path = f"{target}.{os.getpid()}.tmp"
+    feather.write_feather(
+        table.replace_schema_metadata(metadata), tmp_path, compression="uncompressed"
+    )
+    os.replace(tmp_path, target)
+
+
+def build_store_file(data_folder: str, filename: str) -> str:
+    """
+    (Re)construit le fichier Arrow d'un fichier source si celui-ci a changé.
+
+    Le fichier Arrow garde dans ses métadonnées l'empreinte du fichier source
+    (taille, mtime, hash du contenu, voir sources.file_fingerprint). Le
+    hash n'est recalculé que si la taille ou le mtime ont changé; un source
+    remplacé par un contenu différent est recompacté même si son mtime est
+    plus ancien (cp -p, rsync -t, git checkout, sauvegarde restaurée).
+
+    Le fichier est écrit au format Arrow IPC non compressé, lisible par
+    memory-map, puis renommé (écriture atomique).
+
+    Args:
+        data_folder: Dossier contenant le fichier source
+        filename: Nom du fichier source
+
+    Returns:
+        str: Chemin du fichier Arrow
+    """
+    source = os.path.join(data_folder, filename)
+    target = store_path(data_folder, filename)
+    stored = _stored_fingerprint(target, source) if os.path.exists(target) else None
+    fingerprint = file_fingerprint(source, stored)
+    if fingerprint == stored:
+        return target
+
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    if stored is not None and fingerprint[3] == stored[3]:
+        # Même contenu (seul le mtime a changé): mettre à jour l'empreinte
+        # sans relire le fichier source
+        table = feather.read_table(target, memory_map=True)
+    else:
+        df = compact_frame(read_source(source), filename)
+        table = pa.Table.from_pandas(df, preserve_index=False)
+    _write_table(table, target, fingerprint)
+    return target
+
+
+def build_store(data_folder: str = "webscraper_data") -> list[str]:
+    """
+    Compacte tous les fichiers sources du dossier (seulement ceux modifiés).
+
+    Returns:
+        Liste des chemins des fichiers Arrow
+    """
+    return [build_store_file(data_folder, f) for f in list_sources(data_folder)]
+
+
+def read_store_file(path: str, columns: list[str] | None = None) -> pd.DataFrame:
+    """
+    Lit un fichier Arrow compacté par memory-map, seulement les colonnes demandées.
+
+    Args:
+        path: Chemin du fichier Arrow
+        columns: Colonnes à lire (les colonnes absentes sont ignorées)
+
+    Returns:
+        DataFrame: Colonnes demandées, catégorielles conservées
+    """
+    if columns is not None:
+        with pa.memory_map(path) as source:
+            names = pa.ipc.open_file(source).schema.names
+        columns = [c for c in columns if c in names]
+    table = feather.read_table(path, columns=columns, memory_map=True)
+    return table.to_pandas()
+
+
+def concat_frames(frames: list[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Concatène des DataFrames en conservant les colonnes catégorielles.
+
+    pd.concat convertit en object les catégorielles dont les catégories
+    diffèrent: on aligne d'abord les catégories de chaque colonne.
+    """
+    frames = [df.copy() for df in frames]
+    for col in CATEGORICAL_COLUMNS:
+        if all(isinstance(df.get(col), pd.Series) and df[col].dtype == "category" for df in frames):
+            categories = union_categoricals([df[col] for df in frames]).categories
+            for df in frames:
+                df[col] = df[col].cat.set_categories(categories)
+    return pd.concat(frames, ignore_index=True)
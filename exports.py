@@ -0,0 +1,177 @@
+import gzip
+import hashlib
+import json
+import os
+import threading
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from data_cleaner import sync_database
+from http_cache import CACHE_DIR
+from listings_db import where_clause
+
+EXPORT_DIR = os.path.join(CACHE_DIR, "exports")
+
+# Format -> (extension du fichier, type MIME)
+EXPORT_FORMATS = {
+    "csv": (".csv", "text/csv"),
+    "parquet": (".parquet", "application/vnd.apache.parquet"),
+    "jsonl": (".jsonl.gz", "application/gzip"),
+}
+
+# Lignes écrites par morceau
+CHUNK_ROWS = 50_000
+
+# Nombre d'exports gardés sur disque (les plus anciens sont supprimés)
+MAX_EXPORTS = 20
+
+# Verrous des exports (une seule construction par export à la fois): nombre
+# fixe, partagés par les clés de même hash (la mémoire ne grandit pas avec le
+# nombre d'exports)
+LOCK_STRIPES = 64
+_locks = [threading.Lock() for _ in range(LOCK_STRIPES)]
+
+
+def _key_lock(key):
+    return _locks[hash(key) % LOCK_STRIPES]
+
+
+def export_key(fmt, categories=None, price_range=None, cities=None, version=""):
+    """Identifiant d'un export: format, filtres et version des données."""
+    params = {
+        "format": fmt,
+        "categories": sorted(categories or []),
+        "price_range": list(price_range) if price_range else None,
+        "cities": sorted(cities or []),
+        "version": version,
+    }
+    text = json.dumps(params, sort_keys=True, ensure_ascii=False)
+    return hashlib.blake2b(text.encode(), digest_size=12).hexdigest()
+
+
+# Colonnes exportées et leur type (voir listings_db.COLUMNS)
+EXPORT_SCHEMA = pa.schema(
+    [
+        ("ad_id", pa.int64()),
+        ("Nom", pa.string()),
+        ("prix", pa.string()),
+        ("adresse", pa.string()),
+        ("categorie", pa.string()),
+        ("prix_fcfa", pa.float64()),
+        ("on_request", pa.bool_()),
+        ("pays", pa.string()),
+        ("ville", pa.string()),
+        ("quartier", pa.string()),
+        ("scraped_at", pa.timestamp("s")),
+        ("source", pa.string()),
+    ]
+)
+
+
+def iter_rows(db, categories=None, price_range=None, cities=None):
+    """
+    Annonces sélectionnées, lues dans la base par morceaux de CHUNK_ROWS lignes.
+
+    Args:
+        db: Base d'annonces (voir listings_db.ListingsDB)
+        categories, price_range, cities: Filtres (voir listings_db.where_clause)
+
+    Yields:
+        DataFrame: Morceau de l'export, colonnes de EXPORT_SCHEMA
+    """
+    names = ", ".join(f'"{name}"' for name in EXPORT_SCHEMA.names)
+    where, params = where_clause(categories, price_range, cities)
+    for chunk in db.iter_query(
+        f"SELECT {names} FROM listings{where} ORDER BY rowid", params, CHUNK_ROWS
+    ):
+        chunk["ad_id"] = chunk["ad_id"].astype("Int64")
+        chunk["on_request"] = chunk["on_request"].astype("boolean")
+        chunk["scraped_at"] = pd.to_datetime(chunk["scraped_at"], unit="s").dt.floor("s")
+        yield chunk
+
+
+def _write_csv(chunks, path):
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        f.write(",".join(EXPORT_SCHEMA.names) + "\n")
+        for chunk in chunks:
+            chunk.to_csv(f, index=False, header=False)
+
+
+def _write_parquet(chunks, path):
+    with pq.ParquetWriter(path, EXPORT_SCHEMA) as writer:
+        for chunk in chunks:
+            writer.write_table(
+                pa.Table.from_pandas(chunk, schema=EXPORT_SCHEMA, preserve_index=False)
+            )
+
+
+def _write_jsonl(chunks, path):
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        for chunk in chunks:
+            f.write(chunk.to_json(orient="records", lines=True, force_ascii=False, date_format="iso"))
+            f.write("\n")
+
+
+_WRITERS = {"csv": _write_csv, "parquet": _write_parquet, "jsonl": _write_jsonl}
+
+
+def _prune(keep):
+    """Supprime les exports les plus anciens au-delà de MAX_EXPORTS."""
+    files = [os.path.join(EXPORT_DIR, f) for f in os.listdir(EXPORT_DIR)]
+    files = [f for f in files if f != keep and not f.endswith(".tmp")]
+    files.sort(key=os.path.getmtime, reverse=True)
+    for path in files[MAX_EXPORTS - 1:]:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def build_export(
+    fmt="csv",
+    categories=None,
+    price_range=None,
+    cities=None,
+    data_folder="webscraper_data",
+):
+    """
+    Écrit (ou réutilise) le fichier d'export d'une sélection des données.
+
+    Les annonces sont lues dans la base (voir listings_db) et écrites par
+    morceaux de CHUNK_ROWS lignes dans un fichier temporaire, puis renommé.
+    Il est nommé d'après le format, les filtres et la version de la base:
+    tant que les données ne changent pas, les demandes identiques (y compris
+    simultanées) réutilisent le même fichier.
+
+    Args:
+        fmt: "csv", "parquet" ou "jsonl" (JSON lines compressé en gzip)
+        categories, price_range, cities: Filtres (voir listings_db.where_clause)
+        data_folder: Dossier des données
+
+    Returns:
+        str: Chemin du fichier d'export
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"format d'export inconnu: {fmt}")
+    db = sync_database(data_folder)
+    version = f"{db.path}:{db.version()}"
+    key = export_key(fmt, categories, price_range, cities, version)
+    path = os.path.join(EXPORT_DIR, f"export_{key}{EXPORT_FORMATS[fmt][0]}")
+
+    with _key_lock(key):
+        if os.path.exists(path):
+            os.utime(path)
+            return path
+
+        os.makedirs(EXPORT_DIR, exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            _WRITERS[fmt](iter_rows(db, categories, price_range, cities), tmp_path)
+            os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+        _prune(path)
+    return path
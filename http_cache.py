@@ -0,0 +1,223 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+# Dossier des caches locaux du projet
+CACHE_DIR = ".cache"
+
+DEFAULT_CACHE_PATH = os.path.join(CACHE_DIR, "http_cache.sqlite")
+
+# Durée pendant laquelle une réponse est servie sans revalidation (secondes)
+DEFAULT_TTL = 24 * 3600
+
+# Taille maximale des corps conservés (octets)
+DEFAULT_MAX_BYTES = 500 * 1024 * 1024
+
+# En-têtes de réponse conservés avec le corps
+_KEPT_HEADERS = ("Content-Type", "ETag", "Last-Modified")
+
+
+class CacheStats:
+    """Compteurs du cache, partagés entre les threads."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.hits = 0
+            self.revalidated = 0
+            self.misses = 0
+            self.bytes_saved = 0
+
+    def record(self, outcome: str, nbytes: int = 0) -> None:
+        with self._lock:
+            setattr(self, outcome, getattr(self, outcome) + 1)
+            if outcome != "misses":
+                self.bytes_saved += nbytes
+
+    def snapshot(self) -> dict:
+        """
+        Returns:
+            dict: hits (servis sans requête), revalidated (réponses 304),
+            misses, bytes_saved et hit_ratio
+        """
+        with self._lock:
+            lookups = self.hits + self.revalidated + self.misses
+            return {
+                "hits": self.hits,
+                "revalidated": self.revalidated,
+                "misses": self.misses,
+                "bytes_saved": self.bytes_saved,
+                "hit_ratio": (
+                    (self.hits + self.revalidated) / lookups if lookups else 0.0
+                ),
+            }
+
+
+class ResponseCache:
+    """
+    Cache disque (SQLite) des réponses HTTP, indexé par URL.
+
+    Une réponse plus jeune que le TTL est servie directement. Au-delà, elle
+    est revalidée avec If-None-Match / If-Modified-Since: une réponse 304
+    évite de retélécharger le corps. Quand la taille totale dépasse
+    max_bytes, les entrées les moins récemment utilisées sont supprimées.
+
+    Args:
+        path: Chemin du fichier SQLite
+        ttl: Durée de fraîcheur par défaut (secondes)
+        max_bytes: Taille maximale cumulée des corps (octets)
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULT_CACHE_PATH,
+        ttl: float = DEFAULT_TTL,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ):
+        self.path = path
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.executescript(
+            """
+            PRAGMA journal_mode=WAL;
+            CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                headers TEXT NOT NULL,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                stored_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_responses_last_access
+                ON responses (last_access);
+            """
+        )
+        self._total_bytes = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM responses"
+        ).fetchone()[0]
+
+    def lookup(self, url: str) -> dict | None:
+        """
+        Cherche une réponse en cache.
+
+        Returns:
+            dict avec headers, body, size et stored_at, ou None
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT headers, body, size, stored_at FROM responses WHERE url = ?",
+                (url,),
+            ).fetchone()
+        if row is None:
+            return None
+        return {
+            "headers": json.loads(row[0]),
+            "body": row[1],
+            "size": row[2],
+            "stored_at": row[3],
+        }
+
+    def is_fresh(self, entry: dict, max_age: float | None = None) -> bool:
+        max_age = self.ttl if max_age is None else max_age
+        return time.time() - entry["stored_at"] < max_age
+
+    def touch(self, url: str, revalidated: bool = False) -> None:
+        """Marque une entrée comme utilisée (et fraîche si revalidée)."""
+        now = time.time()
+        with self._lock, self._conn:
+            if revalidated:
+                self._conn.execute(
+                    "UPDATE responses SET last_access = ?, stored_at = ? WHERE url = ?",
+                    (now, now, url),
+                )
+            else:
+                self._conn.execute(
+                    "UPDATE responses SET last_access = ? WHERE url = ?", (now, url)
+                )
+
+    def store(self, url: str, response: requests.Response) -> None:
+        """Enregistre une réponse 200 puis applique l'éviction LRU."""
+        if response.status_code != 200:
+            return
+        if "no-store" in response.headers.get("Cache-Control", ""):
+            return
+
+        body = response.content
+        headers = {
+            name: response.headers[name]
+            for name in _KEPT_HEADERS
+            if name in response.headers
+        }
+        now = time.time()
+        with self._lock, self._conn:
+            old = self._conn.execute(
+                "SELECT size FROM responses WHERE url = ?", (url,)
+            ).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?)",
+                (url, json.dumps(headers), body, len(body), now, now),
+            )
+            self._total_bytes += len(body) - (old[0] if old else 0)
+            self._evict()
+
+    def _evict(self) -> None:
+        # Supprimer les entrées les moins récemment utilisées (verrou tenu)
+        while self._total_bytes > self.max_bytes:
+            rows = self._conn.execute(
+                "SELECT url, size FROM responses ORDER BY last_access LIMIT 100"
+            ).fetchall()
+            if not rows:
+                self._total_bytes = 0
+                break
+            for url, size in rows:
+                self._conn.execute("DELETE FROM responses WHERE url = ?", (url,))
+                self._total_bytes -= size
+                if self._total_bytes <= self.max_bytes:
+                    break
+
+    def clear(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM responses")
+            self._total_bytes = 0
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+
+def conditional_headers(entry: dict) -> dict:
+    """En-têtes de revalidation (If-None-Match / If-Modified-Since)."""
+    headers = {}
+    if "ETag" in entry["headers"]:
+        headers["If-None-Match"] = entry["headers"]["ETag"]
+    if "Last-Modified" in entry["headers"]:
+        headers["If-Modified-Since"] = entry["headers"]["Last-Modified"]
+    return headers
+
+
+def cached_response(url: str, entry: dict) -> requests.Response:
+    """Reconstruit une requests.Response à partir d'une entrée du cache."""
+    res = requests.Response()
+    res.status_code = 200
+    res.reason = "OK"
+    res.url = url
+    res.headers = CaseInsensitiveDict(entry["headers"])
+    res.encoding = get_encoding_from_headers(res.headers)
+    res._content = entry["body"]
+    res.from_cache = True
+    return res
@@ -0,0 +1,285 @@
+import socket
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
+from urllib3.util.connection import allowed_gai_family
+from urllib3.util.request import ACCEPT_ENCODING
+
+from http_cache import ResponseCache, cached_response, conditional_headers
+
+# Timeouts par défaut (connexion, lecture) en secondes
+DEFAULT_TIMEOUT = (5, 15)
+
+# Taille du pool de connexions par hôte
+DEFAULT_POOL_MAXSIZE = 20
+
+DEFAULT_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (compatible; coinafrique-scraper/0.1)",
+    # gzip/deflate toujours, br/zstd si les décodeurs sont installés
+    "Accept-Encoding": ACCEPT_ENCODING,
+    "Connection": "keep-alive",
+}
+
+# Mesures de la requête en cours, propres à chaque thread
+_local = threading.local()
+
+
+def _record(phase: str, seconds: float) -> None:
+    timings = getattr(_local, "timings", None)
+    if timings is not None:
+        timings[phase] = timings.get(phase, 0.0) + seconds
+
+
+class _TimedConnectionMixin:
+    """Mesure la résolution DNS et l'établissement des nouvelles connexions."""
+
+    def _new_conn(self):
+        dns_host = self._dns_host
+        start = time.perf_counter()
+        try:
+            infos = socket.getaddrinfo(
+                dns_host, self.port, allowed_gai_family(), socket.SOCK_STREAM
+            )
+        except OSError:
+            # Laisser urllib3 produire son erreur habituelle
+            infos = None
+        _record("dns", time.perf_counter() - start)
+        if not infos:
+            return super()._new_conn()
+
+        # Se connecter aux adresses déjà résolues, chacune à son tour comme
+        # urllib3.util.connection.create_connection (ex: IPv6 injoignable,
+        # puis IPv4); le nom reste utilisé pour TLS
+        addresses = list(dict.fromkeys(info[4][0] for info in infos))
+        try:
+            for i, address in enumerate(addresses):
+                self._dns_host = address
+                try:
+                    return super()._new_conn()
+                except (NewConnectionError, ConnectTimeoutError):
+                    if i == len(addresses) - 1:
+                        raise
+        finally:
+            self._dns_host = dns_host
+
+    def connect(self):
+        start = time.perf_counter()
+        super().connect()
+        _record("connect", time.perf_counter() - start)
+        _record("new_connections", 1)
+
+
+class _TimedHTTPConnection(_TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class _TimedHTTPSConnection(_TimedConnectionMixin, HTTPSConnection):
+    pass
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class _TimedAdapter(HTTPAdapter):
+    """Adapter requests dont les pools utilisent les connexions instrumentées."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _TimedHTTPConnectionPool,
+            "https": _TimedHTTPSConnectionPool,
+        }
+
+
+class TimingStats:
+    """
+    Compteurs cumulés des temps de requête, partagés entre les threads.
+
+    Les phases mesurées sont: dns, connect (TCP + TLS), ttfb (envoi de la
+    requête jusqu'à la réception des en-têtes) et download (lecture du corps).
+    """
+
+    PHASES = ("dns", "connect", "ttfb", "download")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.requests = 0
+            self.errors = 0
+            self.new_connections = 0
+            self.bytes = 0
+            self.totals = dict.fromkeys(self.PHASES, 0.0)
+
+    def record(self, timings: dict, nbytes: int = 0, error: bool = False) -> None:
+        with self._lock:
+            self.requests += 1
+            self.errors += int(error)
+            self.new_connections += int(timings.get("new_connections", 0))
+            self.bytes += nbytes
+            for phase in self.PHASES:
+                self.totals[phase] += timings.get(phase, 0.0)
+
+    def snapshot(self) -> dict:
+        """
+        Retourne un résumé des compteurs.
+
+        Returns:
+            dict: nombre de requêtes, erreurs, connexions ouvertes, octets,
+            et pour chaque phase le temps total et moyen (secondes)
+        """
+        with self._lock:
+            summary = {
+                "requests": self.requests,
+                "errors": self.errors,
+                "new_connections": self.new_connections,
+                "bytes": self.bytes,
+            }
+            for phase in self.PHASES:
+                total = self.totals[phase]
+                summary[f"{phase}_total"] = total
+                summary[f"{phase}_mean"] = total / self.requests if self.requests else 0.0
+            return summary
+
+
+class ScraperClient:
+    """
+    Client HTTP partagé par les scrapers.
+
+    Possède une Session requests avec un pool de connexions keep-alive,
+    la négociation de compression, des timeouts par défaut et des compteurs
+    de temps par phase (voir TimingStats). Avec un ResponseCache, les
+    réponses fraîches sont servies sans requête et les autres sont revalidées.
+
+    Args:
+        pool_maxsize: Nombre maximal de connexions conservées par hôte
+        timeout: Timeout par défaut (connexion, lecture) en secondes
+        headers: En-têtes supplémentaires à envoyer avec chaque requête
+        cache: Cache disque optionnel des réponses
+    """
+
+    def __init__(
+        self,
+        pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+        timeout: float | tuple[float, float] = DEFAULT_TIMEOUT,
+        headers: dict | None = None,
+        cache: ResponseCache | None = None,
+    ):
+        self.timeout = timeout
+        self.stats = TimingStats()
+        self.cache = cache
+
+        self.session = requests.Session()
+        self.session.headers.update(DEFAULT_HEADERS)
+        if headers:
+            self.session.headers.update(headers)
+
+        # pool_block: au-delà de pool_maxsize, attendre une connexion libre
+        # plutôt que d'ouvrir des connexions jetables
+        adapter = _TimedAdapter(
+            pool_connections=4, pool_maxsize=pool_maxsize, pool_block=True
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def get(
+        self, url: str, max_age: float | None = None, **kwargs
+    ) -> requests.Response:
+        """
+        Effectue une requête GET et télécharge le corps de la réponse.
+
+        Args:
+            url: URL à télécharger
+            max_age: Âge maximal (secondes) d'une réponse en cache servie sans
+                revalidation (par défaut le TTL du cache, 0 = toujours revalider)
+            **kwargs: Arguments passés à requests.Session.get
+
+        Returns:
+            requests.Response: Réponse avec son contenu déjà lu
+        """
+        if self.cache is None:
+            return self._get(url, **kwargs)
+
+        entry = self.cache.lookup(url)
+        if entry is None:
+            res = self._get(url, **kwargs)
+            self.cache.stats.record("misses")
+            self.cache.store(url, res)
+            return res
+
+        if self.cache.is_fresh(entry, max_age):
+            self.cache.stats.record("hits", entry["size"])
+            self.cache.touch(url)
+            return cached_response(url, entry)
+
+        # Revalidation conditionnelle: une 304 n'a pas de corps
+        headers = {**kwargs.pop("headers", {}), **conditional_headers(entry)}
+        res = self._get(url, headers=headers, **kwargs)
+        if res.status_code == 304:
+            self.cache.stats.record("revalidated", entry["size"])
+            self.cache.touch(url, revalidated=True)
+            return cached_response(url, entry)
+
+        self.cache.stats.record("misses")
+        self.cache.store(url, res)
+        return res
+
+    def _get(self, url: str, **kwargs) -> requests.Response:
+        kwargs.setdefault("timeout", self.timeout)
+        kwargs["stream"] = True
+
+        timings = {}
+        _local.timings = timings
+        start = time.perf_counter()
+        try:
+            res = self.session.get(url, **kwargs)
+            headers_received = time.perf_counter()
+            content = res.content
+            done = time.perf_counter()
+        except Exception:
+            self.stats.record(timings, error=True)
+            raise
+        finally:
+            _local.timings = None
+
+        # Le temps de connexion inclut la résolution DNS
+        connect = timings.get("connect", 0.0)
+        timings["connect"] = max(connect - timings.get("dns", 0.0), 0.0)
+        timings["ttfb"] = max(headers_received - start - connect, 0.0)
+        timings["download"] = done - headers_received
+        self.stats.record(timings, nbytes=len(content))
+        return res
+
+    def close(self) -> None:
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+_default_client = None
+_default_client_lock = threading.Lock()
+
+
+def get_default_client() -> ScraperClient:
+    """Retourne le client partagé du processus (créé au premier appel, avec cache)."""
+    global _default_client
+    with _default_client_lock:
+        if _default_client is None:
+            _default_client = ScraperClient(cache=ResponseCache())
+        return _default_client
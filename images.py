@@ -0,0 +1,280 @@
+"""
+Vignettes des images d'annonces, servies depuis un cache disque local.
+
+Les images sont téléchargées une fois (concurrence et débit bornés),
+réduites en vignettes JPEG et rangées par hash de leur contenu: les pages
+affichent les vignettes locales sans solliciter images.coinafrique.com à
+chaque affichage. Pillow est optionnel: sans lui, l'image d'origine est
+gardée telle quelle.
+"""
+
+import base64
+import hashlib
+import io
+import logging
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from http_cache import CACHE_DIR
+from http_client import ScraperClient
+from scraper import HostRateLimiter
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+THUMBNAIL_DIR = os.path.join(CACHE_DIR, "thumbnails")
+
+# Taille maximale des vignettes (pixels) et qualité JPEG
+THUMBNAIL_SIZE = (240, 240)
+THUMBNAIL_QUALITY = 80
+
+# Taille maximale cumulée des vignettes (octets)
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+
+# Téléchargements simultanés et débit (requêtes/seconde/hôte) des images
+DEFAULT_MAX_WORKERS = 8
+DEFAULT_REQUESTS_PER_SECOND = 10.0
+
+# Délai avant de retenter une image dont le téléchargement a échoué (secondes)
+FAILURE_RETRY_DELAY = 600
+
+
+def make_thumbnail(data: bytes) -> bytes:
+    """Réduit une image en vignette JPEG (image inchangée sans Pillow)."""
+    if Image is None:
+        return data
+    with Image.open(io.BytesIO(data)) as image:
+        image.thumbnail(THUMBNAIL_SIZE)
+        out = io.BytesIO()
+        image.convert("RGB").save(out, format="JPEG", quality=THUMBNAIL_QUALITY)
+        return out.getvalue()
+
+
+class ThumbnailCache:
+    """
+    Cache disque des vignettes, adressé par contenu.
+
+    Chaque vignette est un fichier nommé d'après le hash (BLAKE2b) de son
+    contenu: des URLs différentes pour une même image partagent le même
+    fichier. Un index SQLite associe les URLs aux fichiers. Quand la taille
+    totale dépasse max_bytes, les vignettes les moins récemment utilisées
+    sont supprimées.
+
+    Args:
+        path: Dossier du cache
+        max_bytes: Taille maximale cumulée des vignettes (octets)
+    """
+
+    def __init__(self, path: str = THUMBNAIL_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._failures = {}  # URL -> date du dernier échec
+
+        os.makedirs(path, exist_ok=True)
+        self._conn = sqlite3.connect(os.path.join(path, "index.sqlite"), check_same_thread=False)
+        self._conn.executescript(
+            """
+            PRAGMA journal_mode=WAL;
+            CREATE TABLE IF NOT EXISTS blobs (
+                digest TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                last_access REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_blobs_last_access ON blobs (last_access);
+            CREATE TABLE IF NOT EXISTS urls (
+                url TEXT PRIMARY KEY,
+                digest TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_urls_digest ON urls (digest);
+            """
+        )
+        self._total_bytes = self._conn.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM blobs"
+        ).fetchone()[0]
+
+    def blob_path(self, digest: str) -> str:
+        return os.path.join(self.path, digest[:2], f"{digest}.jpg")
+
+    def lookup(self, url: str) -> str | None:
+        """Chemin de la vignette d'une URL (None si absente du cache)."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT digest FROM urls WHERE url = ?", (url,)
+            ).fetchone()
+            if row is None:
+                return None
+            path = self.blob_path(row[0])
+            if not os.path.exists(path):
+                self._conn.execute("DELETE FROM urls WHERE url = ?", (url,))
+                return None
+            with self._conn:
+                self._conn.execute(
+                    "UPDATE blobs SET last_access = ? WHERE digest = ?", (time.time(), row[0])
+                )
+            return path
+
+    def store(self, url: str, thumbnail: bytes) -> str:
+        """Ajoute la vignette d'une URL et retourne son chemin."""
+        digest = hashlib.blake2b(thumbnail, digest_size=16).hexdigest()
+        path = self.blob_path(digest)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(thumbnail)
+            os.replace(tmp_path, path)
+
+        with self._lock, self._conn:
+            known = self._conn.execute(
+                "SELECT 1 FROM blobs WHERE digest = ?", (digest,)
+            ).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO blobs VALUES (?, ?, ?)",
+                (digest, len(thumbnail), time.time()),
+            )
+            self._conn.execute("INSERT OR REPLACE INTO urls VALUES (?, ?)", (url, digest))
+            if not known:
+                self._total_bytes += len(thumbnail)
+            self._failures.pop(url, None)
+            self._evict(keep=digest)
+        return path
+
+    def _evict(self, keep: str) -> None:
+        while self._total_bytes > self.max_bytes:
+            rows = self._conn.execute(
+                "SELECT digest, size FROM blobs WHERE digest != ? "
+                "ORDER BY last_access LIMIT 100",
+                (keep,),
+            ).fetchall()
+            if not rows:
+                break
+            for digest, size in rows:
+                self._conn.execute("DELETE FROM blobs WHERE digest = ?", (digest,))
+                self._conn.execute("DELETE FROM urls WHERE digest = ?", (digest,))
+                try:
+                    os.remove(self.blob_path(digest))
+                except OSError:
+                    pass
+                self._total_bytes -= size
+                if self._total_bytes <= self.max_bytes:
+                    break
+
+    def record_failure(self, url: str) -> None:
+        with self._lock:
+            self._failures[url] = time.monotonic()
+
+    def recently_failed(self, url: str) -> bool:
+        with self._lock:
+            failed_at = self._failures.get(url)
+        return failed_at is not None and time.monotonic() - failed_at < FAILURE_RETRY_DELAY
+
+    @property
+    def total_bytes(self) -> int:
+        with self._lock:
+            return self._total_bytes
+
+    def clear(self) -> None:
+        with self._lock, self._conn:
+            for (digest,) in self._conn.execute("SELECT digest FROM blobs").fetchall():
+                try:
+                    os.remove(self.blob_path(digest))
+                except OSError:
+                    pass
+            self._conn.execute("DELETE FROM blobs")
+            self._conn.execute("DELETE FROM urls")
+            self._total_bytes = 0
+            self._failures.clear()
+
+
+def fetch_thumbnails(
+    urls,
+    cache: ThumbnailCache | None = None,
+    client: ScraperClient | None = None,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    requests_per_second: float | None = DEFAULT_REQUESTS_PER_SECOND,
+) -> dict:
+    """
+    Retourne les vignettes d'une liste d'URLs d'images.
+
+    Seules les images absentes du cache sont téléchargées, au plus
+    max_workers à la fois et requests_per_second par hôte. Les échecs sont
+    ignorés (et pas retentés avant FAILURE_RETRY_DELAY).
+
+    Args:
+        urls: URLs des images (valeurs manquantes ou dupliquées ignorées)
+        cache: Cache des vignettes (par défaut celui du processus)
+        client: Client HTTP (par défaut un client sans cache de réponses)
+        max_workers: Téléchargements simultanés maximum
+        requests_per_second: Débit maximal par hôte (None: illimité)
+
+    Returns:
+        dict: URL -> chemin de la vignette, pour les images disponibles
+    """
+    cache = cache or get_thumbnail_cache()
+    client = client or get_image_client()
+    limiter = HostRateLimiter(requests_per_second)
+
+    result, missing = {}, []
+    for url in dict.fromkeys(u for u in urls if isinstance(u, str) and u):
+        path = cache.lookup(url)
+        if path is not None:
+            result[url] = path
+        elif not cache.recently_failed(url):
+            missing.append(url)
+
+    def fetch(url):
+        try:
+            limiter.wait(url)
+            res = client.get(url)
+            res.raise_for_status()
+            return url, cache.store(url, make_thumbnail(res.content))
+        except Exception as e:
+            logger.info("Image indisponible (%s): %s", url, e)
+            cache.record_failure(url)
+            return url, None
+
+    if missing:
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            for url, path in pool.map(fetch, missing):
+                if path is not None:
+                    result[url] = path
+    return result
+
+
+def thumbnail_data_uri(path: str) -> str:
+    """Vignette encodée en data URI (pour st.column_config.ImageColumn)."""
+    with open(path, "rb") as f:
+        data = f.read()
+    mime = "image/jpeg" if Image is not None else "image/*"
+    return f"data:{mime};base64,{base64.b64encode(data).decode()}"
+
+
+_thumbnail_cache = None
+_image_client = None
+_singletons_lock = threading.Lock()
+
+
+def get_thumbnail_cache() -> ThumbnailCache:
+    """Cache des vignettes partagé par le processus."""
+    global _thumbnail_cache
+    with _singletons_lock:
+        if _thumbnail_cache is None:
+            _thumbnail_cache = ThumbnailCache()
+        return _thumbnail_cache
+
+
+def get_image_client() -> ScraperClient:
+    """Client HTTP des images, sans cache de réponses (les vignettes suffisent)."""
+    global _image_client
+    with _singletons_lock:
+        if _image_client is None:
+            _image_client = ScraperClient(timeout=(3, 10))
+        return _image_client
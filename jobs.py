@@ -0,0 +1,253 @@
+import itertools
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from scraper import CATEGORY_URLS, RECORD_FIELDS
+from sinks import output_path, partial_path, scrape_to_file
+
+# Débit global par défaut (requêtes/seconde, toutes catégories confondues)
+DEFAULT_GLOBAL_RATE = 5.0
+
+# Sous-dossier (dans le dossier de données) des fichiers écrits par les jobs
+JOBS_DIRNAME = ".jobs"
+
+# Nombre de jobs terminés conservés en mémoire
+MAX_FINISHED_JOBS = 20
+
+
+class TokenBucket:
+    """
+    Limiteur de débit global (seau à jetons), partagé entre les threads.
+
+    S'utilise comme limiteur de scraper.iter_pages: wait(url) bloque jusqu'à
+    ce qu'un jeton soit disponible, quel que soit l'hôte.
+
+    Args:
+        rate: Jetons ajoutés par seconde
+        capacity: Nombre maximal de jetons accumulés (rafale autorisée)
+    """
+
+    def __init__(self, rate: float, capacity: float | None = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self, url: str | None = None) -> None:
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self.capacity, self._tokens + (now - self._updated) * self.rate
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                delay = (1 - self._tokens) / self.rate
+            time.sleep(delay)
+
+
+class JobCancelled(Exception):
+    """Job annulé pendant le scraping d'une catégorie."""
+
+
+class ScrapeJob:
+    """
+    Scraping de plusieurs catégories exécuté en arrière-plan.
+
+    L'état de chaque catégorie (progress) est mis à jour par les threads du
+    job et peut être lu à tout moment depuis une page Streamlit. Les annonces
+    de chaque catégorie sont écrites au fil des pages dans un fichier CSV
+    (voir sinks.scrape_to_file): un job interrompu (annulé, erreur, arrêt du
+    serveur) est repris par le job suivant sur la même catégorie.
+
+    Args:
+        job_id: Identifiant du job
+        categories: Catégories à scraper
+        num_pages: Nombre de pages par catégorie
+        limiter: Limiteur de débit global partagé par les catégories
+        output_dir: Dossier des fichiers CSV des catégories
+        **scrape_kwargs: Options de sinks.scrape_to_file et scraper.iter_pages
+    """
+
+    def __init__(self, job_id, categories, num_pages, limiter, output_dir, **scrape_kwargs):
+        self.id = job_id
+        self.categories = list(categories)
+        self.num_pages = num_pages
+        self.limiter = limiter
+        self.outputs = {c: output_path(output_dir, c) for c in self.categories}
+        self.scrape_kwargs = scrape_kwargs
+        self.started_at = time.time()
+        self.finished_at = None
+        self._cancel = threading.Event()
+        self._lock = threading.Lock()
+        self.progress = {
+            category: {"status": "en attente", "page": 0, "ads": 0, "error": None}
+            for category in self.categories
+        }
+
+    @property
+    def done(self) -> bool:
+        return self.finished_at is not None
+
+    def cancel(self) -> None:
+        self._cancel.set()
+
+    def _update(self, category, **values):
+        with self._lock:
+            self.progress[category].update(values)
+
+    def snapshot(self) -> dict:
+        """Copie cohérente de la progression de chaque catégorie."""
+        with self._lock:
+            return {category: dict(state) for category, state in self.progress.items()}
+
+    def result(self, category: str) -> pd.DataFrame:
+        """Annonces écrites pour une catégorie (même partielles), lues sur disque."""
+        path = self.outputs[category]
+        for candidate in (partial_path(path), path):
+            if os.path.isfile(candidate):
+                return pd.read_csv(candidate)
+        return pd.DataFrame(columns=RECORD_FIELDS)
+
+    def _run_category(self, category):
+        self._update(category, status="en cours")
+
+        def on_page(index_page, data):
+            with self._lock:
+                self.progress[category]["page"] = index_page
+                self.progress[category]["ads"] += len(data)
+            if self._cancel.is_set():
+                raise JobCancelled()
+
+        try:
+            scrape_to_file(
+                category,
+                self.num_pages,
+                self.outputs[category],
+                limiter=self.limiter,
+                page_callback=on_page,
+                **self.scrape_kwargs,
+            )
+            self._update(category, status="terminé")
+        except JobCancelled:
+            self._update(category, status="annulé")
+        except Exception as e:
+            self._update(category, status="erreur", error=str(e))
+
+    def run(self, max_parallel: int) -> None:
+        try:
+            with ThreadPoolExecutor(max_workers=max_parallel) as pool:
+                list(pool.map(self._run_category, self.categories))
+        finally:
+            self.finished_at = time.time()
+
+
+class JobManager:
+    """
+    Registre des jobs de scraping du processus.
+
+    Les jobs tournent dans des threads indépendants du cycle de rerun de
+    Streamlit: ils survivent aux reruns et aux changements d'onglet, et
+    toutes les sessions voient les mêmes jobs.
+
+    Args:
+        global_rate: Débit maximal (requêtes/seconde) partagé par tous les jobs
+        data_folder: Dossier des données (fichiers des jobs dans JOBS_DIRNAME)
+    """
+
+    def __init__(
+        self, global_rate: float = DEFAULT_GLOBAL_RATE, data_folder: str = "webscraper_data"
+    ):
+        self.limiter = TokenBucket(global_rate)
+        self.output_dir = os.path.join(data_folder, JOBS_DIRNAME)
+        self._jobs: dict[int, ScrapeJob] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def submit(
+        self,
+        categories,
+        num_pages: int,
+        max_parallel: int | None = None,
+        **scrape_kwargs,
+    ) -> ScrapeJob:
+        """
+        Lance un job de scraping en arrière-plan.
+
+        Args:
+            categories: Catégories à scraper (clés de CATEGORY_URLS)
+            num_pages: Nombre de pages par catégorie
+            max_parallel: Nombre de catégories scrapées en parallèle
+                (par défaut toutes)
+            **scrape_kwargs: Options de sinks.scrape_to_file et
+                scraper.iter_pages (max_workers, ...)
+
+        Returns:
+            ScrapeJob: Le job lancé
+        """
+        unknown = [c for c in categories if c not in CATEGORY_URLS]
+        if unknown or not categories:
+            raise ValueError(
+                f"Catégorie invalide. Choisir parmi: {list(CATEGORY_URLS.keys())}"
+            )
+        os.makedirs(self.output_dir, exist_ok=True)
+
+        with self._lock:
+            # Une catégorie n'est scrapée que par un job à la fois (même fichier)
+            running = {c for j in self._jobs.values() if not j.done for c in j.categories}
+            busy = [c for c in categories if c in running]
+            if busy:
+                raise ValueError(f"Catégories déjà en cours de scraping: {busy}")
+            job = ScrapeJob(
+                next(self._ids),
+                categories,
+                num_pages,
+                self.limiter,
+                self.output_dir,
+                **scrape_kwargs,
+            )
+            self._jobs[job.id] = job
+            self._prune()
+
+        thread = threading.Thread(
+            target=job.run,
+            args=(max_parallel or len(job.categories),),
+            name=f"scrape-job-{job.id}",
+            daemon=True,
+        )
+        thread.start()
+        return job
+
+    def get(self, job_id: int) -> ScrapeJob | None:
+        return self._jobs.get(job_id)
+
+    def jobs(self) -> list[ScrapeJob]:
+        """Jobs connus, du plus récent au plus ancien."""
+        with self._lock:
+            return sorted(self._jobs.values(), key=lambda job: job.id, reverse=True)
+
+    def _prune(self) -> None:
+        # Oublier les plus anciens jobs terminés (verrou tenu)
+        finished = sorted((j for j in self._jobs.values() if j.done), key=lambda j: j.id)
+        for job in finished[: max(len(finished) - MAX_FINISHED_JOBS, 0)]:
+            del self._jobs[job.id]
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_job_manager() -> JobManager:
+    """Retourne le gestionnaire de jobs du processus (créé au premier appel)."""
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = JobManager()
+        return _manager
@@ -0,0 +1,170 @@
+"""
+Table des annonces nettoyées, partagée par le processus en lecture seule.
+
+load_and_clean_all_data retourne un DataFrame pandas (chaînes object avec
+pandas 2); une session qui le copie, le filtre ou le convertit alloue sa
+propre version des chaînes, et la mémoire du serveur grandit avec le nombre
+de sessions. ListingStore convertit ce DataFrame une fois par version des
+données en table Arrow compacte; data_cleaner ne garde pas ses DataFrames, le
+processus ne garde donc que la table:
+
+- colonnes de texte répétitives dictionnaire-encodées (chaque valeur
+  distincte n'est stockée qu'une fois, codes int32 par ligne);
+- prix numérique (prix_fcfa) et identifiants entiers;
+- URLs des images dans un seul buffer contigu (pas d'objet Python par
+  ligne).
+
+Les sessions obtiennent des vues (DataFrames pandas à types Arrow) sur les
+buffers de la table, sans copie; les buffers Arrow ne sont jamais modifiés
+en place.
+"""
+
+import threading
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from data_cleaner import data_version, load_and_clean_all_data
+
+# Colonnes de texte dictionnaire-encodées (le nom de l'annonce se répète
+# beaucoup d'une annonce à l'autre: "Chiots berger allemand"...)
+DICTIONARY_COLUMNS = (
+    "Nom",
+    "titre",
+    "prix",
+    "adresse",
+    "categorie",
+    "source",
+    "pays",
+    "ville",
+    "quartier",
+)
+
+
+def _compact_column(name: str, column: pa.ChunkedArray) -> pa.Array:
+    """Colonne en un seul chunk, dictionnaire-encodée ou en chaînes 32 bits."""
+    if name in DICTIONARY_COLUMNS:
+        if pa.types.is_dictionary(column.type):
+            # Dictionnaires des chunks unifiés (une seule copie des valeurs)
+            column = column.unify_dictionaries()
+        else:
+            column = pc.dictionary_encode(column)
+        column = column.combine_chunks()
+        compact = pa.dictionary(pa.int32(), pa.string())
+        return column if column.type == compact else column.cast(compact)
+    if pa.types.is_large_string(column.type):
+        column = column.cast(pa.string())
+    return column.combine_chunks()
+
+
+class ListingStore:
+    """
+    Annonces nettoyées en table Arrow compacte (lecture seule).
+
+    Args:
+        table: Table des annonces
+        version: Version des données (voir data_cleaner.data_version)
+    """
+
+    def __init__(self, table: pa.Table, version: str | None = None):
+        self.table = table
+        self.version = version
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, version: str | None = None) -> "ListingStore":
+        """Construit la table compacte depuis un DataFrame nettoyé."""
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        arrays = [_compact_column(name, table[name]) for name in table.column_names]
+        return cls(pa.Table.from_arrays(arrays, names=table.column_names), version)
+
+    @property
+    def num_rows(self) -> int:
+        return self.table.num_rows
+
+    @property
+    def columns(self) -> list[str]:
+        return self.table.column_names
+
+    @property
+    def nbytes(self) -> int:
+        """Taille des buffers de la table."""
+        return self.table.nbytes
+
+    def column(self, name: str) -> pa.ChunkedArray:
+        """Colonne Arrow (sans copie)."""
+        return self.table[name]
+
+    def view(
+        self, columns: list[str] | None = None, start: int = 0, length: int | None = None
+    ) -> pd.DataFrame:
+        """
+        Vue pandas d'une tranche de lignes consécutives, sans copie.
+
+        Les colonnes gardent leurs types Arrow (pd.ArrowDtype): le DataFrame
+        référence les buffers de la table partagée. Le modifier remplace la
+        colonne concernée dans ce DataFrame seulement.
+
+        Args:
+            columns: Colonnes (toutes si None)
+            start: Première ligne
+            length: Nombre de lignes (jusqu'à la fin si None)
+
+        Returns:
+            DataFrame indexé par le numéro de ligne dans la table
+        """
+        table = self.table if columns is None else self.table.select(columns)
+        table = table.slice(start, length)
+        df = table.to_pandas(types_mapper=pd.ArrowDtype)
+        df.index = pd.RangeIndex(start, start + len(df))
+        return df
+
+    def take(self, rows, columns: list[str] | None = None) -> pd.DataFrame:
+        """
+        Lignes choisies (ex. une page de résultats), dans l'ordre donné.
+
+        Seules ces lignes sont copiées, en types pandas usuels: les colonnes
+        encodées sont décodées (sans copier leurs dictionnaires entiers).
+
+        Args:
+            rows: Numéros des lignes dans la table
+            columns: Colonnes (toutes si None)
+
+        Returns:
+            DataFrame indexé par le numéro de ligne dans la table
+        """
+        rows = pa.array(rows, type=pa.int64())
+        table = self.table if columns is None else self.table.select(columns)
+        table = table.take(rows)
+        table = pa.Table.from_arrays(
+            [
+                column.cast(column.type.value_type) if pa.types.is_dictionary(column.type) else column
+                for column in table.columns
+            ],
+            names=table.column_names,
+        )
+        df = table.to_pandas()
+        df.index = pd.Index(rows.to_numpy(), dtype="int64")
+        return df
+
+
+_stores = {}  # dossier -> ListingStore
+_stores_lock = threading.Lock()
+
+
+def get_listing_store(data_folder: str = "webscraper_data") -> ListingStore:
+    """
+    Table des annonces du dossier, partagée par le processus.
+
+    Reconstruite quand les données changent (voir data_cleaner.data_version);
+    les vues déjà données par l'ancienne table restent valides. Seuls les
+    fichiers sources modifiés sont recompactés (voir data_store); les autres
+    sont relus depuis leur fichier Arrow.
+    """
+    with _stores_lock:
+        version = data_version(data_folder)
+        store = _stores.get(data_folder)
+        if store is None or store.version != version:
+            store = ListingStore.from_frame(load_and_clean_all_data(data_folder), version)
+            _stores[data_folder] = store
+        return store
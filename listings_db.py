@@ -0,0 +1,405 @@
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from data_store import STORE_DIRNAME
+
+# Base d'annonces, dans le sous-dossier des fichiers compactés du dossier de données
+DB_FILENAME = "listings.sqlite"
+
+# Colonnes de la table listings (en plus de uid): nom -> type SQLite
+COLUMNS = {
+    "ad_id": "INTEGER",
+    "Nom": "TEXT",
+    "prix": "TEXT",
+    "adresse": "TEXT",
+    "categorie": "TEXT",
+    "prix_fcfa": "REAL",
+    "on_request": "INTEGER",
+    "pays": "TEXT",
+    "ville": "TEXT",
+    "quartier": "TEXT",
+    "scraped_at": "REAL",
+    "source": "TEXT",
+    "image_url": "TEXT",
+}
+
+# Source des annonces écrites directement par le scraper
+SCRAPER_SOURCE = "scraper"
+
+# Durée d'une semaine, et décalage du premier lundi après l'epoch (un jeudi)
+WEEK_SECONDS = 7 * 24 * 3600
+MONDAY_OFFSET = 4 * 24 * 3600
+
+
+def week_start(seconds):
+    """Début (lundi 00:00 UTC, en secondes epoch) de la semaine de chaque date."""
+    return seconds - (seconds - MONDAY_OFFSET) % WEEK_SECONDS
+
+
+def db_path(data_folder: str) -> str:
+    return os.path.join(data_folder, STORE_DIRNAME, DB_FILENAME)
+
+
+def where_clause(categories=None, price_range=None, cities=None, priced=False):
+    """
+    Clause WHERE (et ses paramètres) des filtres usuels.
+
+    Args:
+        categories: Catégories gardées (toutes si vide)
+        price_range: (min, max) en FCFA, bornes incluses (None: pas de filtre)
+        cities: Villes gardées (toutes si vide)
+        priced: Ne garder que les annonces avec un prix connu
+
+    Returns:
+        tuple: (texte SQL, commençant par " WHERE" ou vide, liste des paramètres)
+    """
+    conditions, params = [], []
+    if categories:
+        conditions.append(f"categorie IN ({', '.join('?' * len(categories))})")
+        params.extend(categories)
+    if cities:
+        conditions.append(f"ville IN ({', '.join('?' * len(cities))})")
+        params.extend(cities)
+    if price_range is not None:
+        conditions.append("prix_fcfa BETWEEN ? AND ?")
+        params.extend(price_range)
+    elif priced:
+        conditions.append("prix_fcfa IS NOT NULL")
+    if not conditions:
+        return "", params
+    return " WHERE " + " AND ".join(conditions), params
+
+
+class ListingsDB:
+    """
+    Base SQLite des annonces nettoyées, partagée par les processus.
+
+    Une ligne par annonce (uid: identifiant de l'annonce, ou fichier et
+    position pour les lignes sans identifiant). Une annonce déjà présente
+    n'est remplacée que par une version au moins aussi récente (scraped_at):
+    l'historique des fichiers et des scrapings s'accumule sans doublons.
+    L'historique des prix garde, pour chaque annonce et chaque semaine, le
+    dernier prix observé (voir add_price_observations).
+
+    Les pages interrogent la base avec des filtres et agrégations SQL
+    (indexés): aucune session ne garde les annonces en mémoire. Le numéro de
+    version (voir version) augmente à chaque écriture et sert de clé aux
+    caches dérivés.
+
+    Args:
+        path: Chemin du fichier SQLite
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        columns = ",\n".join(f'    "{name}" {kind}' for name, kind in COLUMNS.items())
+        self._conn.executescript(
+            f"""
+            PRAGMA journal_mode=WAL;
+            CREATE TABLE IF NOT EXISTS listings (
+                uid TEXT PRIMARY KEY,
+            {columns}
+            );
+            CREATE INDEX IF NOT EXISTS idx_listings_categorie_prix
+                ON listings (categorie, prix_fcfa);
+            CREATE INDEX IF NOT EXISTS idx_listings_ville ON listings (ville);
+            CREATE INDEX IF NOT EXISTS idx_listings_prix ON listings (prix_fcfa);
+            CREATE INDEX IF NOT EXISTS idx_listings_scraped_at ON listings (scraped_at);
+            CREATE TABLE IF NOT EXISTS sources (
+                source TEXT PRIMARY KEY,
+                path TEXT,
+                size INTEGER,
+                mtime_ns INTEGER,
+                hash TEXT,
+                rows INTEGER NOT NULL DEFAULT 0
+            );
+            CREATE TABLE IF NOT EXISTS price_history (
+                ad_id INTEGER NOT NULL,
+                week INTEGER NOT NULL,
+                categorie TEXT,
+                observed_at REAL NOT NULL,
+                prix_fcfa REAL NOT NULL,
+                PRIMARY KEY (ad_id, week)
+            ) WITHOUT ROWID;
+            CREATE INDEX IF NOT EXISTS idx_price_history_categorie_week
+                ON price_history (categorie, week);
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value INTEGER NOT NULL);
+            INSERT OR IGNORE INTO meta VALUES ('version', 0);
+            """
+        )
+
+        # Bases créées avant l'ajout de colonnes: les ajouter, puis oublier les
+        # empreintes des fichiers pour qu'ils soient réécrits
+        existing = {row[1] for row in self._conn.execute("PRAGMA table_info(listings)")}
+        missing = [name for name in COLUMNS if name not in existing]
+        with self._conn:
+            for name in missing:
+                self._conn.execute(f'ALTER TABLE listings ADD COLUMN "{name}" {COLUMNS[name]}')
+            if missing:
+                self._conn.execute("UPDATE sources SET hash = NULL")
+
+        # Bases créées avant l'historique des prix: l'initialiser depuis les annonces
+        with self._conn:
+            if self._conn.execute("SELECT NOT EXISTS (SELECT 1 FROM price_history)").fetchone()[0]:
+                self._conn.execute(
+                    """
+                    INSERT OR IGNORE INTO price_history
+                    SELECT ad_id, CAST(scraped_at AS INTEGER)
+                               - (CAST(scraped_at AS INTEGER) - ?) % ?,
+                           categorie, scraped_at, prix_fcfa
+                    FROM listings
+                    WHERE ad_id IS NOT NULL AND scraped_at IS NOT NULL
+                        AND prix_fcfa IS NOT NULL
+                    """,
+                    (MONDAY_OFFSET, WEEK_SECONDS),
+                )
+
+    def version(self) -> int:
+        """Numéro de version, incrémenté à chaque écriture (tous processus)."""
+        with self._lock:
+            return self._conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()[0]
+
+    def query(self, sql: str, params=()) -> pd.DataFrame:
+        with self._lock:
+            return pd.read_sql_query(sql, self._conn, params=params)
+
+    def iter_query(self, sql: str, params=(), chunksize: int = 50_000):
+        """Résultat d'une requête par morceaux de chunksize lignes."""
+        with self._lock:
+            cursor = self._conn.execute(sql, params)
+            names = [d[0] for d in cursor.description]
+            rows = cursor.fetchmany(chunksize)
+        while rows:
+            yield pd.DataFrame.from_records(rows, columns=names)
+            with self._lock:
+                rows = cursor.fetchmany(chunksize)
+
+    def scalar(self, sql: str, params=()):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchone()[0]
+
+    def source_fingerprints(self) -> dict:
+        """Fichier source -> empreinte (chemin, taille, mtime, hash) déjà écrite."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT source, path, size, mtime_ns, hash FROM sources WHERE hash IS NOT NULL"
+            ).fetchall()
+        return {row[0]: tuple(row[1:]) for row in rows}
+
+    def set_source_fingerprint(self, source: str, fingerprint: tuple) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE sources SET path = ?, size = ?, mtime_ns = ?, hash = ? WHERE source = ?",
+                (*fingerprint, source),
+            )
+
+    def upsert(self, df: pd.DataFrame, source: str, fingerprint: tuple | None = None) -> None:
+        """
+        Écrit des annonces nettoyées (voir data_cleaner.clean_dataframe).
+
+        Args:
+            df: Annonces, avec au moins les colonnes de COLUMNS présentes
+                dans les données (les autres sont NULL)
+            source: Fichier source, ou SCRAPER_SOURCE
+            fingerprint: Empreinte du fichier source (voir
+                sources.file_fingerprint); None pour les annonces du
+                scraper, qui s'ajoutent au compte de leur source
+        """
+        values = {}
+        for name in COLUMNS:
+            column = df[name] if name in df.columns else pd.Series(None, index=df.index)
+            if name == "scraped_at":
+                seconds = column.astype("datetime64[ns]").astype("int64") / 1e9
+                column = seconds.where(column.notna())
+            if isinstance(column.dtype, pd.CategoricalDtype):
+                column = column.astype(object)
+            values[name] = column.astype(object).where(column.notna(), None).tolist()
+        values["source"] = [source] * len(df)
+
+        # Lignes sans identifiant: position dans le fichier (stable d'une
+        # synchronisation à l'autre), ou date du scraping pour le scraper
+        prefix = source if fingerprint is not None else f"{source}#{time.time()}"
+        uids = [
+            str(ad_id) if ad_id is not None else f"{prefix}#{position}"
+            for position, ad_id in enumerate(values["ad_id"])
+        ]
+        names = ", ".join(f'"{name}"' for name in COLUMNS)
+        updates = ", ".join(f'"{name}" = excluded."{name}"' for name in COLUMNS)
+        sql = (
+            f"INSERT INTO listings (uid, {names}) VALUES ({', '.join('?' * (len(COLUMNS) + 1))}) "
+            f"ON CONFLICT (uid) DO UPDATE SET {updates} "
+            "WHERE excluded.scraped_at >= listings.scraped_at"
+        )
+        rows = zip(uids, *(values[name] for name in COLUMNS))
+
+        with self._lock, self._conn:
+            self._conn.executemany(sql, rows)
+            self._insert_prices(df)
+            if fingerprint is None:
+                self._conn.execute(
+                    "INSERT INTO sources (source, rows) VALUES (?, ?) "
+                    "ON CONFLICT (source) DO UPDATE SET rows = rows + excluded.rows",
+                    (source, len(df)),
+                )
+            else:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO sources VALUES (?, ?, ?, ?, ?, ?)",
+                    (source, *fingerprint, len(df)),
+                )
+            self._conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'version'")
+
+    def _insert_prices(self, df):
+        columns = ["ad_id", "categorie", "scraped_at", "prix_fcfa"]
+        if not set(columns) <= set(df.columns):
+            return
+        prices = df[columns].dropna()
+        observed = prices["scraped_at"].astype("datetime64[ns]").astype("int64") // 10**9
+        rows = zip(
+            prices["ad_id"].astype("int64").tolist(),
+            week_start(observed).tolist(),
+            prices["categorie"].astype(object).tolist(),
+            observed.tolist(),
+            prices["prix_fcfa"].tolist(),
+        )
+        self._conn.executemany(
+            "INSERT INTO price_history VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT (ad_id, week) DO UPDATE SET categorie = excluded.categorie, "
+            "observed_at = excluded.observed_at, prix_fcfa = excluded.prix_fcfa "
+            "WHERE excluded.observed_at >= price_history.observed_at",
+            rows,
+        )
+
+    def add_price_observations(self, df: pd.DataFrame) -> None:
+        """
+        Ajoute des prix observés à l'historique des prix.
+
+        Une seule ligne par annonce et par semaine (lundi UTC): la dernière
+        observation de la semaine. Les écritures de upsert y passent aussi.
+
+        Args:
+            df: Colonnes ad_id, categorie, scraped_at et prix_fcfa
+        """
+        with self._lock, self._conn:
+            self._insert_prices(df)
+            self._conn.execute("UPDATE meta SET value = value + 1 WHERE key = 'version'")
+
+    def weekly_median_prices(self, categories=None, start=None, end=None) -> pd.DataFrame:
+        """
+        Prix médian par semaine (une observation par annonce et par semaine).
+
+        Args:
+            categories: Catégories gardées (toutes si vide)
+            start, end: Dates de début et de fin (incluses, None: pas de borne)
+
+        Returns:
+            DataFrame: Colonnes Semaine (date du lundi), Prix médian et Annonces
+        """
+        conditions, params = [], []
+        if categories:
+            conditions.append(f"categorie IN ({', '.join('?' * len(categories))})")
+            params.extend(categories)
+        if start is not None:
+            conditions.append("week >= ?")
+            params.append(int(week_start(pd.Timestamp(start).timestamp())))
+        if end is not None:
+            conditions.append("week <= ?")
+            params.append(int(pd.Timestamp(end).timestamp()))
+        where = " WHERE " + " AND ".join(conditions) if conditions else ""
+        prices = self.query(f"SELECT week, prix_fcfa FROM price_history{where}", params)
+
+        weekly = prices.groupby("week")["prix_fcfa"].agg(["median", "size"]).reset_index()
+        weekly.columns = ["Semaine", "Prix médian", "Annonces"]
+        weekly["Semaine"] = pd.to_datetime(weekly["Semaine"], unit="s")
+        return weekly
+
+    def add_records(self, records: list[dict], category: str) -> None:
+        """
+        Ajoute des annonces brutes du scraper (voir scraper.RECORD_FIELDS).
+
+        S'utilise comme listings_db de scraper.iter_pages.
+        """
+        from data_cleaner import clean_dataframe, normalize_locations
+
+        if not records:
+            return
+        df = clean_dataframe(pd.DataFrame.from_records(records))
+        df["categorie"] = category
+        df["scraped_at"] = pd.Timestamp(time.time(), unit="s")
+        if "adresse" in df.columns:
+            df = normalize_locations(df)
+        self.upsert(df, SCRAPER_SOURCE)
+
+    def duplicate_report(self) -> pd.DataFrame:
+        """
+        Lignes écrites par source et lignes remplacées par une version plus
+        récente venue d'une autre source (ou d'un autre scraping).
+        """
+        report = self.query(
+            """
+            SELECT s.source, s.rows AS lignes, COALESCE(l.n, 0) AS gardees
+            FROM sources AS s
+            LEFT JOIN (SELECT source, COUNT(*) AS n FROM listings GROUP BY source) AS l
+                ON l.source = s.source
+            ORDER BY s.source
+            """
+        )
+        report["doublons"] = (report["lignes"] - report["gardees"]).clip(lower=0)
+        return report
+
+    def price_quantiles(self, quantiles, **filters) -> dict:
+        """
+        Quantiles des prix connus (interpolation linéaire, comme pandas),
+        lus par l'index des prix sans charger les prix.
+        """
+        where, params = where_clause(priced=True, **filters)
+        count = self.scalar(f"SELECT COUNT(*) FROM listings{where}", params)
+        if not count:
+            return {}
+        sql = f"SELECT prix_fcfa FROM listings{where} ORDER BY prix_fcfa LIMIT 2 OFFSET ?"
+        result = {}
+        for q in quantiles:
+            position = q * (count - 1)
+            low = int(np.floor(position))
+            with self._lock:
+                values = [r[0] for r in self._conn.execute(sql, [*params, low]).fetchall()]
+            high = values[1] if len(values) > 1 else values[0]
+            result[q] = values[0] + (high - values[0]) * (position - low)
+        return result
+
+    def price_histogram(self, edges, **filters) -> np.ndarray:
+        """Nombre de prix par classe [edges[i], edges[i+1][ (dernière classe fermée)."""
+        where, params = where_clause(priced=True, **filters)
+        sql = f"SELECT COUNT(*) FROM listings{where} AND prix_fcfa < ?"
+        cumulative = [self.scalar(sql, [*params, edge]) for edge in edges[:-1]]
+        cumulative.append(
+            self.scalar(
+                f"SELECT COUNT(*) FROM listings{where} AND prix_fcfa <= ?", [*params, edges[-1]]
+            )
+        )
+        return np.diff(cumulative)
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+_databases = {}
+_databases_lock = threading.Lock()
+
+
+def get_listings_db(data_folder: str = "webscraper_data") -> ListingsDB:
+    """Base d'annonces d'un dossier de données, partagée par le processus."""
+    path = db_path(data_folder)
+    with _databases_lock:
+        if path not in _databases:
+            _databases[path] = ListingsDB(path)
+        return _databases[path]
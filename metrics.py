@@ -0,0 +1,348 @@
+"""
+Instrumentation des scrapings.
+
+Chaque scraping de catégorie (voir scraper.iter_pages) enregistre un
+RunMetrics: histogrammes de latence des requêtes, temps de parsing,
+tentatives, octets téléchargés, annonces/seconde et erreurs par type. Les
+derniers runs sont gardés en mémoire (buffer circulaire) et peuvent être
+écrits dans un fichier JSONL et/ou un fichier texte au format Prometheus
+(collecteur textfile de node_exporter).
+"""
+
+import json
+import os
+import threading
+import time
+from collections import Counter, deque
+
+import requests
+
+from resilience import CircuitOpenError
+
+# Bornes supérieures (secondes) des classes des histogrammes de latence
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Bornes supérieures (secondes) des classes de l'histogramme de parsing
+PARSE_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25)
+
+# Nombre de runs gardés en mémoire
+DEFAULT_MAX_RUNS = 50
+
+# Types de requêtes instrumentées
+REQUEST_KINDS = ("listing", "annonce")
+
+
+class Histogram:
+    """Histogramme cumulatif à classes fixes (comme Prometheus)."""
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # dernière classe: +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                break
+        else:
+            i = len(self.buckets)
+        self.counts[i] += 1
+        self.sum += value
+        self.count += 1
+
+    def merge(self, other: "Histogram") -> None:
+        self.counts = [a + b for a, b in zip(self.counts, other.counts)]
+        self.sum += other.sum
+        self.count += other.count
+
+    def snapshot(self) -> dict:
+        return {
+            "buckets": list(self.buckets),
+            "counts": list(self.counts),
+            "sum": round(self.sum, 6),
+            "count": self.count,
+            "mean": round(self.sum / self.count, 6) if self.count else 0.0,
+        }
+
+
+def classify_error(error: BaseException) -> str:
+    """
+    Type d'erreur: timeout, connexion, limitation (429), http_4xx, http_5xx,
+    circuit (site en panne, voir resilience.CircuitBreaker), parsing ou autre.
+    """
+    if isinstance(error, CircuitOpenError):
+        return "circuit"
+    if isinstance(error, requests.Timeout):
+        return "timeout"
+    if isinstance(error, requests.ConnectionError):
+        return "connexion"
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        if error.response.status_code == 429:
+            return "limitation"
+        return "http_5xx" if error.response.status_code >= 500 else "http_4xx"
+    if isinstance(error, (AttributeError, IndexError, KeyError, ValueError)):
+        return "parsing"
+    return "autre"
+
+
+class RunMetrics:
+    """
+    Mesures d'un scraping de catégorie. Thread-safe: les requêtes d'un run
+    concurrent sont enregistrées depuis plusieurs threads.
+
+    Args:
+        run_id: Identifiant du run
+        category: Catégorie scrapée
+    """
+
+    def __init__(self, run_id: str, category: str):
+        self.run_id = run_id
+        self.category = category
+        self.started_at = time.time()
+        self.finished_at = None
+        self.latency = {kind: Histogram(LATENCY_BUCKETS) for kind in REQUEST_KINDS}
+        self.parse_time = Histogram(PARSE_BUCKETS)
+        self.bytes = 0
+        self.retries = 0
+        self.pages = 0
+        self.ads = 0
+        self.errors = Counter()
+        # File de parsing (voir parse_pool): profondeur à chaque dépôt et
+        # attente des threads quand elle est pleine
+        self.queue_samples = 0
+        self.queue_depth_sum = 0
+        self.queue_depth_max = 0
+        self.queue_wait = 0.0
+        self._lock = threading.Lock()
+
+    def observe_request(self, kind: str, seconds: float, nbytes: int) -> None:
+        with self._lock:
+            self.latency[kind].observe(seconds)
+            self.bytes += nbytes
+
+    def observe_parse(self, seconds: float) -> None:
+        with self._lock:
+            self.parse_time.observe(seconds)
+
+    def observe_queue(self, depth: int, waited: float) -> None:
+        with self._lock:
+            self.queue_samples += 1
+            self.queue_depth_sum += depth
+            self.queue_depth_max = max(self.queue_depth_max, depth)
+            self.queue_wait += waited
+
+    def record_retry(self) -> None:
+        with self._lock:
+            self.retries += 1
+
+    def record_error(self, error: BaseException) -> None:
+        with self._lock:
+            self.errors[classify_error(error)] += 1
+
+    def record_page(self, ads: int) -> None:
+        with self._lock:
+            self.pages += 1
+            self.ads += ads
+
+    def finish(self) -> None:
+        with self._lock:
+            if self.finished_at is None:
+                self.finished_at = time.time()
+
+    def merge(self, other: "RunMetrics") -> None:
+        """Ajoute les compteurs d'un autre run (totaux par catégorie)."""
+        with self._lock:
+            for kind in REQUEST_KINDS:
+                self.latency[kind].merge(other.latency[kind])
+            self.parse_time.merge(other.parse_time)
+            self.bytes += other.bytes
+            self.retries += other.retries
+            self.pages += other.pages
+            self.ads += other.ads
+            self.errors.update(other.errors)
+            self.queue_samples += other.queue_samples
+            self.queue_depth_sum += other.queue_depth_sum
+            self.queue_depth_max = max(self.queue_depth_max, other.queue_depth_max)
+            self.queue_wait += other.queue_wait
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            end = self.finished_at or time.time()
+            duration = end - self.started_at
+            requests_count = sum(h.count for h in self.latency.values())
+
+            def per_second(value):
+                return round(value / duration, 3) if duration > 0 else 0.0
+
+            return {
+                "run_id": self.run_id,
+                "category": self.category,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at,
+                "duration": round(duration, 3),
+                "pages": self.pages,
+                "ads": self.ads,
+                "ads_per_second": round(self.ads / duration, 3) if duration > 0 else 0.0,
+                "requests": requests_count,
+                "bytes": self.bytes,
+                "retries": self.retries,
+                "errors": dict(self.errors),
+                "latency": {kind: h.snapshot() for kind, h in self.latency.items()},
+                "parse_time": self.parse_time.snapshot(),
+                # Débit et temps cumulé de chaque étape (pour dimensionner
+                # les threads de téléchargement et le pool de parsing)
+                "stages": {
+                    "fetch": {
+                        "per_second": per_second(requests_count),
+                        "bytes_per_second": per_second(self.bytes),
+                        "busy_seconds": round(sum(h.sum for h in self.latency.values()), 3),
+                    },
+                    "parse": {
+                        "per_second": per_second(self.parse_time.count),
+                        "busy_seconds": round(self.parse_time.sum, 3),
+                    },
+                    "queue": {
+                        "max_depth": self.queue_depth_max,
+                        "mean_depth": (
+                            round(self.queue_depth_sum / self.queue_samples, 2)
+                            if self.queue_samples
+                            else 0.0
+                        ),
+                        "wait_seconds": round(self.queue_wait, 3),
+                    },
+                },
+            }
+
+
+def _prometheus_histogram(lines, name, labels, histogram):
+    cumulative = 0
+    for bound, count in zip(histogram.buckets + ("+Inf",), histogram.counts):
+        cumulative += count
+        lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+    lines.append(f"{name}_sum{{{labels}}} {histogram.sum}")
+    lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+
+
+class MetricsRegistry:
+    """
+    Registre des runs du processus.
+
+    Les max_runs derniers runs sont gardés en mémoire; les totaux par
+    catégorie (depuis le démarrage du processus) alimentent l'export
+    Prometheus. À la fin de chaque run, son résumé est ajouté au fichier
+    JSONL et le fichier Prometheus est réécrit (si configurés).
+
+    Args:
+        max_runs: Taille du buffer circulaire des runs
+        jsonl_path: Fichier JSONL des runs terminés (optionnel)
+        prometheus_path: Fichier texte Prometheus (optionnel)
+    """
+
+    def __init__(
+        self,
+        max_runs: int = DEFAULT_MAX_RUNS,
+        jsonl_path: str | None = None,
+        prometheus_path: str | None = None,
+    ):
+        self.jsonl_path = jsonl_path
+        self.prometheus_path = prometheus_path
+        self._runs = deque(maxlen=max_runs)
+        self._totals = {}  # catégorie -> RunMetrics cumulé des runs terminés
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def configure(self, jsonl_path: str | None = None, prometheus_path: str | None = None) -> None:
+        with self._lock:
+            self.jsonl_path = jsonl_path
+            self.prometheus_path = prometheus_path
+
+    def start_run(self, category: str) -> RunMetrics:
+        with self._lock:
+            self._count += 1
+            run = RunMetrics(f"{int(time.time())}-{os.getpid()}-{self._count}", category)
+            self._runs.append(run)
+        return run
+
+    def finish_run(self, run: RunMetrics) -> None:
+        run.finish()
+        with self._lock:
+            totals = self._totals.setdefault(run.category, RunMetrics("total", run.category))
+            totals.merge(run)
+            jsonl_path, prometheus_path = self.jsonl_path, self.prometheus_path
+
+        if jsonl_path:
+            line = json.dumps(run.snapshot(), ensure_ascii=False)
+            with open(jsonl_path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+        if prometheus_path:
+            tmp_path = f"{prometheus_path}.{os.getpid()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(self.prometheus_text())
+            os.replace(tmp_path, prometheus_path)
+
+    def runs(self, last: int | None = None) -> list[dict]:
+        """Résumés des derniers runs, du plus récent au plus ancien."""
+        with self._lock:
+            runs = list(self._runs)[::-1]
+        return [run.snapshot() for run in runs[:last]]
+
+    def prometheus_text(self) -> str:
+        """Totaux par catégorie des runs terminés, au format texte Prometheus."""
+        with self._lock:
+            totals = list(self._totals.values())
+
+        lines = [
+            "# HELP coinafrique_request_seconds Durée des requêtes HTTP",
+            "# TYPE coinafrique_request_seconds histogram",
+        ]
+        for run in totals:
+            for kind, histogram in run.latency.items():
+                labels = f'category="{run.category}",kind="{kind}"'
+                _prometheus_histogram(lines, "coinafrique_request_seconds", labels, histogram)
+        lines += [
+            "# HELP coinafrique_parse_seconds Durée du parsing des annonces",
+            "# TYPE coinafrique_parse_seconds histogram",
+        ]
+        for run in totals:
+            labels = f'category="{run.category}"'
+            _prometheus_histogram(lines, "coinafrique_parse_seconds", labels, run.parse_time)
+
+        counters = [
+            ("coinafrique_downloaded_bytes_total", "Octets téléchargés", "bytes"),
+            ("coinafrique_retries_total", "Nouvelles tentatives de requêtes", "retries"),
+            ("coinafrique_pages_total", "Pages de listing scrapées", "pages"),
+            ("coinafrique_ads_total", "Annonces récupérées", "ads"),
+            (
+                "coinafrique_parse_queue_wait_seconds_total",
+                "Attente des threads devant la file de parsing pleine",
+                "queue_wait",
+            ),
+        ]
+        for name, help_text, attribute in counters:
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+            for run in totals:
+                lines.append(f'{name}{{category="{run.category}"}} {getattr(run, attribute)}')
+        lines += [
+            "# HELP coinafrique_errors_total Erreurs par type",
+            "# TYPE coinafrique_errors_total counter",
+        ]
+        for run in totals:
+            for kind, count in sorted(run.errors.items()):
+                lines.append(
+                    f'coinafrique_errors_total{{category="{run.category}",type="{kind}"}} {count}'
+                )
+        return "\n".join(lines) + "\n"
+
+
+_registry = None
+_registry_lock = threading.Lock()
+
+
+def get_metrics() -> MetricsRegistry:
+    """Registre des runs partagé par le processus."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = MetricsRegistry()
+        return _registry
@@ -2,6 +2,6 @@
 Module contenant les différentes pages de l'application
 """
 
-from . import scraping, download, dashboard, evaluation
+from . import scraping, download, search, dashboard, metrics, evaluation
 
-__all__ = ['scraping', 'download', 'dashboard', 'evaluation']
+__all__ = ['scraping', 'download', 'search', 'dashboard', 'metrics', 'evaluation']
@@ -1,7 +1,12 @@
-
 import streamlit as st
 
-from data_cleaner import load_and_clean_all_data
+from aggregates import ALL_CATEGORIES, get_aggregates
+from data_cleaner import sync_database
+from images import fetch_thumbnails
+from listings_db import where_clause
+
+# Nombre d'annonces récentes affichées avec leur image
+RECENT_ADS = 8
 
 
 def show():
@@ -14,39 +19,44 @@ def show():
 
     st.divider()
 
-    # Charger et nettoyer les données
+    # Charger les agrégats (recalculés seulement quand les données changent)
     with st.spinner("Chargement et nettoyage des données..."):
-        df = load_and_clean_all_data()
+        aggregates = get_aggregates()
 
     # Vérifier si des données sont disponibles
-    if df.empty:
+    if not aggregates["slices"]:
         st.warning("Aucune donnée disponible pour le dashboard.")
         st.info(
             "Veuillez d'abord ajouter des fichiers CSV dans le dossier **webscraper_data**."
         )
         return
 
+    # Annonces présentes dans plusieurs fichiers (ou scrapées plusieurs fois)
+    duplicates = sync_database().duplicate_report()
+    if duplicates["doublons"].sum():
+        with st.expander(
+            f"{duplicates['doublons'].sum()} doublons retirés (version la plus récente gardée)"
+        ):
+            st.dataframe(duplicates, width="stretch", hide_index=True)
+
 
     # Filtres
     st.markdown("### Filtres")
 
     # Sélecteur de catégorie
-    categories_disponibles = ["Toutes"] + df["categorie"].unique().tolist()
+    categories_disponibles = [ALL_CATEGORIES] + aggregates["categories"]
     categorie_selectionnee = st.selectbox(
         "Sélectionner une catégorie",
         options=categories_disponibles,
         index=0
     )
 
-    # Filtrer le DataFrame
-    if categorie_selectionnee != "Toutes":
-        df_filtered = df[df["categorie"] == categorie_selectionnee]
-    else:
-        df_filtered = df
+    # Agrégats de la sélection
+    selection = aggregates["slices"][categorie_selectionnee]
 
 
-    # Graphiques basés sur le DataFrame
-    if not df_filtered.empty:
+    # Graphiques basés sur les agrégats
+    if selection["total"]:
 
         # Première ligne - 2 colonnes
         col1, col2 = st.columns(2)
@@ -54,19 +64,18 @@ def show():
         with col1:
             # Graphique 1: Nombre d'annonces par catégorie - Bar Chart
             st.markdown("#### Nombre d'annonces par catégorie")
-            if "categorie" in df_filtered.columns:
-                cat_counts = df_filtered["categorie"].value_counts().reset_index()
-                cat_counts.columns = ["Catégorie", "Nombre"]
-                st.bar_chart(cat_counts, x="Catégorie", y="Nombre", color="#1f77b4")
-            else:
-                st.info("Aucune donnée de catégorie disponible")
+            st.bar_chart(
+                selection["category_counts"], x="Catégorie", y="Nombre", color="#1f77b4"
+            )
 
         with col2:
-            # Graphique 2: Nombre d'annonces par ville (top 10) - Line Chart
-            st.markdown("#### Nombre d'annonces par ville (Line Chart)")
-            ville_counts = df_filtered["adresse"].value_counts().head(10).reset_index()
-            ville_counts.columns = ["Ville", "Nombre"]
-            st.line_chart(ville_counts, x="Ville", y="Nombre", color="#ff7f0e")
+            # Graphique 2: Nombre d'annonces par ville ou quartier (top 10) - Line Chart
+            niveau = st.radio(
+                "Regrouper par", options=["Ville", "Quartier"], horizontal=True
+            )
+            st.markdown(f"#### Nombre d'annonces par {niveau.lower()} (Line Chart)")
+            counts = selection["city_counts" if niveau == "Ville" else "neighborhood_counts"]
+            st.line_chart(counts, x=niveau, y="Nombre", color="#ff7f0e")
 
         st.divider()
 
@@ -76,24 +85,58 @@ def show():
         with col3:
             # Graphique 3: Évolution cumulative - Area Chart
             st.markdown("#### Distribution cumulative des annonces")
-            cumul_data = df_filtered.reset_index()
-            cumul_data["Index"] = range(1, len(cumul_data) + 1)
-            cumul_data["Cumul"] = cumul_data["Index"]
-            st.area_chart(cumul_data.head(100), x="Index", y="Cumul", color="#2ca02c")
+            cumul = list(range(1, min(selection["total"], 100) + 1))
+            st.area_chart(
+                {"Index": cumul, "Cumul": cumul}, x="Index", y="Cumul", color="#2ca02c"
+            )
 
         with col4:
             # Graphique 4: Distribution des prix - Scatter Chart
             st.markdown("#### Distribution des prix")
-            if "prix" in df_filtered.columns:
-              
-                scatter_data = df_filtered.copy()
-                scatter_data["prix_numeric"] = scatter_data["prix"]
-                scatter_data = scatter_data[scatter_data["prix_numeric"].notna()].head(100)
-
-                if not scatter_data.empty:
-                    scatter_data["Index"] = range(1, len(scatter_data) + 1)
-                    st.scatter_chart(scatter_data, x="Index", y="prix_numeric", color="#d62728")
-                else:
-                    st.info("Aucune donnée de prix disponible")
+            # Seulement les annonces avec un prix (hors "Prix sur demande")
+            scatter_data = selection["price_sample"]
+
+            if not scatter_data.empty:
+                st.scatter_chart(scatter_data, x="Index", y="prix_fcfa", color="#d62728")
+
+                quantiles = selection["price_quantiles"]
+                q1, q2, q3 = st.columns(3)
+                q1.metric("1er quartile", f"{quantiles[0.25]:,.0f} FCFA".replace(",", " "))
+                q2.metric("Prix médian", f"{quantiles[0.5]:,.0f} FCFA".replace(",", " "))
+                q3.metric("3e quartile", f"{quantiles[0.75]:,.0f} FCFA".replace(",", " "))
             else:
                 st.info("Aucune donnée de prix disponible")
+
+        # Évolution du prix médian (historique des scrapings, une observation
+        # par annonce et par semaine)
+        weekly = selection["weekly_median"]
+        if len(weekly) > 1:
+            st.divider()
+            st.markdown("#### Prix médian par semaine (FCFA)")
+            st.line_chart(weekly, x="Semaine", y="Prix médian", color="#8c564b")
+
+        # Troisième ligne - histogramme des prix (classes logarithmiques)
+        if selection["price_histogram"] is not None:
+            st.divider()
+            st.markdown("#### Histogramme des prix (FCFA)")
+            st.bar_chart(
+                selection["price_histogram"], x="Prix", y="Nombre", color="#9467bd"
+            )
+
+        # Annonces récentes avec leur vignette (cache local des images)
+        st.divider()
+        if st.toggle("Afficher les annonces récentes avec images"):
+            categories = None if categorie_selectionnee == ALL_CATEGORIES else [categorie_selectionnee]
+            where, params = where_clause(categories=categories)
+            where = f"{where} AND" if where else " WHERE"
+            recent = sync_database().query(
+                f"SELECT Nom, prix, ville, image_url FROM listings{where} image_url IS NOT NULL "
+                "ORDER BY scraped_at DESC LIMIT ?",
+                [*params, RECENT_ADS],
+            )
+            thumbnails = fetch_thumbnails(recent["image_url"])
+            for column, ad in zip(st.columns(4) * 2, recent.itertuples()):
+                with column:
+                    if ad.image_url in thumbnails:
+                        st.image(thumbnails[ad.image_url])
+                    st.caption(f"**{ad.Nom}** - {ad.prix} - {ad.ville or ''}")
@@ -1,7 +1,96 @@
 import os
 
-import streamlit as st
 import pandas as pd
+import streamlit as st
+
+from data_browser import DEFAULT_PAGE_SIZE, open_table, query_page
+from data_cleaner import extract_image_urls, sync_database
+from sources import list_sources
+from exports import EXPORT_FORMATS, build_export
+from images import fetch_thumbnails, thumbnail_data_uri
+
+# Tailles de page proposées
+PAGE_SIZES = [25, DEFAULT_PAGE_SIZE, 100, 200]
+
+# Option "pas de tri" du sélecteur de tri
+NO_SORT = "(ordre du fichier)"
+
+# Colonne des vignettes dans l'aperçu
+PREVIEW_COLUMN = "Aperçu"
+
+# Libellés des formats d'export
+EXPORT_LABELS = {"csv": "CSV", "parquet": "Parquet", "jsonl": "JSON lines (gzip)"}
+
+
+def show_export(data_folder):
+    """Export d'une sélection des données combinées (toutes catégories)."""
+    st.subheader("Exporter une sélection")
+
+    # Options des filtres lues dans la base (pas de chargement des annonces)
+    db = sync_database(data_folder)
+    options = {
+        column: db.query(
+            f"SELECT DISTINCT {column} FROM listings WHERE {column} IS NOT NULL ORDER BY 1"
+        )[column].tolist()
+        for column in ("categorie", "ville")
+    }
+    if not options["categorie"]:
+        st.info("Aucune donnée à exporter.")
+        return
+
+    col1, col2 = st.columns(2)
+    with col1:
+        categories = st.multiselect(
+            "Catégories (toutes si vide)",
+            options=options["categorie"],
+        )
+    with col2:
+        cities = st.multiselect(
+            "Villes (toutes si vide)",
+            options=options["ville"],
+        )
+
+    price_range = None
+    min_price, max_price = db.query(
+        "SELECT MIN(prix_fcfa), MAX(prix_fcfa) FROM listings"
+    ).iloc[0]
+    if pd.notna(min_price) and st.checkbox("Filtrer par prix (exclut les prix sur demande)"):
+        # (champs numériques plutôt qu'un slider: certains prix aberrants
+        # dépassent les entiers représentables côté navigateur)
+        col1, col2 = st.columns(2)
+        with col1:
+            low = st.number_input(
+                "Prix minimum (FCFA)", value=float(min_price), step=1000.0, format="%.0f"
+            )
+        with col2:
+            high = st.number_input(
+                "Prix maximum (FCFA)", value=float(max_price), step=1000.0, format="%.0f"
+            )
+        price_range = (low, high)
+
+    fmt = st.radio(
+        "Format",
+        options=list(EXPORT_FORMATS),
+        format_func=EXPORT_LABELS.get,
+        horizontal=True,
+    )
+
+    # Le fichier est construit au clic (ou réutilisé s'il existe déjà pour
+    # ces filtres et cette version des données), sans bloquer la page
+    def export_data():
+        path = build_export(fmt, categories, price_range, cities, data_folder=data_folder)
+        with open(path, "rb") as f:
+            return f.read()
+
+    extension, mime = EXPORT_FORMATS[fmt]
+    st.download_button(
+        "Télécharger la sélection",
+        data=export_data,
+        file_name=f"coinafrique_export{extension}",
+        mime=mime,
+        on_click="ignore",
+        icon=":material/download:",
+    )
 
 
 def show():
@@ -23,11 +112,11 @@ def show():
         st.error(f"Le dossier '{data_folder}' n'existe pas.")
         return
 
-    # Lister tous les fichiers CSV dans le dossier
-    csv_files = [f for f in os.listdir(data_folder) if f.endswith(".csv")]
+    # Lister tous les fichiers de données (CSV et Parquet) du dossier
+    csv_files = list_sources(data_folder)
 
     if not csv_files:
-        st.warning("Aucun fichier CSV trouvé dans le dossier webscraper_data.")
+        st.warning("Aucun fichier de données trouvé dans le dossier webscraper_data.")
         st.info("Veuillez d'abord scraper des données avec Web Scraper.")
         return
 
@@ -84,46 +173,100 @@ def show():
     # Afficher les données du fichier sélectionné
     if st.session_state.selected_file:
         selected_file = st.session_state.selected_file
-        file_path = os.path.join(data_folder, selected_file)
 
-        # Charger et afficher les données
+        # Ouvrir le fichier compacté (memory-map): seules les lignes affichées sont lues
         try:
-            df = pd.read_csv(file_path)
+            table = open_table(data_folder, selected_file)
 
             # Afficher les statistiques
             col1, col2 = st.columns(2)
 
             with col1:
-                st.metric("Nombre de lignes", len(df))
+                st.metric("Nombre de lignes", table.num_rows)
 
             with col2:
-                st.metric("Nombre de colonnes", len(df.columns))
+                st.metric("Nombre de colonnes", table.num_columns)
 
             st.divider()
 
             # Prévisualisation des données
             st.subheader("Aperçu des données")
 
-            # Options d'affichage
-            col1, col2 = st.columns([1, 3])
+            # Filtre et tri (exécutés sur le fichier, pas dans le navigateur)
+            columns = table.column_names
+            col1, col2, col3, col4 = st.columns([2, 3, 2, 1])
+            with col1:
+                filter_column = st.selectbox(
+                    "Filtrer la colonne",
+                    options=columns,
+                    index=columns.index("Nom") if "Nom" in columns else 0,
+                )
+            with col2:
+                filter_text = st.text_input("Contient", key=f"filter_{selected_file}")
+            with col3:
+                sort_column = st.selectbox("Trier par", options=[NO_SORT] + columns)
+            with col4:
+                ascending = st.radio("Ordre", options=["↑", "↓"], horizontal=True) == "↑"
+
+            # Pagination
+            col1, col2, col3 = st.columns([1, 1, 2])
             with col1:
-                num_rows = st.number_input(
-                    "Nombre de lignes à afficher",
-                    min_value=5,
-                    max_value=len(df),
-                    value=min(10, len(df)),
-                    step=5,
+                page_size = st.selectbox(
+                    "Lignes par page",
+                    options=PAGE_SIZES,
+                    index=PAGE_SIZES.index(DEFAULT_PAGE_SIZE),
                 )
 
-            # Afficher les données
-            st.dataframe(
-                df.head(num_rows), width="stretch", hide_index=False
+            page_key = f"page_{selected_file}"
+            with col2:
+                page = st.number_input("Page", min_value=1, step=1, key=page_key)
+
+            page_df, total = query_page(
+                data_folder,
+                selected_file,
+                page=page,
+                page_size=page_size,
+                filters={filter_column: filter_text.strip()},
+                sort_by=None if sort_column == NO_SORT else sort_column,
+                ascending=ascending,
             )
+            num_pages = max((total + page_size - 1) // page_size, 1)
+            with col3:
+                st.caption(f"{total} lignes, page {min(page, num_pages)} sur {num_pages}")
+
+            # Afficher seulement la page demandée
+            if page > num_pages:
+                st.info("Cette page est vide: choisissez une page plus petite.")
+            else:
+                column_config = None
+                if "image_lien" in page_df.columns and st.toggle(
+                    "Afficher les images",
+                    help="Vignettes téléchargées une fois puis servies depuis le cache local",
+                ):
+                    # Vignettes de la page seulement, en data URI (pas de lien
+                    # direct vers images.coinafrique.com)
+                    urls = extract_image_urls(page_df["image_lien"])
+                    thumbnails = fetch_thumbnails(urls)
+                    page_df.insert(
+                        0,
+                        PREVIEW_COLUMN,
+                        [
+                            thumbnail_data_uri(thumbnails[u]) if u in thumbnails else None
+                            for u in urls.fillna("")
+                        ],
+                    )
+                    column_config = {PREVIEW_COLUMN: st.column_config.ImageColumn()}
+                st.dataframe(
+                    page_df, width="stretch", hide_index=False, column_config=column_config
+                )
 
 
         except Exception as e:
             st.error(f"Erreur lors de la lecture du fichier: {str(e)}")
-            st.info("Assurez-vous que le fichier est un CSV valide.")
+            st.info("Assurez-vous que le fichier est un CSV ou un Parquet valide.")
 
     else:
         st.info("Cliquez sur un bouton ci-dessus pour visualiser ces données")
+
+    st.divider()
+    show_export(data_folder)
@@ -0,0 +1,126 @@
+import json
+
+import pandas as pd
+import streamlit as st
+
+from metrics import REQUEST_KINDS, get_metrics
+
+# Nombre de runs affichés par défaut
+DEFAULT_RUNS = 10
+
+
+def _histogram_frame(histogram: dict) -> pd.DataFrame:
+    """Classes d'un histogramme (voir metrics.Histogram.snapshot) pour st.bar_chart."""
+    labels = [f"≤ {bound:g} s" for bound in histogram["buckets"]] + [
+        f"> {histogram['buckets'][-1]:g} s"
+    ]
+    return pd.DataFrame({"classe": labels, "requêtes": histogram["counts"]}).set_index("classe")
+
+
+def show():
+    """Affiche la page des mesures des scrapings"""
+
+    st.title("Scraping metrics")
+    st.markdown("""
+    Mesures des derniers scrapings de ce processus: latence des requêtes,
+    temps de parsing, nouvelles tentatives, volume téléchargé et erreurs.
+    """)
+
+    st.divider()
+
+    registry = get_metrics()
+    count = st.number_input("Nombre de runs", min_value=1, max_value=50, value=DEFAULT_RUNS)
+    runs = registry.runs(last=int(count))
+    if not runs:
+        st.info("Aucun scraping depuis le démarrage de l'application.")
+        return
+
+    # Un run par ligne, du plus récent au plus ancien
+    summary = pd.DataFrame(
+        {
+            "Run": [run["run_id"] for run in runs],
+            "Catégorie": [run["category"] for run in runs],
+            "Début": pd.to_datetime([run["started_at"] for run in runs], unit="s"),
+            "En cours": [run["finished_at"] is None for run in runs],
+            "Durée (s)": [run["duration"] for run in runs],
+            "Pages": [run["pages"] for run in runs],
+            "Annonces": [run["ads"] for run in runs],
+            "Annonces/s": [run["ads_per_second"] for run in runs],
+            "Requêtes": [run["requests"] for run in runs],
+            "Ko téléchargés": [round(run["bytes"] / 1024, 1) for run in runs],
+            "Tentatives": [run["retries"] for run in runs],
+            "Erreurs": [sum(run["errors"].values()) for run in runs],
+        }
+    )
+    st.dataframe(summary, width="stretch", hide_index=True)
+
+    # Détail d'un run
+    st.markdown("### Détail d'un run")
+    labels = [f"{run['run_id']} ({run['category']})" for run in runs]
+    run = runs[st.selectbox("Run", options=range(len(runs)), format_func=labels.__getitem__)]
+
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Annonces/s", run["ads_per_second"])
+    col2.metric("Latence moyenne (annonces)", f"{run['latency']['annonce']['mean'] * 1000:.0f} ms")
+    col3.metric("Parsing moyen", f"{run['parse_time']['mean'] * 1000:.1f} ms")
+    col4.metric("Tentatives", run["retries"])
+
+    # Débit des étapes et file de parsing (pool de processus, voir parse_pool)
+    stages = run["stages"]
+    st.dataframe(
+        pd.DataFrame(
+            {
+                "Étape": ["Téléchargement", "Parsing"],
+                "Par seconde": [stages["fetch"]["per_second"], stages["parse"]["per_second"]],
+                "Temps cumulé (s)": [
+                    stages["fetch"]["busy_seconds"],
+                    stages["parse"]["busy_seconds"],
+                ],
+            }
+        ),
+        hide_index=True,
+    )
+    if stages["queue"]["max_depth"]:
+        st.caption(
+            f"File de parsing: profondeur max {stages['queue']['max_depth']}, "
+            f"moyenne {stages['queue']['mean_depth']}, "
+            f"attente des threads {stages['queue']['wait_seconds']} s"
+        )
+
+    columns = st.columns(len(REQUEST_KINDS))
+    for column, kind in zip(columns, REQUEST_KINDS):
+        with column:
+            st.markdown(f"**Latence des requêtes ({kind})**")
+            if run["latency"][kind]["count"]:
+                st.bar_chart(_histogram_frame(run["latency"][kind]))
+            else:
+                st.caption("Aucune requête")
+
+    if run["errors"]:
+        st.markdown("**Erreurs par type**")
+        errors = pd.DataFrame(
+            {"Type": list(run["errors"]), "Nombre": list(run["errors"].values())}
+        )
+        st.dataframe(errors, hide_index=True)
+
+    # Exports
+    st.markdown("### Exports")
+    col1, col2 = st.columns(2)
+    with col1:
+        st.download_button(
+            "Runs (JSONL)",
+            data="".join(json.dumps(r, ensure_ascii=False) + "\n" for r in runs),
+            file_name="scraping_runs.jsonl",
+            mime="application/jsonl",
+            on_click="ignore",
+            width="stretch",
+        )
+    with col2:
+        st.download_button(
+            "Totaux (Prometheus)",
+            data=registry.prometheus_text(),
+            file_name="coinafrique.prom",
+            mime="text/plain",
+            on_click="ignore",
+            width="stretch",
+        )
@@ -1,5 +1,127 @@
+import time
+
 import streamlit as st
-from scraper import CATEGORY_URLS, scrape_category
+from http_client import get_default_client
+from jobs import get_job_manager
+from listings_db import get_listings_db
+from snapshots import SnapshotStore
+from scraper import CATEGORY_URLS, compare_extraction_modes, scrape_category
+
+
+def show_cache_stats(before, after):
+    """Affiche les statistiques du cache HTTP pour le dernier scraping"""
+    delta = {key: after[key] - before[key] for key in ("hits", "revalidated", "misses", "bytes_saved")}
+    lookups = delta["hits"] + delta["revalidated"] + delta["misses"]
+    if not lookups:
+        return
+
+    st.subheader("Cache HTTP")
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Servies depuis le cache", delta["hits"])
+    col2.metric("Revalidées (304)", delta["revalidated"])
+    col3.metric("Téléchargées", delta["misses"])
+    col4.metric("Données économisées", f"{delta['bytes_saved'] / 1024 / 1024:.1f} Mo")
+
+
+@st.fragment(run_every=1)
+def show_jobs():
+    """Affiche la progression des jobs en arrière-plan (rafraîchie chaque seconde)"""
+    jobs = get_job_manager().jobs()
+    if not jobs:
+        st.caption("Aucun job lancé.")
+        return
+
+    for job in jobs[:5]:
+        elapsed = (job.finished_at or time.time()) - job.started_at
+        status = "terminé" if job.done else "en cours"
+        with st.expander(
+            f"Job #{job.id} - {status} ({elapsed:.0f} s)", expanded=not job.done
+        ):
+            for category, state in job.snapshot().items():
+                st.progress(
+                    min(state["page"] / job.num_pages, 1.0),
+                    text=f"{category}: {state['status']}, page {state['page']}/{job.num_pages}, {state['ads']} annonces",
+                )
+                if state["error"]:
+                    st.error(f"{category}: {state['error']}")
+
+            if job.done:
+                category = st.selectbox(
+                    "Aperçu des résultats",
+                    options=job.categories,
+                    key=f"job_{job.id}_preview",
+                )
+                st.dataframe(job.result(category).head(10), width="stretch")
+            elif st.button("Annuler", key=f"job_{job.id}_cancel"):
+                job.cancel()
+
+
+def show_background_scraping():
+    """Formulaire de scraping de plusieurs catégories en arrière-plan"""
+    st.subheader("Scraping de plusieurs catégories en arrière-plan")
+    st.markdown("""
+    Les catégories sont scrapées en parallèle sous une limite de débit globale.
+    Le job continue même si vous changez de page; un job annulé ou interrompu
+    reprend où il s'était arrêté au lancement suivant.
+    """)
+
+    col1, col2, col3 = st.columns([2, 1, 1], vertical_alignment="bottom")
+    with col1:
+        categories = st.multiselect(
+            "Catégories",
+            options=list(CATEGORY_URLS.keys()),
+            default=list(CATEGORY_URLS.keys()),
+        )
+    with col2:
+        num_pages = st.selectbox(
+            "Pages par catégorie",
+            options=list(range(1, 51)),
+            index=1,
+            key="job_num_pages",
+        )
+    with col3:
+        if st.button("Lancer le job", width="stretch", disabled=not categories):
+            try:
+                get_job_manager().submit(
+                    categories,
+                    num_pages,
+                    max_workers=4,
+                    stores=[get_listings_db(), SnapshotStore()],
+                )
+            except ValueError as e:
+                st.error(str(e))
+
+    show_jobs()
+
+
+def show_mode_comparison(category):
+    """Compare les champs obtenus par les deux modes d'extraction sur une page"""
+    with st.expander("Comparer le mode rapide et le mode complet"):
+        st.caption(
+            "Scrape la première page de la catégorie dans les deux modes et compare "
+            "les champs obtenus."
+        )
+        if not st.button("Comparer"):
+            return
+        with st.spinner("Scraping de la page dans les deux modes..."):
+            report = compare_extraction_modes(category, 1)
+
+        col1, col2 = st.columns(2)
+        for column, mode, label in ((col1, "cards", "Cartes"), (col2, "detail", "Pages d'annonces")):
+            column.metric(
+                label,
+                f"{report['ads'][mode]} annonces",
+                f"{report['requests'][mode]} requêtes, {report['duration'][mode]:.1f} s",
+                delta_color="off",
+            )
+        st.dataframe(
+            report["fields"],
+            hide_index=True,
+            column_config={
+                name: st.column_config.ProgressColumn(name, format="percent", min_value=0, max_value=1)
+                for name in ("rempli (cartes)", "rempli (détail)", "identique")
+            },
+        )
 
 
 def show():
@@ -38,6 +160,16 @@ def show():
             "Lancer le Scraping", type="primary", width="stretch"
         )
 
+    incremental = st.toggle(
+        "Mode incrémental",
+        help="Ne récupérer que les nouvelles annonces et s'arrêter à la première page déjà connue",
+    )
+    cards_mode = st.toggle(
+        "Mode rapide (cartes du listing)",
+        help="Lire les annonces sur les pages de catégorie seulement (une requête par page); "
+        "la page d'une annonce n'est téléchargée que si sa carte est incomplète",
+    )
+
     st.divider()
 
     # Logique de scraping
@@ -57,11 +189,17 @@ def show():
             # Message de démarrage
             status_container.info("Scraping en cours... Veuillez patienter.")
 
+            cache = get_default_client().cache
+            cache_before = cache.stats.snapshot()
+
             # Appeler la fonction de scraping
             df = scrape_category(
                 category=category,
                 num_pages=num_pages,
                 progress_callback=update_progress,
+                incremental=incremental,
+                stores=[get_listings_db(), SnapshotStore()],
+                mode="cards" if cards_mode else "detail",
             )
 
             # Vider la barre de progression
@@ -69,7 +207,9 @@ def show():
             status_container.empty()
 
             # Vérifier si des données ont été récupérées
-            if df.empty:
+            if df.empty and incremental:
+                st.info("Aucune nouvelle annonce depuis le dernier scraping.")
+            elif df.empty:
                 st.error(
                     "Aucune annonce trouvée. Vérifiez votre connexion internet ou réessayez plus tard."
                 )
@@ -83,6 +223,8 @@ def show():
                 st.subheader("Aperçu des données scrapées")
                 st.dataframe(df.head(10), width="stretch", hide_index=False)
 
+            show_cache_stats(cache_before, cache.stats.snapshot())
+
         except Exception as e:
             # Gestion des erreurs
             progress_bar.empty()
@@ -91,3 +233,8 @@ def show():
             st.info(
                 "**Suggestions:**\n- Vérifiez votre connexion internet\n- Réessayez avec moins de pages\n- Le site Coinafrique pourrait être temporairement indisponible"
             )
+
+    show_mode_comparison(category)
+
+    st.divider()
+    show_background_scraping()
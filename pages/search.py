@@ -0,0 +1,145 @@
+import math
+
+import numpy as np
+import streamlit as st
+
+from images import fetch_thumbnails, thumbnail_data_uri
+from search_index import get_search_index
+
+# Tailles de page proposées
+PAGE_SIZES = [10, 20, 50]
+
+# Colonne des vignettes dans les résultats
+PREVIEW_COLUMN = "Aperçu"
+
+# Facettes: colonne de l'index -> (libellé, clé du widget)
+FACETS = {
+    "categorie": ("Catégories", "search_categories"),
+    "ville": ("Villes", "search_cities"),
+}
+
+
+def _facet_options(counts, selected):
+    """Valeurs proposées (les plus fréquentes d'abord), sélection incluse."""
+    options = list(counts.index)
+    return options + [value for value in selected if value not in counts.index]
+
+
+def show():
+    """Affiche la page de recherche dans les annonces"""
+
+    st.title("Search listings")
+    st.markdown("""
+    Recherche dans le nom et le titre des annonces (sans tenir compte des
+    accents ni des majuscules), avec des filtres par catégorie, ville et prix.
+    """)
+
+    st.divider()
+
+    # Index partagé par le processus, reconstruit quand les données changent
+    with st.spinner("Indexation des annonces..."):
+        index = get_search_index()
+
+    if not index.size:
+        st.warning("Aucune annonce à rechercher.")
+        st.info("Veuillez d'abord ajouter des fichiers CSV dans le dossier **webscraper_data**.")
+        return
+
+    query = st.text_input(
+        "Rechercher",
+        placeholder="ex: pitbull, bélier ladoum",
+        key="search_query",
+    )
+
+    # Filtres de prix (lus avant la recherche, widgets affichés plus bas)
+    price_range = None
+    if st.session_state.get("search_price_filter"):
+        price_range = (
+            st.session_state.get("search_price_min", 0.0),
+            st.session_state.get("search_price_max", math.inf),
+        )
+
+    # La recherche utilise les facettes déjà choisies: leurs compteurs
+    # s'affichent ensuite dans les sélecteurs
+    result = index.search(
+        query,
+        categories=st.session_state.get("search_categories"),
+        cities=st.session_state.get("search_cities"),
+        price_range=price_range,
+    )
+
+    col1, col2 = st.columns(2)
+    for container, (column, (label, key)) in zip((col1, col2), FACETS.items()):
+        counts = result["facets"].get(column)
+        if counts is None:
+            continue
+        with container:
+            st.multiselect(
+                f"{label} (toutes si vide)",
+                options=_facet_options(counts, st.session_state.get(key, [])),
+                format_func=lambda value, counts=counts: f"{value} ({counts.get(value, 0)})",
+                key=key,
+            )
+
+    if index.prices is not None and st.checkbox(
+        "Filtrer par prix (exclut les prix sur demande)", key="search_price_filter"
+    ):
+        min_price, max_price = np.nanmin(index.prices), np.nanmax(index.prices)
+        col1, col2 = st.columns(2)
+        with col1:
+            st.number_input(
+                "Prix minimum (FCFA)",
+                value=float(min_price),
+                step=1000.0,
+                format="%.0f",
+                key="search_price_min",
+            )
+        with col2:
+            st.number_input(
+                "Prix maximum (FCFA)",
+                value=float(max_price),
+                step=1000.0,
+                format="%.0f",
+                key="search_price_max",
+            )
+
+    st.divider()
+
+    # Pagination des résultats
+    col1, col2, col3 = st.columns([1, 1, 2])
+    with col1:
+        page_size = st.selectbox("Résultats par page", options=PAGE_SIZES, index=1)
+    num_pages = max(math.ceil(result["total"] / page_size), 1)
+    with col2:
+        page = st.number_input("Page", min_value=1, step=1, key="search_page")
+    with col3:
+        st.caption(
+            f"{result['total']} annonces, page {min(page, num_pages)} sur {num_pages} "
+            f"({result['seconds'] * 1000:.1f} ms)"
+        )
+
+    if not result["total"]:
+        st.info("Aucune annonce ne correspond à cette recherche.")
+        return
+    if page > num_pages:
+        st.info("Cette page est vide: choisissez une page plus petite.")
+        return
+
+    page_df = index.page(result, page, page_size)
+    column_config = {"image_url": None}
+    if st.toggle(
+        "Afficher les images",
+        help="Vignettes téléchargées une fois puis servies depuis le cache local",
+    ):
+        urls = page_df["image_url"].astype("string")
+        thumbnails = fetch_thumbnails(urls.dropna().tolist())
+        page_df.insert(
+            0,
+            PREVIEW_COLUMN,
+            [
+                thumbnail_data_uri(thumbnails[u]) if u in thumbnails else None
+                for u in urls.fillna("")
+            ],
+        )
+        column_config[PREVIEW_COLUMN] = st.column_config.ImageColumn()
+    st.dataframe(page_df, width="stretch", column_config=column_config)
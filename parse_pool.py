@@ -0,0 +1,117 @@
+"""
+Pool de processus de parsing des pages d'annonces.
+
+Le parsing HTML (surtout avec BeautifulSoup) est limité par le CPU et garde
+le GIL: dans les threads du scraper, il ne se superpose pas aux
+téléchargements et n'utilise qu'un cœur. Avec un ParsePool, les threads
+déposent le HTML brut dans une file bornée et des processus le parsent en
+tuples compacts. Quand la file est pleine, les threads attendent
+(backpressure): la mémoire ne grandit pas si le parsing prend du retard.
+
+Ce module n'importe que parsers: les processus démarrent vite.
+"""
+
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Future, ProcessPoolExecutor
+
+from parsers import parse_ad
+
+# Champs des tuples produits par le pool (ordre de parse_ad)
+AD_TUPLE_FIELDS = ("Nom", "prix", "adresse", "image_lien")
+
+# Pages en attente de parsing par processus, au-delà desquelles submit() bloque
+DEFAULT_PENDING_PER_PROCESS = 4
+
+
+def default_processes() -> int:
+    """Nombre de cœurs utilisables par ce processus."""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def _parse_ad_tuple(content: bytes, backend: str) -> tuple[tuple, float]:
+    """Parse une page d'annonce (dans un processus du pool)."""
+    start = time.perf_counter()
+    dic = parse_ad(content, backend)
+    return tuple(dic[field] for field in AD_TUPLE_FIELDS), time.perf_counter() - start
+
+
+class ParsePool:
+    """
+    Processus de parsing alimentés par une file bornée.
+
+    Args:
+        processes: Nombre de processus (par défaut un par cœur)
+        max_pending: Pages en attente au-delà desquelles submit() bloque
+            (par défaut DEFAULT_PENDING_PER_PROCESS par processus)
+    """
+
+    def __init__(self, processes: int | None = None, max_pending: int | None = None):
+        self.processes = processes or default_processes()
+        self.max_pending = max_pending or DEFAULT_PENDING_PER_PROCESS * self.processes
+        # spawn: pas de fork d'un processus qui a déjà des threads (Streamlit)
+        self._executor = ProcessPoolExecutor(
+            self.processes, mp_context=multiprocessing.get_context("spawn")
+        )
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._lock = threading.Lock()
+        self._pending = 0
+
+    @property
+    def pending(self) -> int:
+        """Pages dans la file (soumises, pas encore parsées)."""
+        with self._lock:
+            return self._pending
+
+    def submit(self, content: bytes, backend: str) -> tuple[Future, int, float]:
+        """
+        Dépose une page dans la file; bloque tant que la file est pleine.
+
+        Args:
+            content: HTML brut de la page d'annonce
+            backend: Backend de parsing
+
+        Returns:
+            (Future du résultat, profondeur de la file après dépôt, secondes
+            d'attente d'une place): la Future donne (tuple des champs de
+            AD_TUPLE_FIELDS, secondes de parsing)
+        """
+        start = time.perf_counter()
+        self._slots.acquire()
+        waited = time.perf_counter() - start
+        with self._lock:
+            self._pending += 1
+            depth = self._pending
+        try:
+            future = self._executor.submit(_parse_ad_tuple, content, backend)
+        except BaseException:
+            self._release()
+            raise
+        future.add_done_callback(lambda _: self._release())
+        return future, depth, waited
+
+    def _release(self) -> None:
+        with self._lock:
+            self._pending -= 1
+        self._slots.release()
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True, cancel_futures=True)
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def get_parse_pool(processes: int | None = None) -> ParsePool:
+    """Pool de parsing partagé par le processus (un par nombre de processus)."""
+    processes = processes or default_processes()
+    with _pools_lock:
+        if processes not in _pools:
+            _pools[processes] = ParsePool(processes)
+        return _pools[processes]
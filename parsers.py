@@ -0,0 +1,342 @@
+"""
+Extraction ciblée des champs des pages Coinafrique.
+
+Trois backends sont disponibles: "bs4" (BeautifulSoup + html.parser, toujours
+installé), "lxml" (XPath compilés) et "selectolax" (moteur lexbor, sélecteurs
+CSS). Les deux derniers sont optionnels; DEFAULT_BACKEND est le plus rapide
+des backends installés.
+"""
+
+import re
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup as bs
+
+try:
+    import lxml.html
+    from lxml import etree
+except ImportError:
+    lxml = None
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:
+    LexborHTMLParser = None
+
+# Encodage des pages du site
+SITE_ENCODING = "utf-8"
+
+# URL de l'image dans le style CSS background-image
+IMAGE_URL_RE = re.compile(r'url\(["\']?([^"\']+)["\']?\)')
+
+# Nom de l'icône Material affichée devant la localisation des cartes
+LOCATION_ICON_RE = re.compile(r"^\s*location_on\s*")
+
+# Sélecteurs CSS des champs utilisés
+LISTING_CARD_CSS = "div.col.s6.m4.l3"
+CARD_PRICE_CSS = "p.ad__card-price"
+CARD_TITLE_CSS = "p.ad__card-description"
+CARD_LOCATION_CSS = "p.ad__card-location"
+CARD_IMAGE_CSS = "img.ad__card-img"
+TITLE_CSS = "h1"
+PRICE_CSS = "p.price"
+ADDRESS_CSS = "span[data-address]"
+IMAGE_CSS = "div.swiper-slide"
+
+
+def _has_class(name):
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+if lxml is not None:
+    _XP_CARDS = etree.XPath(
+        "//div[{}]".format(" and ".join(_has_class(c) for c in ("col", "s6", "m4", "l3")))
+    )
+    _XP_CARD_LINKS = etree.XPath(
+        "//div[{}]".format(" and ".join(_has_class(c) for c in ("col", "s6", "m4", "l3")))
+        + "/descendant::a[1]/@href"
+    )
+    _XP_CARD_LINK = etree.XPath("descendant::a[1]/@href")
+    _XP_CARD_PRICE = etree.XPath(f"(.//p[{_has_class('ad__card-price')}])[1]")
+    _XP_CARD_TITLE = etree.XPath(f"(.//p[{_has_class('ad__card-description')}])[1]")
+    _XP_CARD_LOCATION = etree.XPath(f"(.//p[{_has_class('ad__card-location')}])[1]")
+    _XP_CARD_IMAGE = etree.XPath(f"(.//img[{_has_class('ad__card-img')}])[1]/@src")
+    _XP_TITLE = etree.XPath("(//h1)[1]")
+    _XP_PRICE = etree.XPath(f"(//p[{_has_class('price')}])[1]")
+    _XP_ADDRESS = etree.XPath("(//span[@data-address])[1]/@data-address")
+    _XP_IMAGE_STYLE = etree.XPath(f"(//div[{_has_class('swiper-slide')}])[1]/@style")
+
+
+def available_backends() -> list[str]:
+    """Liste des backends installés, du plus rapide au plus lent."""
+    backends = []
+    if LexborHTMLParser is not None:
+        backends.append("selectolax")
+    if lxml is not None:
+        backends.append("lxml")
+    backends.append("bs4")
+    return backends
+
+
+DEFAULT_BACKEND = available_backends()[0]
+
+
+def _image_url(style):
+    if style:
+        match = IMAGE_URL_RE.search(style)
+        if match:
+            return match.group(1)
+    return "N/A"
+
+
+def _clean_price(text):
+    return text.replace("CFA", "").strip()
+
+
+def _card(href, title, price, location, image):
+    """Champs d'une carte du listing (mêmes clés que parse_ad, "N/A" si absent)."""
+    location = LOCATION_ICON_RE.sub("", location or "").strip()
+    return {
+        "Nom": title.strip() if title and title.strip() else "N/A",
+        "prix": _clean_price(price) if price and price.strip() else "N/A",
+        "adresse": location or "N/A",
+        "image_lien": image or "N/A",
+        "container_urls": href,
+    }
+
+
+def _parse_ad_bs4(content):
+    soup = bs(content, "html.parser")
+
+    # Titre - chercher n'importe quel h1
+    title_elem = soup.find("h1")
+    # Prix - chercher le p avec class="price"
+    price_elem = soup.find("p", class_="price")
+    # Adresse - chercher le span avec l'attribut data-address
+    address_span = soup.find("span", {"data-address": True})
+    # Image - extraire depuis le slider swiper
+    swiper_slide = soup.find("div", class_="swiper-slide")
+
+    return {
+        "Nom": title_elem.text.strip() if title_elem else "N/A",
+        "prix": _clean_price(price_elem.get_text(strip=True)) if price_elem else "N/A",
+        "adresse": address_span.get("data-address") if address_span else "N/A",
+        "image_lien": _image_url(swiper_slide.get("style") if swiper_slide else None),
+    }
+
+
+def _parse_ad_lxml(content):
+    tree = lxml.html.fromstring(content.decode(SITE_ENCODING, "replace"))
+
+    title = _XP_TITLE(tree)
+    price = _XP_PRICE(tree)
+    address = _XP_ADDRESS(tree)
+    style = _XP_IMAGE_STYLE(tree)
+
+    return {
+        "Nom": title[0].text_content().strip() if title else "N/A",
+        "prix": (
+            _clean_price("".join(t.strip() for t in price[0].itertext()))
+            if price
+            else "N/A"
+        ),
+        "adresse": str(address[0]) if address else "N/A",
+        "image_lien": _image_url(style[0] if style else None),
+    }
+
+
+def _parse_ad_selectolax(content):
+    tree = LexborHTMLParser(content)
+
+    title = tree.css_first(TITLE_CSS)
+    price = tree.css_first(PRICE_CSS)
+    address = tree.css_first(ADDRESS_CSS)
+    slide = tree.css_first(IMAGE_CSS)
+
+    return {
+        "Nom": title.text().strip() if title else "N/A",
+        "prix": (
+            _clean_price(price.text(deep=True, separator="", strip=True))
+            if price
+            else "N/A"
+        ),
+        "adresse": address.attributes.get("data-address") if address else "N/A",
+        "image_lien": _image_url(slide.attributes.get("style") if slide else None),
+    }
+
+
+def _listing_links_bs4(content):
+    soup = bs(content, "html.parser")
+    hrefs = []
+    for container in soup.find_all("div", "col s6 m4 l3"):
+        link = container.find("a")
+        if link is not None and link.get("href"):
+            hrefs.append(link["href"])
+    return hrefs
+
+
+def _listing_links_lxml(content):
+    tree = lxml.html.fromstring(content.decode(SITE_ENCODING, "replace"))
+    return [str(href) for href in _XP_CARD_LINKS(tree) if href]
+
+
+def _listing_links_selectolax(content):
+    hrefs = []
+    for card in LexborHTMLParser(content).css(LISTING_CARD_CSS):
+        link = card.css_first("a")
+        if link is not None and link.attributes.get("href"):
+            hrefs.append(link.attributes["href"])
+    return hrefs
+
+
+def _listing_cards_bs4(content):
+    soup = bs(content, "html.parser")
+    cards = []
+    for container in soup.find_all("div", "col s6 m4 l3"):
+        link = container.find("a")
+        if link is None or not link.get("href"):
+            continue
+        price = container.find("p", class_="ad__card-price")
+        title = container.find("p", class_="ad__card-description")
+        location = container.find("p", class_="ad__card-location")
+        image = container.find("img", class_="ad__card-img")
+        cards.append(
+            _card(
+                link["href"],
+                title.get_text(strip=True) if title else None,
+                price.get_text(strip=True) if price else None,
+                location.get_text(" ", strip=True) if location else None,
+                image.get("src") if image else None,
+            )
+        )
+    return cards
+
+
+def _listing_cards_lxml(content):
+    tree = lxml.html.fromstring(content.decode(SITE_ENCODING, "replace"))
+    cards = []
+    for container in _XP_CARDS(tree):
+        hrefs = _XP_CARD_LINK(container)
+        if not hrefs or not hrefs[0]:
+            continue
+        price = _XP_CARD_PRICE(container)
+        title = _XP_CARD_TITLE(container)
+        location = _XP_CARD_LOCATION(container)
+        image = _XP_CARD_IMAGE(container)
+        cards.append(
+            _card(
+                str(hrefs[0]),
+                title[0].text_content() if title else None,
+                "".join(t.strip() for t in price[0].itertext()) if price else None,
+                " ".join(t.strip() for t in location[0].itertext() if t.strip()) if location else None,
+                str(image[0]) if image else None,
+            )
+        )
+    return cards
+
+
+def _listing_cards_selectolax(content):
+    cards = []
+    for container in LexborHTMLParser(content).css(LISTING_CARD_CSS):
+        link = container.css_first("a")
+        if link is None or not link.attributes.get("href"):
+            continue
+        price = container.css_first(CARD_PRICE_CSS)
+        title = container.css_first(CARD_TITLE_CSS)
+        location = container.css_first(CARD_LOCATION_CSS)
+        image = container.css_first(CARD_IMAGE_CSS)
+        cards.append(
+            _card(
+                link.attributes["href"],
+                title.text(strip=True) if title else None,
+                price.text(deep=True, separator="", strip=True) if price else None,
+                location.text(deep=True, separator=" ", strip=True) if location else None,
+                image.attributes.get("src") if image else None,
+            )
+        )
+    return cards
+
+
+_AD_PARSERS = {
+    "bs4": _parse_ad_bs4,
+    "lxml": _parse_ad_lxml,
+    "selectolax": _parse_ad_selectolax,
+}
+
+_LISTING_PARSERS = {
+    "bs4": _listing_links_bs4,
+    "lxml": _listing_links_lxml,
+    "selectolax": _listing_links_selectolax,
+}
+
+
+_CARD_PARSERS = {
+    "bs4": _listing_cards_bs4,
+    "lxml": _listing_cards_lxml,
+    "selectolax": _listing_cards_selectolax,
+}
+
+
+def _check_backend(backend):
+    if backend not in available_backends():
+        raise ValueError(
+            f"Backend indisponible: {backend}. Choisir parmi: {available_backends()}"
+        )
+
+
+def parse_ad(content: bytes, backend: str = DEFAULT_BACKEND) -> dict:
+    """
+    Extrait les champs d'une page d'annonce.
+
+    Args:
+        content: HTML brut de la page
+        backend: Backend de parsing ('bs4', 'lxml', 'selectolax')
+
+    Returns:
+        dict: Nom, prix, adresse et image_lien ("N/A" si absent)
+    """
+    _check_backend(backend)
+    return _AD_PARSERS[backend](content)
+
+
+def parse_listing(content: bytes, page_url: str, backend: str = DEFAULT_BACKEND) -> list[str]:
+    """
+    Extrait les URLs des annonces d'une page de catégorie.
+
+    Args:
+        content: HTML brut de la page
+        page_url: URL de la page (pour résoudre les liens relatifs)
+        backend: Backend de parsing ('bs4', 'lxml', 'selectolax')
+
+    Returns:
+        Liste des URLs absolues des annonces, dans l'ordre de la page
+    """
+    _check_backend(backend)
+    return [urljoin(page_url, href) for href in _LISTING_PARSERS[backend](content)]
+
+
+def parse_listing_cards(
+    content: bytes, page_url: str, backend: str = DEFAULT_BACKEND
+) -> list[dict]:
+    """
+    Extrait les champs des cartes d'annonces d'une page de catégorie.
+
+    Les cartes donnent le titre, le prix, la localisation et la miniature
+    de chaque annonce, sans télécharger sa page.
+
+    Args:
+        content: HTML brut de la page
+        page_url: URL de la page (pour résoudre les liens relatifs)
+        backend: Backend de parsing ('bs4', 'lxml', 'selectolax')
+
+    Returns:
+        Liste des annonces, dans l'ordre de la page: mêmes champs que
+        parse_ad ("N/A" si absent) et container_urls (URL absolue)
+    """
+    _check_backend(backend)
+    cards = _CARD_PARSERS[backend](content)
+    for card in cards:
+        card["container_urls"] = urljoin(page_url, card["container_urls"])
+        if card["image_lien"] != "N/A":
+            card["image_lien"] = urljoin(page_url, card["image_lien"])
+    return cards
@@ -0,0 +1,365 @@
+"""
+Résilience des requêtes du scraper.
+
+- RetryPolicy: quelles erreurs retenter, et après quel délai (backoff
+  exponentiel avec jitter, ou Retry-After du serveur pour 429/503).
+- CircuitBreaker: par hôte, suspend toutes les requêtes quand le site
+  enchaîne les échecs, puis le teste avec une seule requête avant de
+  reprendre.
+- AdaptiveConcurrency: nombre de requêtes simultanées ajusté en AIMD
+  (augmentation additive tant que le site répond vite et sans erreur,
+  division par deux sinon).
+"""
+
+import contextlib
+import email.utils
+import logging
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+# Statuts HTTP temporaires, à retenter
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+# Statuts indiquant que le site est surchargé (Retry-After respecté)
+THROTTLE_STATUSES = frozenset({429, 503})
+
+# Attente maximale cumulée (secondes) d'une requête, toutes tentatives
+# comprises, devant un circuit ouvert
+DEFAULT_MAX_CIRCUIT_WAIT = 30.0
+
+
+class CircuitOpenError(Exception):
+    """Le circuit de l'hôte reste ouvert plus longtemps que l'attente acceptée."""
+
+
+def parse_retry_after(value: str | None, now: float | None = None) -> float | None:
+    """Délai (secondes) d'un en-tête Retry-After (nombre ou date HTTP)."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        date = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    now = time.time() if now is None else now
+    return max(date.timestamp() - now, 0.0)
+
+
+def response_status(error: BaseException) -> int | None:
+    response = getattr(error, "response", None)
+    return response.status_code if response is not None else None
+
+
+def retry_after(error: BaseException) -> float | None:
+    """Délai demandé par le serveur (Retry-After d'une réponse 429/503)."""
+    response = getattr(error, "response", None)
+    if response is None or response.status_code not in THROTTLE_STATUSES:
+        return None
+    return parse_retry_after(response.headers.get("Retry-After"))
+
+
+class RetryPolicy:
+    """
+    Politique de nouvelles tentatives des requêtes.
+
+    Seules les erreurs temporaires sont retentées: timeouts, erreurs de
+    connexion et statuts de RETRY_STATUSES (une 404 ne l'est pas). Le délai
+    avant la tentative n suit un backoff exponentiel avec "full jitter"
+    (uniforme entre 0 et min(max_delay, base_delay * 2**n)), sauf si le
+    serveur impose un Retry-After (plafonné à max_retry_after).
+
+    Args:
+        max_attempts: Nombre maximal de tentatives (première comprise)
+        base_delay: Délai de base du backoff (secondes)
+        max_delay: Délai maximal du backoff (secondes)
+        max_retry_after: Délai maximal accepté d'un Retry-After (secondes)
+    """
+
+    def __init__(
+        self,
+        max_attempts: int = 4,
+        base_delay: float = 0.5,
+        max_delay: float = 30.0,
+        max_retry_after: float = 120.0,
+    ):
+        if max_attempts < 1:
+            raise ValueError("max_attempts doit être supérieur ou égal à 1")
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_retry_after = max_retry_after
+
+    def is_retryable(self, error: BaseException) -> bool:
+        if isinstance(error, (requests.Timeout, requests.ConnectionError)):
+            return True
+        return response_status(error) in RETRY_STATUSES
+
+    def delay(self, attempt: int, error: BaseException | None = None) -> float:
+        """Délai avant la tentative suivante (attempt: tentatives déjà faites)."""
+        requested = retry_after(error) if error is not None else None
+        if requested is not None:
+            return min(requested, self.max_retry_after)
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+
+class CircuitBreaker:
+    """
+    Disjoncteur par hôte, partagé par tous les threads (et scrapings).
+
+    Après failure_threshold échecs consécutifs sur un hôte (ou une réponse
+    429/503 avec Retry-After), le circuit s'ouvre: toutes les requêtes vers
+    cet hôte attendent reset_timeout secondes (ou le Retry-After). Une seule
+    requête de test passe ensuite; si elle réussit le circuit se referme,
+    sinon il se rouvre pour un délai doublé (plafonné à max_reset_timeout).
+    Une requête qui devrait attendre plus de max_wait secondes échoue tout
+    de suite (CircuitOpenError): un site en panne ne bloque pas le scraping.
+
+    Args:
+        failure_threshold: Échecs consécutifs avant ouverture du circuit
+        reset_timeout: Durée d'ouverture initiale (secondes)
+        max_reset_timeout: Durée d'ouverture maximale (secondes)
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 5.0,
+        max_reset_timeout: float = 60.0,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+        self._hosts = {}  # hôte -> état
+        self._condition = threading.Condition()
+
+    def _state(self, host):
+        return self._hosts.setdefault(
+            host,
+            {
+                "failures": 0,
+                "open_until": 0.0,
+                "timeout": self.reset_timeout,
+                "probe_started": None,
+            },
+        )
+
+    def wait(self, url: str, max_wait: float | None = None) -> None:
+        """
+        Bloque tant que le circuit de l'hôte est ouvert ou en test.
+
+        Args:
+            url: URL de la requête
+            max_wait: Attente maximale (secondes, None: illimitée); au-delà,
+                lève CircuitOpenError
+        """
+        host = urlsplit(url).netloc
+        deadline = time.monotonic() + max_wait if max_wait is not None else None
+        with self._condition:
+            while True:
+                state = self._state(host)
+                now = time.monotonic()
+                delay = state["open_until"] - now
+                probe_started = state["probe_started"]
+                waiting = delay > 0 or (
+                    probe_started is not None and now - probe_started < self.max_reset_timeout
+                )
+                if waiting and deadline is not None and max(state["open_until"], now) >= deadline:
+                    raise CircuitOpenError(f"circuit ouvert pour {host}")
+                if delay > 0:
+                    self._condition.wait(delay)
+                elif waiting:
+                    # (une requête de test sans résultat finit par être remplacée)
+                    timeout = self.reset_timeout
+                    if deadline is not None:
+                        timeout = min(timeout, deadline - now)
+                    self._condition.wait(timeout)
+                else:
+                    # Premier passage après ouverture: requête de test
+                    if state["open_until"]:
+                        state["probe_started"] = now
+                    return
+
+    def record_success(self, url: str) -> None:
+        host = urlsplit(url).netloc
+        with self._condition:
+            state = self._state(host)
+            if state["open_until"]:
+                logger.info("Circuit refermé pour %s", host)
+            state.update(
+                failures=0, open_until=0.0, timeout=self.reset_timeout, probe_started=None
+            )
+            self._condition.notify_all()
+
+    def record_failure(self, url: str, retry_after: float | None = None) -> None:
+        host = urlsplit(url).netloc
+        with self._condition:
+            state = self._state(host)
+            state["failures"] += 1
+            probing = state["probe_started"] is not None
+            if not (probing or retry_after is not None or state["failures"] >= self.failure_threshold):
+                return
+            if probing:
+                state["timeout"] = min(state["timeout"] * 2, self.max_reset_timeout)
+                state["probe_started"] = None
+            timeout = retry_after if retry_after is not None else state["timeout"]
+            until = time.monotonic() + timeout
+            if until > state["open_until"]:
+                logger.warning("Circuit ouvert pour %s pendant %.1f s", host, timeout)
+                state["open_until"] = until
+            self._condition.notify_all()
+
+    def is_open(self, url: str) -> bool:
+        with self._condition:
+            return self._state(urlsplit(url).netloc)["open_until"] > time.monotonic()
+
+
+class AdaptiveConcurrency:
+    """
+    Limite adaptative des requêtes simultanées (AIMD).
+
+    Chaque fois que limit requêtes ont réussi sous latency_target, la limite
+    augmente de 1 (jusqu'à max_limit). Une erreur temporaire, un 429/503 ou
+    une requête trop lente la divise par deux (au plus une fois par
+    cooldown secondes, pour ne pas réagir plusieurs fois à la même
+    dégradation).
+
+    Args:
+        max_limit: Limite maximale (en général le nombre de workers)
+        initial: Limite initiale (par défaut la moitié de max_limit)
+        min_limit: Limite minimale
+        latency_target: Latence (secondes) au-delà de laquelle le site est
+            considéré comme surchargé
+        cooldown: Délai minimal entre deux réductions (secondes)
+    """
+
+    def __init__(
+        self,
+        max_limit: int,
+        initial: int | None = None,
+        min_limit: int = 1,
+        latency_target: float = 2.0,
+        cooldown: float = 1.0,
+    ):
+        self.max_limit = max(max_limit, min_limit)
+        self.min_limit = min_limit
+        self.limit = initial if initial is not None else max(min_limit, (self.max_limit + 1) // 2)
+        self.latency_target = latency_target
+        self.cooldown = cooldown
+        self._in_flight = 0
+        self._successes = 0
+        self._last_decrease = 0.0
+        self._condition = threading.Condition()
+
+    @contextlib.contextmanager
+    def slot(self):
+        """Réserve une place parmi les limit requêtes simultanées."""
+        with self._condition:
+            while self._in_flight >= self.limit:
+                self._condition.wait()
+            self._in_flight += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._in_flight -= 1
+                self._condition.notify()
+
+    def record(self, latency: float | None, ok: bool) -> None:
+        """Ajuste la limite d'après le résultat d'une requête."""
+        with self._condition:
+            if ok and latency is not None and latency <= self.latency_target:
+                self._successes += 1
+                if self._successes >= self.limit and self.limit < self.max_limit:
+                    self.limit += 1
+                    self._successes = 0
+                    self._condition.notify()
+                return
+            now = time.monotonic()
+            if now - self._last_decrease >= self.cooldown:
+                self.limit = max(self.min_limit, self.limit // 2)
+                self._successes = 0
+                self._last_decrease = now
+                logger.info("Concurrence réduite à %d requêtes simultanées", self.limit)
+
+
+class RequestGuard:
+    """
+    Regroupe la politique de retry, le disjoncteur et la limite de
+    concurrence appliqués aux requêtes d'un scraping.
+
+    Args:
+        policy: Politique de nouvelles tentatives (par défaut RetryPolicy())
+        breaker: Disjoncteur (par défaut celui du processus)
+        concurrency: Limite adaptative des requêtes simultanées (None: pas
+            d'autre limite que le nombre de workers)
+        max_wait: Attente maximale cumulée d'une requête devant un circuit
+            ouvert (secondes, None: illimitée)
+    """
+
+    def __init__(
+        self,
+        policy: RetryPolicy | None = None,
+        breaker: CircuitBreaker | None = None,
+        concurrency: AdaptiveConcurrency | None = None,
+        max_wait: float | None = DEFAULT_MAX_CIRCUIT_WAIT,
+    ):
+        self.policy = policy or RetryPolicy()
+        self.breaker = breaker or get_circuit_breaker()
+        self.concurrency = concurrency
+        self.max_wait = max_wait
+
+    def deadline(self) -> float | None:
+        """Échéance (time.monotonic) des attentes d'une nouvelle requête."""
+        return time.monotonic() + self.max_wait if self.max_wait is not None else None
+
+    @contextlib.contextmanager
+    def slot(self, url: str, deadline: float | None = None):
+        """
+        Attend que le circuit de l'hôte soit fermé (au plus jusqu'à deadline,
+        voir deadline()) et qu'une place se libère.
+        """
+        max_wait = max(deadline - time.monotonic(), 0.0) if deadline is not None else None
+        self.breaker.wait(url, max_wait)
+        if self.concurrency is None:
+            yield
+        else:
+            with self.concurrency.slot():
+                yield
+
+    def record_success(self, url: str, latency: float) -> None:
+        self.breaker.record_success(url)
+        if self.concurrency is not None:
+            self.concurrency.record(latency, ok=True)
+
+    def record_failure(self, url: str, error: BaseException, latency: float | None = None) -> bool:
+        """Enregistre un échec et indique s'il faut retenter la requête."""
+        if not self.policy.is_retryable(error):
+            # Le site a répondu (ex: 404): il n'est pas en difficulté
+            if response_status(error) is not None:
+                self.record_success(url, latency or 0.0)
+            return False
+        self.breaker.record_failure(url, retry_after(error))
+        if self.concurrency is not None:
+            self.concurrency.record(latency, ok=False)
+        return True
+
+
+_circuit_breaker = None
+_circuit_breaker_lock = threading.Lock()
+
+
+def get_circuit_breaker() -> CircuitBreaker:
+    """Disjoncteur partagé par les scrapings du processus."""
+    global _circuit_breaker
+    with _circuit_breaker_lock:
+        if _circuit_breaker is None:
+            _circuit_breaker = CircuitBreaker()
+        return _circuit_breaker
@@ -1,9 +1,22 @@
+import contextlib
+import logging
+import re
+import threading
 import time
-from typing import Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterator
+from urllib.parse import urlsplit
 
 import pandas as pd
-from bs4 import BeautifulSoup as bs
-from requests import get
+
+from ad_index import SeenAdsIndex, extract_ad_id
+from http_client import ScraperClient, get_default_client
+from metrics import MetricsRegistry, RunMetrics, get_metrics
+from parse_pool import AD_TUPLE_FIELDS, ParsePool, get_parse_pool
+from parsers import DEFAULT_BACKEND, parse_ad, parse_listing, parse_listing_cards
+from resilience import AdaptiveConcurrency, CircuitBreaker, RequestGuard, RetryPolicy
+
+logger = logging.getLogger(__name__)
 
 # URLs des catégories à scraper
 CATEGORY_URLS = {
@@ -14,157 +27,681 @@ CATEGORY_URLS = {
 }
 
 
-def scrape_category(
-    category: str, num_pages: int, progress_callback: Callable | None = None
-) -> pd.DataFrame:
+def category_slug(category: str) -> str:
+    """Identifiant de la catégorie dans les URLs (ou dérivé de son nom)."""
+    url = CATEGORY_URLS.get(category)
+    if url:
+        return url.rstrip("/").rsplit("/", 1)[-1]
+    return re.sub(r"[^a-z0-9]+", "-", category.lower()).strip("-")
+
+
+# Champs de chaque annonce scrapée (mêmes noms que les CSV Web Scraper)
+RECORD_FIELDS = ["Nom", "prix", "adresse", "image_lien", "container_urls"]
+
+# Débit par défaut (requêtes/seconde/hôte) quand le mode concurrent est activé
+DEFAULT_REQUESTS_PER_SECOND = 5.0
+
+# Pause (secondes) entre deux pages de listing en mode séquentiel
+SEQUENTIAL_PAGE_PAUSE = 0.7
+
+# Modes d'extraction: "detail" télécharge la page de chaque annonce, "cards"
+# lit les champs sur les cartes des pages de listing
+EXTRACTION_MODES = ("detail", "cards")
+
+# En mode "cards", champs dont l'absence sur une carte déclenche le
+# téléchargement de la page de l'annonce
+CARD_REQUIRED_FIELDS = ("Nom", "prix", "adresse")
+
+
+class HostRateLimiter:
+    """
+    Limiteur de débit par hôte, partagé entre les threads.
+
+    Chaque appel à wait() réserve le prochain créneau libre pour l'hôte de
+    l'URL, puis dort jusqu'à ce créneau.
     """
-    Scrape les annonces d'une catégorie sur plusieurs pages
+
+    def __init__(self, requests_per_second: float | None = None):
+        self.interval = 1.0 / requests_per_second if requests_per_second else 0.0
+        self._next_slot: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def wait(self, url: str) -> None:
+        if not self.interval:
+            return
+
+        host = urlsplit(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.interval
+
+        delay = slot - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+
+def _downloaded_bytes(res) -> int:
+    """Taille du corps téléchargé (0 pour une réponse servie par le cache)."""
+    return 0 if getattr(res, "from_cache", False) else len(res.content)
+
+
+def _get(
+    url: str,
+    client: ScraperClient,
+    limiter: HostRateLimiter,
+    guard: RequestGuard,
+    run: RunMetrics,
+    kind: str,
+    **kwargs,
+):
+    """
+    Télécharge une page, en retentant les erreurs temporaires (voir
+    resilience.RequestGuard).
 
     Args:
-        category: Nom de la catégorie ('Chiens', 'Moutons', 'Poules', 'Autres')
-        num_pages: Nombre de pages à scraper
-        progress_callback: Fonction optionnelle pour afficher la progression
+        url: URL à télécharger
+        client: Client HTTP partagé
+        limiter: Limiteur de débit partagé
+        guard: Politique de retry, disjoncteur et limite de concurrence
+        run: Mesures du scraping en cours
+        kind: Type de requête pour les mesures ("listing" ou "annonce")
+        **kwargs: Arguments de ScraperClient.get
 
     Returns:
-        DataFrame pandas avec les annonces scrapées
+        requests.Response: Réponse réussie
     """
+    max_attempts = guard.policy.max_attempts
+    deadline = guard.deadline()
+    for attempt in range(1, max_attempts + 1):
+        latency = None
+        try:
+            with guard.slot(url, deadline):
+                limiter.wait(url)
+                start = time.perf_counter()
+                res = client.get(url, **kwargs)
+                latency = time.perf_counter() - start
+            run.observe_request(kind, latency, _downloaded_bytes(res))
+            res.raise_for_status()
+        except Exception as e:
+            if not guard.record_failure(url, e, latency) or attempt == max_attempts:
+                raise
+            delay = guard.policy.delay(attempt, e)
+            logger.warning(
+                "Erreur sur %s (%s), tentative %d/%d dans %.1f s",
+                url, e, attempt + 1, max_attempts, delay,
+            )
+            run.record_retry()
+            time.sleep(delay)
+        else:
+            guard.record_success(url, latency)
+            return res
+
+
+def _fetch_listing(
+    url: str,
+    client: ScraperClient,
+    limiter: HostRateLimiter,
+    guard: RequestGuard,
+    backend: str,
+    run: RunMetrics,
+) -> list[str]:
+    """
+    Télécharge une page de catégorie et retourne les URLs des annonces.
 
-    if category not in CATEGORY_URLS:
-        raise ValueError(
-            f"Catégorie invalide. Choisir parmi: {list(CATEGORY_URLS.keys())}")
+    Args:
+        url: URL de la page de listing
+        client: Client HTTP partagé
+        limiter: Limiteur de débit partagé
+        guard: Politique de retry, disjoncteur et limite de concurrence
+        backend: Backend de parsing HTML
+        run: Mesures du scraping en cours
 
-    base_url = CATEGORY_URLS[category]
-    df = pd.DataFrame()
+    Returns:
+        Liste des URLs absolues des annonces, dans l'ordre de la page
+    """
+    # Le listing change souvent: toujours revalider la version en cache
+    res = _get(url, client, limiter, guard, run, "listing", max_age=0)
+
+    start = time.perf_counter()
+    ad_urls = parse_listing(res.content, url, backend)
+    run.observe_parse(time.perf_counter() - start)
+    return ad_urls
+
+
+def _fetch_cards(
+    url: str,
+    client: ScraperClient,
+    limiter: HostRateLimiter,
+    guard: RequestGuard,
+    backend: str,
+    run: RunMetrics,
+) -> list[dict]:
+    """
+    Télécharge une page de catégorie et retourne les champs de ses cartes.
 
-    print(f"\nScraping de la catégorie: {category}")
-    print(f"Nombre de pages: {num_pages}\n")
+    Args:
+        url: URL de la page de listing
+        client: Client HTTP partagé
+        limiter: Limiteur de débit partagé
+        guard: Politique de retry, disjoncteur et limite de concurrence
+        backend: Backend de parsing HTML
+        run: Mesures du scraping en cours
 
-    for index_page in range(1, num_pages + 1):
-        # Construire l'URL de la page
-        url = f"{base_url}?page={index_page}"
+    Returns:
+        Liste des annonces (voir parsers.parse_listing_cards), dans l'ordre
+        de la page
+    """
+    res = _get(url, client, limiter, guard, run, "listing", max_age=0)
+
+    start = time.perf_counter()
+    cards = parse_listing_cards(res.content, url, backend)
+    run.observe_parse(time.perf_counter() - start)
+    return cards
+
+
+def _fetch_ad(
+    url_container: str,
+    client: ScraperClient,
+    limiter: HostRateLimiter,
+    guard: RequestGuard,
+    backend: str,
+    run: RunMetrics,
+) -> dict | None:
+    """
+    Télécharge et parse la page d'une annonce.
 
-        print(f"Page {index_page}/{num_pages}: {url}")
+    Args:
+        url_container: URL de l'annonce
+        client: Client HTTP partagé
+        limiter: Limiteur de débit partagé
+        guard: Politique de retry, disjoncteur et limite de concurrence
+        backend: Backend de parsing HTML
+        run: Mesures du scraping en cours
 
-        try:
-            # Faire la requête HTTP
-            res = get(url)
-            res.raise_for_status()
+    Returns:
+        Dictionnaire des champs de l'annonce, ou None en cas d'échec
+    """
+    try:
+        logger.debug("URL de l'annonce: %s", url_container)
+        res = _get(url_container, client, limiter, guard, run, "annonce")
+
+        # Extraire les informations
+        start = time.perf_counter()
+        dic = parse_ad(res.content, backend)
+        run.observe_parse(time.perf_counter() - start)
+        logger.debug(
+            "Titre: %s, Prix: %s, Adresse: %s, Image: %.50s",
+            dic["Nom"], dic["prix"], dic["adresse"], dic["image_lien"],
+        )
+
+        dic["container_urls"] = url_container
+        return dic
+
+    except Exception as e:
+        logger.warning("Annonce ignorée (%s): %s", url_container, e)
+        run.record_error(e)
+        return None
+
+
+def _submit_ad(
+    url_container: str,
+    client: ScraperClient,
+    limiter: HostRateLimiter,
+    guard: RequestGuard,
+    backend: str,
+    run: RunMetrics,
+    parse_pool: ParsePool,
+):
+    """
+    Télécharge la page d'une annonce et la dépose dans la file du pool de
+    parsing (bloque tant que la file est pleine).
 
-            # Parser le HTML
-            soup = bs(res.content, "html.parser")
+    Args:
+        url_container: URL de l'annonce
+        client: Client HTTP partagé
+        limiter: Limiteur de débit partagé
+        guard: Politique de retry, disjoncteur et limite de concurrence
+        backend: Backend de parsing HTML
+        run: Mesures du scraping en cours
+        parse_pool: Pool de processus de parsing
 
-            # Trouver tous les containers d'annonces
-            containers = soup.find_all("div", "col s6 m4 l3")
+    Returns:
+        Future du parsing (voir _collect_ad), ou None en cas d'échec
+    """
+    try:
+        logger.debug("URL de l'annonce: %s", url_container)
+        res = _get(url_container, client, limiter, guard, run, "annonce")
+        future, depth, waited = parse_pool.submit(res.content, backend)
+        run.observe_queue(depth, waited)
+        return future
+    except Exception as e:
+        logger.warning("Annonce ignorée (%s): %s", url_container, e)
+        run.record_error(e)
+        return None
+
+
+def _collect_ad(url_container: str, future, run: RunMetrics) -> dict | None:
+    """Attend le parsing d'une annonce déposée par _submit_ad."""
+    if future is None:
+        return None
+    try:
+        values, seconds = future.result()
+    except Exception as e:
+        logger.warning("Annonce ignorée (%s): %s", url_container, e)
+        run.record_error(e)
+        return None
+    run.observe_parse(seconds)
+    dic = dict(zip(AD_TUPLE_FIELDS, values))
+    dic["container_urls"] = url_container
+    return dic
+
+
+def _complete_card(
+    card: dict,
+    required_fields,
+    client: ScraperClient,
+    limiter: HostRateLimiter,
+    guard: RequestGuard,
+    backend: str,
+    run: RunMetrics,
+) -> dict:
+    """
+    Complète une carte du listing avec la page de l'annonce, seulement si un
+    des champs requis manque sur la carte.
 
-            # Collecter les données de cette page
-            data = []
-            for container in containers:
-                try:
-                    # Récupérer l'URL de l'annonce
-                    href = container.find("a")["href"]
+    Args:
+        card: Annonce lue sur la carte
+        required_fields: Champs requis (voir CARD_REQUIRED_FIELDS)
+        client, limiter, guard, backend, run: voir _fetch_ad
 
-                    # Construire l'URL complète
-                    if href.startswith("http"):
-                        url_container = href
-                    elif href.startswith("/"):
-                        url_container = "https://sn.coinafrique.com" + href
-                    else:
-                        url_container = base_url + "/" + href
-
-                    print("URL de l'annonce:", url_container)
-
-                    # Faire une requête pour la page de l'annonce avec retry
-                    max_retries = 3
-                    retry_count = 0
-                    soup_container = None
-
-                    while retry_count < max_retries:
-                        try:
-                            res_container = get(url_container, timeout=10)
-                            res_container.raise_for_status()
-                            soup_container = bs(res_container.content, "html.parser")
-                            break
-                        except Exception as e:
-                            retry_count += 1
-                            if retry_count < max_retries:
-                                print(
-                                    f"  Erreur ({e}), tentative {retry_count + 1}/{max_retries}..."
-                                )
-                                time.sleep(1)
-                            else:
-                                print(
-                                    f"  Échec après {max_retries} tentatives, annonce ignorée"
-                                )
-                                raise
-
-                    if soup_container is None:
-                        continue
-
-                    # Extraire les informations
-                    import re
-
-                    # Titre - chercher n'importe quel h1
-                    title_elem = soup_container.find("h1")
-                    title = title_elem.text.strip() if title_elem else "N/A"
-
-
-                    # Prix - chercher le p avec class="price"
-                    price = "N/A"
-                    price_elem = soup_container.find("p", class_="price")
-                    if price_elem:
-                        price = (
-                            price_elem.get_text(strip=True).replace("CFA", "").strip()
-                        )
+    Returns:
+        dict: Annonce (la carte telle quelle si la page est indisponible)
+    """
+    if all(card[field] != "N/A" for field in required_fields):
+        return card
+    detail = _fetch_ad(card["container_urls"], client, limiter, guard, backend, run)
+    if detail is None:
+        return card
+    return {
+        field: card[field] if detail.get(field, "N/A") == "N/A" else detail[field]
+        for field in RECORD_FIELDS
+    }
+
+
+@contextlib.contextmanager
+def _flushing(stores, category):
+    """Appelle flush(category) des stockages à la fin du scraping (même interrompu)."""
+    try:
+        yield
+    finally:
+        for store in stores or []:
+            if hasattr(store, "flush"):
+                store.flush(category)
+
+
+@contextlib.contextmanager
+def _recording(registry, run):
+    """Termine les mesures du run à la fin du scraping (même interrompu)."""
+    try:
+        yield
+    finally:
+        registry.finish_run(run)
+
+
+def iter_pages(
+    category: str,
+    num_pages: int,
+    progress_callback: Callable | None = None,
+    max_workers: int = 1,
+    requests_per_second: float | None = None,
+    client: ScraperClient | None = None,
+    incremental: bool = False,
+    seen_index: SeenAdsIndex | None = None,
+    parser_backend: str = DEFAULT_BACKEND,
+    start_page: int = 1,
+    limiter: HostRateLimiter | None = None,
+    error_callback: Callable | None = None,
+    stores: list | None = None,
+    metrics: MetricsRegistry | None = None,
+    retry_policy: RetryPolicy | None = None,
+    circuit_breaker: CircuitBreaker | None = None,
+    adaptive_concurrency: bool = True,
+    mode: str = "detail",
+    required_fields=CARD_REQUIRED_FIELDS,
+    parse_processes: int = 0,
+) -> Iterator[tuple[int, list[dict]]]:
+    """
+    Scrape les annonces d'une catégorie page par page
 
-                    # Adresse - chercher le span avec l'attribut data-address
-                    address = "N/A"
-                    address_span = soup_container.find("span", {"data-address": True})
-                    if address_span:
-                        address = address_span.get("data-address")
-
-                    # Image - extraire depuis le slider swiper
-                    image_url = "N/A"
-                    swiper_slide = soup_container.find("div", class_="swiper-slide")
-                    if swiper_slide and swiper_slide.get("style"):
-                        style = swiper_slide.get("style")
-                        # Extraire l'URL de l'image depuis le style background-image
-                        match = re.search(r'url\(["\']?([^"\']+)["\']?\)', style)
-                        if match:
-                            image_url = match.group(1)
-
-                    print(
-                        f"Titre: {title}, Prix: {price}, Adresse: {address}, Image: {image_url[:50] if image_url != 'N/A' else 'N/A'}"
-                    )
+    Avec max_workers > 1, les pages d'annonces d'une page de listing sont
+    téléchargées en parallèle et la page de listing suivante est préchargée.
+    Les annonces sont toujours retournées dans l'ordre du listing.
 
-                    dic = {
-                        "Nom": title,
-                        "prix": price,
-                        "adresse": address,
-                        "image_lien": image_url,
-                    }
-                    data.append(dic)
+    En mode "cards", les champs sont lus sur les cartes des pages de listing
+    (une requête par page au lieu d'une par annonce); la page d'une annonce
+    n'est téléchargée que si sa carte n'a pas un des champs requis. Les
+    cartes donnent une miniature de l'image et une adresse parfois moins
+    précise (voir compare_extraction_modes).
 
-                except Exception as e:
-                    print(f"Erreur sur une annonce: {str(e)}")
-                    pass
+    En mode incrémental, les annonces déjà connues (voir SeenAdsIndex) ne sont
+    pas retéléchargées et la pagination s'arrête à la première page dont
+    toutes les annonces sont connues.
 
-            # Créer un DataFrame pour cette page
-            DF = pd.DataFrame(data)
+    Args:
+        category: Nom de la catégorie ('Chiens', 'Moutons', 'Poules', 'Autres')
+        num_pages: Numéro de la dernière page à scraper
+        progress_callback: Fonction optionnelle pour afficher la progression
+        max_workers: Nombre maximal de requêtes simultanées (1 = mode séquentiel)
+        requests_per_second: Débit maximal par hôte (par défaut
+            DEFAULT_REQUESTS_PER_SECOND en mode concurrent, illimité sinon)
+        client: Client HTTP à utiliser (par défaut le client partagé du
+            processus, dont le pool de connexions est réutilisé d'un appel
+            à l'autre)
+        incremental: Ne récupérer que les nouvelles annonces
+        seen_index: Index des annonces connues (par défaut l'index persistant
+            de la catégorie, initialisé depuis les CSV de webscraper_data et
+            enregistré après chaque page). Un index fourni est complété mais
+            pas enregistré: l'appelant appelle save() après avoir écrit les
+            annonces
+        parser_backend: Backend de parsing HTML ('bs4', 'lxml', 'selectolax')
+        start_page: Première page à scraper (reprise d'un scraping interrompu)
+        limiter: Limiteur de débit partagé avec d'autres scrapings (objet avec
+            une méthode wait(url)); remplace requests_per_second
+        error_callback: Fonction optionnelle appelée avec (type, url) pour
+            chaque page ("page") ou annonce ("annonce") en échec
+        stores: Stockages où écrire chaque page (objets avec une méthode
+            add_records(records, category) et éventuellement flush(category),
+            appelée à la fin du scraping; voir listings_db et snapshots)
+        metrics: Registre où enregistrer les mesures du scraping (par défaut
+            celui du processus, voir metrics.get_metrics)
+        retry_policy: Politique de nouvelles tentatives des requêtes (par
+            défaut resilience.RetryPolicy())
+        circuit_breaker: Disjoncteur par hôte (par défaut celui du processus,
+            partagé par tous les scrapings)
+        adaptive_concurrency: En mode concurrent, ajuster le nombre de
+            requêtes simultanées (au plus max_workers) à la santé du site
+        mode: Mode d'extraction ("detail" ou "cards", voir EXTRACTION_MODES)
+        required_fields: En mode "cards", champs dont l'absence sur une
+            carte déclenche le téléchargement de la page de l'annonce
+        parse_processes: Nombre de processus de parsing des pages d'annonces
+            (0 = parsing dans les threads de téléchargement; voir parse_pool)
+
+    Yields:
+        (numéro de page, liste des annonces de la page) pour chaque page terminée
+    """
 
-            # Concaténer avec le DataFrame principal
-            df = pd.concat([df, DF], axis=0).reset_index(drop=True)
+    if category not in CATEGORY_URLS:
+        raise ValueError(
+            f"Catégorie invalide. Choisir parmi: {list(CATEGORY_URLS.keys())}")
+    if max_workers < 1:
+        raise ValueError("max_workers doit être supérieur ou égal à 1")
+    if mode not in EXTRACTION_MODES:
+        raise ValueError(f"Mode d'extraction invalide. Choisir parmi: {list(EXTRACTION_MODES)}")
+
+    base_url = CATEGORY_URLS[category]
+    concurrent = max_workers > 1
+    if requests_per_second is None and concurrent:
+        requests_per_second = DEFAULT_REQUESTS_PER_SECOND
+    if limiter is None:
+        limiter = HostRateLimiter(requests_per_second)
+    if client is None:
+        client = get_default_client()
+    # Index créé ici: enregistré après chaque page, une fois ses annonces
+    # écrites dans les stockages. Index fourni: l'appelant l'enregistre
+    # quand il a écrit les annonces
+    owns_index = incremental and seen_index is None
+    if owns_index:
+        seen_index = SeenAdsIndex(category_slug(category))
+        if not seen_index.exists:
+            seen_index.seed_from_csv()
+
+    concurrency = AdaptiveConcurrency(max_workers) if concurrent and adaptive_concurrency else None
+    guard = RequestGuard(retry_policy, circuit_breaker, concurrency)
+
+    registry = metrics or get_metrics()
+    run = registry.start_run(category)
+    logger.info("Scraping de la catégorie %s, pages %d à %d", category, start_page, num_pages)
+
+    cards_mode = mode == "cards"
+    parse_pool = get_parse_pool(parse_processes) if parse_processes and not cards_mode else None
+    fetch_listing = _fetch_cards if cards_mode else _fetch_listing
+    cards = {}
+
+    with (
+        ThreadPoolExecutor(max_workers=max_workers) as pool,
+        _flushing(stores, category),
+        _recording(registry, run),
+    ):
+        next_listing = None
+
+        for index_page in range(start_page, num_pages + 1):
+            # Construire l'URL de la page
+            url = f"{base_url}?page={index_page}"
+
+            logger.info("Page %d/%d: %s", index_page, num_pages, url)
+
+            try:
+                # Récupérer la liste des annonces (préchargée en mode concurrent)
+                if next_listing is not None:
+                    listing = next_listing
+                    next_listing = None
+                    items = listing.result()
+                else:
+                    items = fetch_listing(url, client, limiter, guard, parser_backend, run)
+                if cards_mode:
+                    ad_urls = [card["container_urls"] for card in items]
+                    cards = dict(zip(ad_urls, items))
+                else:
+                    ad_urls = items
+
+                # Ignorer les annonces déjà connues
+                if incremental:
+                    new_urls = [u for u in ad_urls if extract_ad_id(u) not in seen_index]
+                    logger.info("%d annonces déjà connues", len(ad_urls) - len(new_urls))
+                    if not new_urls:
+                        logger.info("Page entièrement connue, arrêt de la pagination")
+                        if progress_callback:
+                            progress_callback(num_pages, num_pages)
+                        break
+                    ad_urls = new_urls
+
+                # Précharger la page de listing suivante
+                if concurrent and index_page < num_pages:
+                    next_listing = pool.submit(
+                        fetch_listing,
+                        f"{base_url}?page={index_page + 1}",
+                        client,
+                        limiter,
+                        guard,
+                        parser_backend,
+                        run,
+                    )
+
+                # Collecter les données de cette page (map conserve l'ordre)
+                # (cartes de cette page liées en argument: la fonction reste
+                # juste si elle est appelée après le passage à la page suivante)
+                def fetch_ad(u, page_cards=cards):
+                    if cards_mode:
+                        return _complete_card(
+                            page_cards[u],
+                            required_fields,
+                            client,
+                            limiter,
+                            guard,
+                            parser_backend,
+                            run,
+                        )
+                    return _fetch_ad(u, client, limiter, guard, parser_backend, run)
+
+                if parse_pool is not None:
+                    # Les threads déposent le HTML dans la file et passent à
+                    # l'annonce suivante; les résultats sont lus dans l'ordre
+                    def submit_ad(u):
+                        return _submit_ad(
+                            u, client, limiter, guard, parser_backend, run, parse_pool
+                        )
+
+                    if concurrent:
+                        futures = pool.map(submit_ad, ad_urls)
+                    else:
+                        futures = [submit_ad(u) for u in ad_urls]
+                    results = (_collect_ad(u, f, run) for u, f in zip(ad_urls, futures))
+                elif concurrent:
+                    results = pool.map(fetch_ad, ad_urls)
+                else:
+                    results = map(fetch_ad, ad_urls)
+                data = []
+                for u, dic in zip(ad_urls, results):
+                    if dic is not None:
+                        data.append(dic)
+                    elif error_callback:
+                        error_callback("annonce", u)
+
+                for store in stores or []:
+                    store.add_records(data, category)
+
+                # Annonces connues seulement une fois écrites: un scraping
+                # interrompu avant ne les fait pas oublier
+                if incremental:
+                    seen_index.add(extract_ad_id(dic["container_urls"]) for dic in data)
+                    if owns_index:
+                        seen_index.save()
+                run.record_page(len(data))
+
+            except Exception as e:
+                logger.warning("Erreur sur la page %d: %s", index_page, e)
+                run.record_error(e)
+                if error_callback:
+                    error_callback("page", url)
+                continue
+
+            yield index_page, data
 
             # Mettre à jour la progression
             if progress_callback:
                 progress_callback(index_page, num_pages)
 
             # Pause entre les pages (être poli avec le serveur)
-            if index_page < num_pages:
-                time.sleep(0.7)
+            if not concurrent and index_page < num_pages:
+                time.sleep(SEQUENTIAL_PAGE_PAUSE)
 
-        except Exception as e:
-            print(f"Erreur sur la page {index_page}: {str(e)}")
-            continue
 
-    print(f"\nScraping terminé! {len(df)} annonces récupérées au total\n")
+def iter_category(category: str, num_pages: int, **kwargs) -> Iterator[dict]:
+    """
+    Scrape les annonces d'une catégorie et les produit au fil de l'eau.
+
+    Args:
+        category: Nom de la catégorie
+        num_pages: Nombre de pages à scraper
+        **kwargs: Options de iter_pages
+
+    Yields:
+        dict: Une annonce (voir RECORD_FIELDS)
+    """
+    for _, data in iter_pages(category, num_pages, **kwargs):
+        yield from data
+
+
+def scrape_category(
+    category: str,
+    num_pages: int,
+    progress_callback: Callable | None = None,
+    **kwargs,
+) -> pd.DataFrame:
+    """
+    Scrape les annonces d'une catégorie sur plusieurs pages
+
+    Args:
+        category: Nom de la catégorie ('Chiens', 'Moutons', 'Poules', 'Autres')
+        num_pages: Nombre de pages à scraper
+        progress_callback: Fonction optionnelle pour afficher la progression
+        **kwargs: Options de iter_pages (max_workers, requests_per_second,
+            client, incremental, seen_index, parser_backend, limiter,
+            error_callback, stores, metrics, retry_policy, circuit_breaker,
+            adaptive_concurrency, mode, required_fields, parse_processes)
+
+    Returns:
+        DataFrame pandas avec les annonces scrapées
+    """
+    records = list(
+        iter_category(
+            category, num_pages, progress_callback=progress_callback, **kwargs
+        )
+    )
+    df = pd.DataFrame(records, columns=RECORD_FIELDS)
+
+    logger.info("Scraping terminé: %d annonces récupérées au total", len(df))
     return df
+
+
+def _normalize_field(value) -> str:
+    return " ".join(str(value).split()).casefold()
+
+
+def field_coverage(cards: pd.DataFrame, detail: pd.DataFrame) -> pd.DataFrame:
+    """
+    Compare les champs extraits en mode "cards" et en mode "detail".
+
+    Args:
+        cards: Annonces extraites des cartes (sans compléments)
+        detail: Annonces extraites des pages d'annonces
+
+    Returns:
+        DataFrame: Pour chaque champ, part des annonces où il est rempli
+        dans chaque mode, et part des annonces communes (même URL, champ
+        rempli dans les deux modes) où les deux valeurs sont identiques
+    """
+    merged = cards.merge(detail, on="container_urls", suffixes=("_cards", "_detail"))
+    rows = []
+    for field in RECORD_FIELDS:
+        if field == "container_urls":
+            continue
+        filled_cards = cards[field].ne("N/A") & cards[field].notna()
+        filled_detail = detail[field].ne("N/A") & detail[field].notna()
+        both = merged[
+            merged[f"{field}_cards"].ne("N/A") & merged[f"{field}_detail"].ne("N/A")
+            & merged[f"{field}_cards"].notna() & merged[f"{field}_detail"].notna()
+        ]
+        same = (
+            both[f"{field}_cards"].map(_normalize_field)
+            == both[f"{field}_detail"].map(_normalize_field)
+        )
+        rows.append(
+            {
+                "champ": field,
+                "rempli (cartes)": filled_cards.mean() if len(cards) else 0.0,
+                "rempli (détail)": filled_detail.mean() if len(detail) else 0.0,
+                "identique": same.mean() if len(both) else float("nan"),
+            }
+        )
+    return pd.DataFrame(rows)
+
+
+def compare_extraction_modes(category: str, num_pages: int = 1, **kwargs) -> dict:
+    """
+    Scrape les mêmes pages dans les deux modes d'extraction et compare les
+    champs obtenus, le nombre de requêtes et la durée.
+
+    Args:
+        category: Nom de la catégorie
+        num_pages: Nombre de pages à scraper
+        **kwargs: Options de iter_pages (hors mode, required_fields, metrics)
+
+    Returns:
+        dict: "fields" (voir field_coverage) et, par mode, "ads",
+        "requests" et "duration" (secondes)
+    """
+    frames, report = {}, {"ads": {}, "requests": {}, "duration": {}}
+    for mode in EXTRACTION_MODES:
+        registry = MetricsRegistry()
+        # Cartes seules (aucun complément) pour mesurer ce qu'elles contiennent
+        frames[mode] = scrape_category(
+            category, num_pages, mode=mode, required_fields=(), metrics=registry, **kwargs
+        )
+        run = registry.runs(last=1)[0]
+        report["ads"][mode] = len(frames[mode])
+        report["requests"][mode] = run["requests"]
+        report["duration"][mode] = run["duration"]
+    report["fields"] = field_coverage(frames["cards"], frames["detail"])
+    return report
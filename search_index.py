@@ -0,0 +1,334 @@
+"""
+Recherche plein texte et à facettes dans les annonces.
+
+L'index inversé associe chaque mot des colonnes SEARCH_COLUMNS (Nom et
+titre), sans accents ni casse, aux annonces qui le contiennent. Il est
+construit sur la table partagée de listing_store:
+
+- ces colonnes y sont dictionnaire-encodées: chaque texte distinct n'est
+  découpé en mots qu'une fois, puis les listes d'annonces sont calculées
+  avec numpy à partir des codes;
+- les annonces sont numérotées de la plus récente à la plus ancienne, si
+  bien que les listes triées donnent directement les résultats dans l'ordre
+  d'affichage;
+- le vocabulaire est trié: les mots commençant par un préfixe sont
+  contigus (recherche pendant la saisie).
+
+Quand les données changent, l'index est reconstruit en réutilisant le
+découpage des textes déjà vus: seuls les nouveaux textes sont découpés.
+"""
+
+import bisect
+import re
+import threading
+import time
+import unicodedata
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from listing_store import ListingStore, get_listing_store
+
+# Mot: suite de lettres ou de chiffres (après suppression des accents)
+TOKEN_RE = re.compile(r"[^\W_]+")
+
+# Colonnes indexées: nom de l'annonce (nom du vendeur dans les exports Web
+# Scraper) et titre tiré de son URL (voir data_cleaner.clean_dataframe)
+SEARCH_COLUMNS = ("Nom", "titre")
+
+# Colonnes à facettes (filtres par valeur, avec le nombre d'annonces)
+FACET_COLUMNS = ("categorie", "ville")
+
+# Colonnes des pages de résultats
+RESULT_COLUMNS = [
+    "Nom",
+    "titre",
+    "prix",
+    "prix_fcfa",
+    "categorie",
+    "ville",
+    "quartier",
+    "scraped_at",
+    "image_url",
+]
+
+
+def fold_text(text: str) -> str:
+    """Texte en minuscules, sans accents ("Bélier" -> "belier")."""
+    folded = unicodedata.normalize(
+        "NFKD", text.casefold().replace("œ", "oe").replace("æ", "ae")
+    )
+    return "".join(c for c in folded if not unicodedata.combining(c))
+
+
+def tokenize(text: str) -> list[str]:
+    """Mots distincts d'un texte, sans accents ni casse, dans l'ordre."""
+    return list(dict.fromkeys(TOKEN_RE.findall(fold_text(text))))
+
+
+def _codes(column: pa.ChunkedArray) -> np.ndarray:
+    """Codes d'une colonne dictionnaire-encodée (-1 pour les valeurs nulles)."""
+    if not column.num_chunks:
+        return np.empty(0, dtype=np.int32)
+    indices = column.chunk(0).indices
+    return indices.fill_null(-1).to_numpy().astype(np.int32, copy=False)
+
+
+def _labels(column: pa.ChunkedArray) -> list:
+    if not column.num_chunks:
+        return []
+    return column.chunk(0).dictionary.to_pylist()
+
+
+class SearchIndex:
+    """
+    Index inversé des textes des annonces et colonnes à facettes.
+
+    Args:
+        store: Table des annonces (voir listing_store)
+        token_cache: Texte -> mots, réutilisé d'un index précédent
+    """
+
+    def __init__(self, store: ListingStore, token_cache: dict | None = None):
+        self.store = store
+        table = store.table
+        n = store.num_rows if "Nom" in store.columns else 0
+
+        # Position dans l'index -> ligne de la table, du plus récent au plus ancien
+        if n and "scraped_at" in store.columns:
+            # Date négée (plus récent d'abord); les annonces sans date en dernier
+            age = pc.negate(table["scraped_at"].cast(pa.int64()))
+            age = age.fill_null(np.iinfo(np.int64).max).to_numpy()
+            self.rows = np.argsort(age, kind="stable")
+        else:
+            self.rows = np.arange(n)
+        self.size = n
+
+        # Découpage de chaque texte distinct (réutilisé pour les textes déjà vus)
+        columns = [c for c in SEARCH_COLUMNS if n and c in store.columns]
+        texts = {column: _labels(table[column]) for column in columns}
+        previous = token_cache or {}
+        self.token_cache = {}
+        for values in texts.values():
+            for text in values:
+                if text not in self.token_cache:
+                    self.token_cache[text] = (
+                        previous[text] if text in previous else tuple(tokenize(text))
+                    )
+
+        # Vocabulaire trié; une entrée (mot, position) par annonce et par mot
+        # de ses textes, triée par mot puis par position, sans doublon
+        self.vocabulary = sorted({t for tokens in self.token_cache.values() for t in tokens})
+        token_ids = {token: i for i, token in enumerate(self.vocabulary)}
+        entries = [self._entries(table[c], texts[c], token_ids) for c in columns]
+        tokens = np.concatenate([e[0] for e in entries] + [np.empty(0, dtype=np.int64)])
+        positions = np.concatenate([e[1] for e in entries] + [np.empty(0, dtype=np.int64)])
+        order = np.lexsort((positions, tokens))
+        tokens, positions = tokens[order], positions[order]
+        if len(columns) > 1:
+            keep = np.ones(len(tokens), dtype=bool)
+            keep[1:] = (tokens[1:] != tokens[:-1]) | (positions[1:] != positions[:-1])
+            tokens, positions = tokens[keep], positions[keep]
+        self.postings = positions.astype(np.int32)
+        self.offsets = np.concatenate(
+            ([0], np.cumsum(np.bincount(tokens, minlength=len(self.vocabulary))))
+        )
+
+        # Facettes: codes et libellés par position, prix numérique
+        self.facets = {}
+        for column in FACET_COLUMNS:
+            if n and column in store.columns:
+                self.facets[column] = (_codes(table[column])[self.rows], _labels(table[column]))
+        if n and "prix_fcfa" in store.columns:
+            self.prices = (
+                table["prix_fcfa"].to_numpy().astype(np.float64, copy=False)[self.rows]
+            )
+        else:
+            self.prices = None
+
+    def _entries(self, column, texts, token_ids):
+        """Couples (mot, position) d'une colonne dictionnaire-encodée."""
+        # Couples (mot, texte distinct)
+        pair_tokens = []
+        pair_texts = []
+        for text_id, text in enumerate(texts):
+            for token in self.token_cache[text]:
+                pair_tokens.append(token_ids[token])
+                pair_texts.append(text_id)
+        pair_tokens = np.asarray(pair_tokens, dtype=np.int64)
+        pair_texts = np.asarray(pair_texts, dtype=np.int64)
+
+        # Positions des annonces groupées par texte (croissantes dans chaque groupe)
+        codes = _codes(column)[self.rows]
+        present = np.flatnonzero(codes >= 0)
+        by_text = present[np.argsort(codes[present], kind="stable")]
+        counts = np.bincount(codes[present], minlength=len(texts))
+        starts = np.cumsum(counts) - counts
+
+        # Chaque couple donne une entrée par annonce de son texte
+        lengths = counts[pair_texts]
+        pair_index = np.repeat(np.arange(len(pair_texts)), lengths)
+        within = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        return pair_tokens[pair_index], by_text[starts[pair_texts][pair_index] + within]
+
+    @property
+    def version(self) -> str | None:
+        return self.store.version
+
+    def _token_range(self, token: str, prefix: bool) -> tuple[int, int]:
+        """Intervalle des identifiants des mots égaux à (ou commençant par) token."""
+        low = bisect.bisect_left(self.vocabulary, token)
+        if prefix:
+            # Le caractère le plus grand: tous les mots qui prolongent token
+            high = bisect.bisect_left(self.vocabulary, token + "\U0010ffff", low)
+        else:
+            high = low + 1 if low < len(self.vocabulary) and self.vocabulary[low] == token else low
+        return low, high
+
+    def _matches(self, token: str, prefix: bool) -> np.ndarray:
+        """Positions (triées, distinctes) des annonces contenant le mot."""
+        low, high = self._token_range(token, prefix)
+        postings = self.postings[self.offsets[low]:self.offsets[high]]
+        if high - low <= 1:
+            return postings
+        # Union de plusieurs listes triées: masque sur toutes les positions
+        # (linéaire, plus rapide qu'un tri à partir de quelques milliers)
+        mask = np.zeros(self.size, dtype=bool)
+        mask[postings] = True
+        return np.flatnonzero(mask).astype(np.int32)
+
+    def _text_matches(self, query: str, prefix: bool) -> np.ndarray:
+        tokens = tokenize(query or "")
+        if not tokens:
+            return np.arange(self.size, dtype=np.int32)
+
+        # Dernier mot en préfixe: il est peut-être en cours de saisie
+        lists = [
+            self._matches(token, prefix and i == len(tokens) - 1)
+            for i, token in enumerate(tokens)
+        ]
+        lists.sort(key=len)
+        result = lists[0]
+        for other in lists[1:]:
+            if not len(result):
+                break
+            mask = np.zeros(self.size, dtype=bool)
+            mask[other] = True
+            result = result[mask[result]]
+        return result
+
+    def search(
+        self,
+        query: str = "",
+        categories: list[str] | None = None,
+        cities: list[str] | None = None,
+        price_range: tuple[float, float] | None = None,
+        prefix: bool = True,
+    ) -> dict:
+        """
+        Annonces dont le nom ou le titre contient tous les mots de la requête.
+
+        Args:
+            query: Mots recherchés (sans accents ni casse; vide: toutes les annonces)
+            categories: Catégories gardées (toutes si vide)
+            cities: Villes gardées (toutes si vide)
+            price_range: (min, max) en FCFA; exclut les prix sur demande
+            prefix: Le dernier mot peut être un début de mot ("pitb")
+
+        Returns:
+            dict: total, rows (lignes de la table, de la plus récente à la
+            plus ancienne), facets (colonne -> Series du nombre d'annonces
+            par valeur, avec les autres filtres appliqués) et seconds
+        """
+        start = time.perf_counter()
+        positions = self._text_matches(query, prefix)
+        everything = len(positions) == self.size
+
+        # Codes des facettes des annonces trouvées (sans copie si toutes)
+        found = {
+            column: codes if everything else codes[positions]
+            for column, (codes, _) in self.facets.items()
+        }
+
+        masks = {}
+        for column, values in (("categorie", categories), ("ville", cities)):
+            if values and column in self.facets:
+                # Table de correspondance code -> gardé (le code -1 des
+                # valeurs nulles tombe sur la dernière case, False)
+                labels = self.facets[column][1]
+                wanted = np.zeros(len(labels) + 1, dtype=bool)
+                wanted[[i for i, label in enumerate(labels) if label in set(values)]] = True
+                masks[column] = wanted[found[column]]
+        if price_range is not None and self.prices is not None:
+            prices = self.prices if everything else self.prices[positions]
+            masks["prix"] = (prices >= price_range[0]) & (prices <= price_range[1])
+
+        def combined(exclude=None):
+            mask = None
+            for name, other in masks.items():
+                if name != exclude:
+                    mask = other if mask is None else mask & other
+            return mask
+
+        facets = {}
+        for column, (_, labels) in self.facets.items():
+            facet_codes = found[column]
+            mask = combined(exclude=column)
+            if mask is not None:
+                facet_codes = facet_codes[mask]
+            # Décalage de 1: les valeurs nulles (-1) comptent dans la case 0
+            counts = np.bincount(facet_codes + 1, minlength=len(labels) + 1)[1:]
+            series = pd.Series(counts, index=pd.Index(labels, name=column), name="annonces")
+            facets[column] = series[series > 0].sort_values(ascending=False, kind="stable")
+
+        mask = combined()
+        if mask is not None:
+            positions = positions[mask]
+        return {
+            "total": len(positions),
+            "rows": self.rows[positions],
+            "facets": facets,
+            "seconds": time.perf_counter() - start,
+        }
+
+    def page(
+        self, result: dict, page: int = 1, page_size: int = 20, columns: list[str] | None = None
+    ) -> pd.DataFrame:
+        """
+        Page de résultats d'une recherche (seules ses lignes sont copiées).
+
+        Args:
+            result: Résultat de search()
+            page: Numéro de page (à partir de 1)
+            page_size: Nombre d'annonces par page
+            columns: Colonnes (par défaut RESULT_COLUMNS présentes dans la table)
+
+        Returns:
+            DataFrame indexé par le numéro de ligne dans la table
+        """
+        if columns is None:
+            columns = [c for c in RESULT_COLUMNS if c in self.store.columns]
+        start = max(page - 1, 0) * page_size
+        return self.store.take(result["rows"][start:start + page_size], columns)
+
+
+_indexes = {}  # dossier -> SearchIndex
+_indexes_lock = threading.Lock()
+
+
+def get_search_index(data_folder: str = "webscraper_data") -> SearchIndex:
+    """
+    Index de recherche du dossier, partagé par le processus.
+
+    Reconstruit quand les données changent (nouvelle table de
+    listing_store), en réutilisant le découpage des textes déjà indexés.
+    """
+    store = get_listing_store(data_folder)
+    with _indexes_lock:
+        index = _indexes.get(data_folder)
+        if index is None or index.store is not store:
+            index = SearchIndex(store, token_cache=index.token_cache if index else None)
+            _indexes[data_folder] = index
+        return index
@@ -0,0 +1,366 @@
+import json
+import logging
+import os
+import shutil
+import sqlite3
+from typing import Callable
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from scraper import RECORD_FIELDS, category_slug, iter_pages
+
+logger = logging.getLogger(__name__)
+
+# Nombre d'annonces accumulées avant écriture sur disque
+DEFAULT_BATCH_SIZE = 200
+
+# Schéma des fichiers Parquet de sortie (voir scrape_to_file)
+OUTPUT_SCHEMA = pa.schema([(field, pa.string()) for field in RECORD_FIELDS])
+
+
+class CsvSink:
+    """
+    Ajoute les annonces à la fin d'un fichier CSV (en-tête écrit une seule fois).
+
+    Args:
+        path: Chemin du fichier CSV
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def write(self, records: list[dict]) -> None:
+        if not records:
+            return
+        header = not os.path.exists(self.path) or os.path.getsize(self.path) == 0
+        df = pd.DataFrame(records, columns=RECORD_FIELDS)
+        df.to_csv(self.path, mode="a", header=header, index=False)
+
+    def close(self) -> None:
+        pass
+
+
+class ParquetSink:
+    """
+    Écrit chaque lot dans un nouveau fichier part-NNNNN.parquet d'un dossier.
+
+    Le dossier se relit d'un bloc avec pd.read_parquet(path) et peut être
+    complété par une reprise après interruption.
+
+    Args:
+        path: Dossier du dataset Parquet
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(path, exist_ok=True)
+        self._part = len([f for f in os.listdir(path) if f.endswith(".parquet")])
+
+    def parts(self) -> list[str]:
+        """Fichiers du dataset, dans l'ordre d'écriture."""
+        return sorted(
+            os.path.join(self.path, f) for f in os.listdir(self.path) if f.endswith(".parquet")
+        )
+
+    def write(self, records: list[dict]) -> None:
+        if not records:
+            return
+        df = pd.DataFrame(records, columns=RECORD_FIELDS)
+        part_path = os.path.join(self.path, f"part-{self._part:05d}.parquet")
+        # Écriture atomique: un fichier partiel n'est jamais visible
+        df.to_parquet(part_path + ".tmp", index=False)
+        os.replace(part_path + ".tmp", part_path)
+        self._part += 1
+
+    def close(self) -> None:
+        pass
+
+
+class SqliteSink:
+    """
+    Ajoute les annonces dans une table SQLite.
+
+    Args:
+        path: Chemin de la base SQLite
+        table: Nom de la table
+    """
+
+    def __init__(self, path: str, table: str = "annonces"):
+        self.table = table
+        self._conn = sqlite3.connect(path)
+        columns = ", ".join(f'"{field}" TEXT' for field in RECORD_FIELDS)
+        self._conn.execute(f'CREATE TABLE IF NOT EXISTS "{table}" ({columns})')
+
+    def write(self, records: list[dict]) -> None:
+        if not records:
+            return
+        placeholders = ", ".join("?" for _ in RECORD_FIELDS)
+        with self._conn:
+            self._conn.executemany(
+                f'INSERT INTO "{self.table}" VALUES ({placeholders})',
+                [tuple(r.get(field) for field in RECORD_FIELDS) for r in records],
+            )
+
+    def close(self) -> None:
+        self._conn.close()
+
+
+SINKS = {"csv": CsvSink, "parquet": ParquetSink, "sqlite": SqliteSink}
+
+
+def open_sink(path: str, fmt: str | None = None):
+    """
+    Crée le sink correspondant au format (déduit de l'extension si absent).
+
+    Args:
+        path: Destination (fichier CSV/SQLite ou dossier Parquet)
+        fmt: 'csv', 'parquet' ou 'sqlite'
+    """
+    if fmt is None:
+        ext = os.path.splitext(path)[1].lower()
+        fmt = {".csv": "csv", ".parquet": "parquet", ".db": "sqlite", ".sqlite": "sqlite"}.get(ext)
+    if fmt not in SINKS:
+        raise ValueError(f"Format inconnu. Choisir parmi: {list(SINKS)}")
+    return SINKS[fmt](path)
+
+
+class Checkpoint:
+    """
+    Point de reprise d'un scraping: dernière page entièrement écrite.
+
+    Args:
+        path: Fichier JSON du checkpoint
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def load(self, category: str) -> int:
+        """Retourne la dernière page terminée pour la catégorie (0 si aucune)."""
+        if not os.path.exists(self.path):
+            return 0
+        with open(self.path, encoding="utf-8") as f:
+            state = json.load(f)
+        if state.get("category") != category:
+            return 0
+        return state.get("last_page", 0)
+
+    def save(self, category: str, last_page: int) -> None:
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"category": category, "last_page": last_page}, f)
+        os.replace(tmp_path, self.path)
+
+    def clear(self) -> None:
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def scrape_to_sink(
+    category: str,
+    num_pages: int,
+    sink,
+    checkpoint: Checkpoint | None = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    progress_callback: Callable | None = None,
+    start_page: int = 1,
+    error_callback: Callable | None = None,
+    page_callback: Callable | None = None,
+    **kwargs,
+) -> int:
+    """
+    Scrape une catégorie en écrivant les annonces par lots dans un sink.
+
+    Le checkpoint n'avance qu'après l'écriture d'un lot, et jamais au-delà
+    d'une page en échec (iter_pages ne produit pas ces pages): en cas
+    d'interruption, un nouvel appel reprend après la dernière page d'une
+    suite de pages toutes écrites. Les pages écrites après une page en échec
+    sont alors scrapées à nouveau (doublons retirés au chargement, voir
+    data_cleaner.deduplicate_ads). Une fois le scraping terminé, le
+    checkpoint est supprimé.
+
+    Args:
+        category: Nom de la catégorie
+        num_pages: Nombre de pages à scraper
+        sink: Destination (CsvSink, ParquetSink, SqliteSink)
+        checkpoint: Point de reprise optionnel
+        batch_size: Nombre d'annonces par écriture
+        progress_callback: Fonction optionnelle pour afficher la progression
+        start_page: Première page à scraper (sans checkpoint ou s'il est avant)
+        error_callback: Fonction optionnelle appelée avec (type, url) pour
+            chaque page ou annonce en échec (voir iter_pages)
+        page_callback: Fonction optionnelle appelée avec (numéro de page,
+            annonces) pour chaque page terminée; une exception qu'elle lève
+            interrompt le scraping (reprise possible)
+        **kwargs: Options de scraper.iter_pages
+
+    Returns:
+        int: Nombre d'annonces écrites pendant cet appel
+    """
+    if checkpoint:
+        start_page = max(start_page, checkpoint.load(category) + 1)
+        if start_page > 1:
+            logger.info("Reprise du scraping à la page %d", start_page)
+
+    failed = False
+
+    def on_error(kind, url):
+        nonlocal failed
+        if kind == "page":
+            failed = True
+        if error_callback:
+            error_callback(kind, url)
+
+    buffer = []
+    written = 0
+
+    def flush(last_page):
+        nonlocal buffer, written
+        sink.write(buffer)
+        written += len(buffer)
+        buffer = []
+        if checkpoint:
+            checkpoint.save(category, last_page)
+
+    # Dernière page d'une suite sans échec depuis start_page
+    done_page = start_page - 1
+    for index_page, data in iter_pages(
+        category,
+        num_pages,
+        progress_callback=progress_callback,
+        start_page=start_page,
+        error_callback=on_error,
+        **kwargs,
+    ):
+        buffer.extend(data)
+        if not failed and index_page == done_page + 1:
+            done_page = index_page
+        else:
+            failed = True
+        if len(buffer) >= batch_size:
+            flush(done_page)
+        if page_callback:
+            page_callback(index_page, data)
+
+    flush(done_page)
+    if checkpoint:
+        checkpoint.clear()
+    return written
+
+
+def output_path(data_dir: str, category: str, fmt: str = "csv") -> str:
+    """Fichier de sortie d'une catégorie (voir scrape_to_file)."""
+    return os.path.join(data_dir, f"coinafrique_{category_slug(category)}_scraper.{fmt}")
+
+
+def partial_path(path: str) -> str:
+    """Fichier (ou dossier Parquet) où scrape_to_file écrit avant publication."""
+    return f"{path}.partial"
+
+
+def _remove(path: str) -> None:
+    if os.path.isdir(path):
+        shutil.rmtree(path)
+    elif os.path.exists(path):
+        os.remove(path)
+
+
+def _publish_csv(partial: str, path: str, append: bool) -> None:
+    if not (append and os.path.exists(path)):
+        os.replace(partial, path)
+        return
+    tmp_path = f"{path}.tmp"
+    with open(path, "rb") as f:
+        header = f.readline()
+    with open(partial, "rb") as src:
+        if src.readline() != header:
+            # Colonnes différentes: fusion par pandas
+            df = pd.concat([pd.read_csv(path), pd.read_csv(partial)], ignore_index=True)
+            df.to_csv(tmp_path, index=False)
+        else:
+            shutil.copyfile(path, tmp_path)
+            with open(tmp_path, "ab") as dst:
+                shutil.copyfileobj(src, dst)
+    os.replace(tmp_path, path)
+    _remove(partial)
+
+
+def _publish_parquet(parts: list[str], partial: str, path: str, append: bool) -> None:
+    sources = ([path] if append and os.path.exists(path) else []) + parts
+    tmp_path = f"{path}.tmp"
+    with pq.ParquetWriter(tmp_path, OUTPUT_SCHEMA) as writer:
+        for source in sources:
+            for batch in pq.ParquetFile(source).iter_batches(columns=RECORD_FIELDS):
+                writer.write_table(pa.Table.from_batches([batch]).cast(OUTPUT_SCHEMA))
+    os.replace(tmp_path, path)
+    _remove(partial)
+
+
+def scrape_to_file(
+    category: str,
+    num_pages: int,
+    path: str,
+    append: bool = False,
+    **kwargs,
+) -> int:
+    """
+    Scrape une catégorie dans un fichier CSV ou Parquet, avec reprise.
+
+    Les annonces sont écrites par lots dans un fichier partiel (voir
+    partial_path), avec un checkpoint à côté. Un appel interrompu (erreur,
+    arrêt du processus) les laisse en place: l'appel suivant pour le même
+    fichier reprend après la dernière page écrite (voir scrape_to_sink). Une
+    fois le scraping terminé, le fichier partiel remplace path, ou le
+    complète avec append. Un scraping sans annonce ne remplace pas un fichier
+    existant (toutes les pages en échec pendant une panne du site, par
+    exemple).
+
+    Args:
+        category: Nom de la catégorie
+        num_pages: Nombre de pages à scraper
+        path: Fichier de sortie (.csv ou .parquet)
+        append: Ajouter les annonces au fichier existant au lieu de le remplacer
+        **kwargs: Options de scrape_to_sink et de scraper.iter_pages
+
+    Returns:
+        int: Nombre d'annonces écrites pendant cet appel
+    """
+    fmt = "parquet" if path.endswith(".parquet") else "csv"
+    partial = partial_path(path)
+    checkpoint = Checkpoint(f"{path}.checkpoint")
+    if not (os.path.exists(partial) and checkpoint.load(category)):
+        # Pas de reprise possible (scraping terminé, publication en échec,
+        # autre catégorie): on repart de start_page
+        checkpoint.clear()
+        _remove(partial)
+
+    sink = open_sink(partial, fmt)
+    try:
+        written = scrape_to_sink(category, num_pages, sink, checkpoint, **kwargs)
+    finally:
+        sink.close()
+
+    exists = os.path.exists(path)
+    parts = sink.parts() if fmt == "parquet" else None
+    if parts or (fmt == "csv" and os.path.exists(partial)):
+        if fmt == "parquet":
+            _publish_parquet(parts, partial, path, append)
+        else:
+            _publish_csv(partial, path, append)
+        return written
+
+    _remove(partial)
+    if not (append or exists):
+        # Fichier vide (colonnes seules), comme un scraping sans annonce
+        tmp_path = f"{path}.tmp"
+        df = pd.DataFrame(columns=RECORD_FIELDS)
+        if fmt == "parquet":
+            df.to_parquet(tmp_path, index=False)
+        else:
+            df.to_csv(tmp_path, index=False)
+        os.replace(tmp_path, path)
+    elif exists and not append:
+        logger.warning("Aucune annonce récupérée: %s n'est pas remplacé", path)
+    return written
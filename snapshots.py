@@ -0,0 +1,185 @@
+import os
+import threading
+import time
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from scraper import RECORD_FIELDS, category_slug
+
+# Sous-dossier (dans le dossier de données) de l'historique des scrapings
+SNAPSHOT_DIRNAME = "snapshots"
+
+# Colonnes des snapshots: annonce brute, catégorie et date du run
+SNAPSHOT_FIELDS = RECORD_FIELDS + ["categorie", "run_at"]
+
+# Partitions: date=AAAA-MM-JJ/category=<identifiant d'URL de la catégorie>
+PARTITIONING = ds.partitioning(
+    pa.schema([("date", pa.string()), ("category", pa.string())]), flavor="hive"
+)
+
+
+def snapshot_dir(data_folder: str) -> str:
+    return os.path.join(data_folder, SNAPSHOT_DIRNAME)
+
+
+class SnapshotStore:
+    """
+    Historique append-only des annonces scrapées.
+
+    Chaque run ajoute ses annonces telles que scrapées, avec la date du run
+    (run_at), dans des fichiers Parquet partitionnés par date et catégorie.
+    S'utilise comme stockage de scraper.iter_pages: chaque page est écrite
+    dans un fichier partiel, puis flush() regroupe les fichiers du run en un
+    fichier par partition (run-<run_id>.parquet). flush() réécrit donc le
+    fichier du run en cours et supprime les fichiers partiels qu'il y a
+    regroupés; les fichiers des runs précédents ne sont jamais réécrits ni
+    supprimés.
+
+    L'application lit l'historique des prix dans la base d'annonces
+    (listings_db); les snapshots permettent de la reconstruire (voir
+    replay_price_history).
+
+    Args:
+        data_folder: Dossier des données
+        run_at: Date du run (timestamp; par défaut maintenant)
+    """
+
+    def __init__(self, data_folder: str = "webscraper_data", run_at: float | None = None):
+        self.root = snapshot_dir(data_folder)
+        self.run_at = pd.Timestamp(run_at if run_at is not None else time.time(), unit="s").floor("s")
+        self.run_id = f"{self.run_at:%Y%m%dT%H%M%S}-{os.getpid()}"
+        self._parts = {}  # partition -> fichiers partiels du run
+        self._count = 0
+        self._lock = threading.Lock()
+        self._merge_lock = threading.Lock()
+
+    def partition(self, category: str) -> str:
+        return os.path.join(
+            self.root, f"date={self.run_at:%Y-%m-%d}", f"category={category_slug(category)}"
+        )
+
+    def add_records(self, records: list[dict], category: str) -> None:
+        if not records:
+            return
+        df = pd.DataFrame(records, columns=RECORD_FIELDS)
+        df["categorie"] = category
+        df["run_at"] = self.run_at
+
+        directory = self.partition(category)
+        os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            path = os.path.join(directory, f"part-{self.run_id}-{self._count:05d}.parquet")
+            self._count += 1
+        # Écriture atomique: un fichier partiel n'est jamais visible. Il n'est
+        # enregistré qu'une fois écrit, pour qu'un flush() d'un autre thread
+        # ne le lise pas avant
+        df.to_parquet(path + ".tmp", index=False)
+        os.replace(path + ".tmp", path)
+        with self._lock:
+            self._parts.setdefault(directory, []).append(path)
+
+    def flush(self, category: str | None = None) -> None:
+        """
+        Regroupe les fichiers partiels du run en un fichier par partition.
+
+        Args:
+            category: Catégorie dont regrouper la partition (toutes si None);
+                les scrapings parallèles d'un même run ne regroupent ainsi
+                que leurs propres fichiers
+        """
+        # Un regroupement à la fois: deux flush() ne réécrivent jamais le
+        # même fichier du run en même temps
+        with self._merge_lock:
+            with self._lock:
+                if category is None:
+                    parts, self._parts = self._parts, {}
+                else:
+                    directory = self.partition(category)
+                    parts = {directory: self._parts.pop(directory)} if directory in self._parts else {}
+            for directory, paths in parts.items():
+                target = os.path.join(directory, f"run-{self.run_id}.parquet")
+                if os.path.exists(target):
+                    paths = [target] + paths
+                table = pa.concat_tables([pq.read_table(p) for p in paths])
+                pq.write_table(table, target + ".tmp")
+                os.replace(target + ".tmp", target)
+                for path in paths:
+                    if path != target:
+                        os.remove(path)
+
+
+def read_snapshots(
+    data_folder: str = "webscraper_data",
+    categories: list[str] | None = None,
+    start=None,
+    end=None,
+    columns: list[str] | None = None,
+) -> pd.DataFrame:
+    """
+    Relit l'historique, seulement les partitions demandées (pour
+    reconstruire la base d'annonces ou analyser les runs hors de
+    l'application).
+
+    Args:
+        data_folder: Dossier des données
+        categories: Catégories à lire (toutes si vide)
+        start, end: Dates de début et de fin incluses (toutes si None)
+        columns: Colonnes à lire (par défaut SNAPSHOT_FIELDS)
+
+    Returns:
+        DataFrame: Annonces des runs sélectionnés
+    """
+    columns = columns or SNAPSHOT_FIELDS
+    root = snapshot_dir(data_folder)
+    # (seulement les fichiers terminés, pas les .tmp en cours d'écriture)
+    paths = [
+        os.path.join(directory, f)
+        for directory, _, files in os.walk(root)
+        for f in files
+        if f.endswith(".parquet")
+    ]
+    if not paths:
+        return pd.DataFrame(columns=columns)
+
+    dataset = ds.dataset(
+        paths, format="parquet", partitioning=PARTITIONING, partition_base_dir=root
+    )
+    condition = None
+
+    def combine(expression):
+        return expression if condition is None else condition & expression
+
+    if categories:
+        condition = combine(ds.field("category").isin([category_slug(c) for c in categories]))
+    if start is not None:
+        condition = combine(ds.field("date") >= f"{pd.Timestamp(start):%Y-%m-%d}")
+    if end is not None:
+        condition = combine(ds.field("date") <= f"{pd.Timestamp(end):%Y-%m-%d}")
+    return dataset.to_table(columns=columns, filter=condition).to_pandas()
+
+
+def replay_price_history(db, data_folder: str = "webscraper_data", **filters) -> int:
+    """
+    Reconstruit l'historique des prix d'une base d'annonces depuis les
+    snapshots (ex: après suppression de la base). Les pages de l'application
+    lisent ensuite cet historique dans la base (table price_history).
+
+    Args:
+        db: Base d'annonces (voir listings_db.ListingsDB)
+        data_folder: Dossier des données
+        **filters: Options de read_snapshots (categories, start, end)
+
+    Returns:
+        int: Nombre d'annonces relues
+    """
+    from data_cleaner import clean_dataframe
+
+    df = read_snapshots(data_folder, columns=["container_urls", "prix", "categorie", "run_at"], **filters)
+    if df.empty:
+        return 0
+    df = clean_dataframe(df).rename(columns={"run_at": "scraped_at"})
+    db.add_price_observations(df)
+    return len(df)
@@ -0,0 +1,80 @@
+"""
+Fichiers sources du dossier de données (CSV Web Scraper et sorties du
+scraper): liste, lecture, empreintes et catégorie déduite du nom.
+
+Partagé par data_store (compactage) et data_cleaner (chargement).
+"""
+
+import hashlib
+import os
+
+import pandas as pd
+
+# Extensions des fichiers sources pris en compte
+SOURCE_EXTENSIONS = (".csv", ".parquet")
+
+
+def list_sources(data_folder: str) -> list[str]:
+    """Liste les fichiers sources (CSV Web Scraper et sorties du scraper)."""
+    if not os.path.exists(data_folder):
+        return []
+    return sorted(
+        f for f in os.listdir(data_folder) if f.endswith(SOURCE_EXTENSIONS)
+    )
+
+
+def read_source(path: str) -> pd.DataFrame:
+    if path.endswith(".parquet"):
+        return pd.read_parquet(path)
+    return pd.read_csv(path)
+
+
+def determine_category(filename):
+    """
+    Détermine la catégorie depuis le nom du fichier.
+
+    Args:
+        filename: Nom du fichier (ex: "coinafrique_chiens_webscraper.csv")
+
+    Returns:
+        str: Nom de la catégorie
+    """
+    filename_lower = filename.lower()
+
+    if "chien" in filename_lower:
+        return "Chiens"
+    elif "mouton" in filename_lower:
+        return "Moutons"
+    elif "poule" in filename_lower:
+        return "Poules, Lapins et Pigeons"
+    elif "autre" in filename_lower:
+        return "Autres"
+    else:
+        return "Non catégorisé"
+
+
+def file_hash(path):
+    """Hash (BLAKE2b) du contenu d'un fichier."""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def file_fingerprint(path, previous=None):
+    """
+    Empreinte d'un fichier: (chemin, taille, mtime, hash du contenu).
+
+    Args:
+        path: Chemin du fichier
+        previous: Empreinte connue; son hash est réutilisé si la taille et
+            le mtime n'ont pas changé
+
+    Returns:
+        tuple: Empreinte du fichier
+    """
+    stat = os.stat(path)
+    if previous is not None and previous[1:3] == (stat.st_size, stat.st_mtime_ns):
+        return previous
+    return (path, stat.st_size, stat.st_mtime_ns, file_hash(path))